@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # 여성복 의류 도매 재고 관리 및 판매 분석 시스템
 
-from flask import Flask, session, redirect, url_for, request
+from flask import Flask, session, redirect, url_for, request, jsonify
 from datetime import timedelta
 from service.db import init_db
 from route.dashboard import dashboard_bp
@@ -20,16 +20,28 @@ app.register_blueprint(dashboard_bp)
 app.register_blueprint(admin_bp)
 app.register_blueprint(api_bp)
 
+# 로그인 없이 여는 API (기존 공개 API만, 차트/통계/전체 예측 등 대시보드 데이터 API는 로그인 필요)
+OPEN_API_PATHS = {'/api/inventory-alerts', '/api/sales-forecast'}
+
+def is_open_api(path, args):
+    """로그인 없이 허용하는 API 요청인지 (전체 SKU 예측 all=1은 제외)"""
+    if path not in OPEN_API_PATHS:
+        return False
+    return not (path == '/api/sales-forecast' and args.get('all') == '1')
+
 # 전역 접근 가드: 로그인 필요
 @app.before_request
 def require_login():
     open_paths = {'/login', '/logout'}
-    if request.path.startswith('/static') or request.path in open_paths or request.path.startswith('/api/'):
+    if request.path.startswith('/static') or request.path in open_paths or is_open_api(request.path, request.args):
         return None
     if not session.get('authenticated'):
+        if request.path.startswith('/api/'):
+            return jsonify({'error': '로그인이 필요합니다'}), 401
         next_url = request.path if request.query_string == b'' else request.path + '?' + request.query_string.decode('utf-8', errors='ignore')
         return redirect(url_for('auth.login', next=next_url))
 
 if __name__ == '__main__':
     init_db()
-    app.run(debug=False, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # 대시보드 차트/알림 패널을 동시에 요청하므로 요청마다 스레드로 처리
+    app.run(debug=False, host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file
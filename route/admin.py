@@ -1,5 +1,6 @@
 from flask import Blueprint, request, redirect, url_for, flash
 from service.db import delete_by_date, reset_db, reset_compare_products
+from service.chart_snapshots import schedule_snapshots
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -10,6 +11,7 @@ def delete_date():
         deleted = delete_by_date(date_to_delete)
         if deleted > 0:
             flash(f'{date_to_delete} 데이터 {deleted}건 삭제 완료!', 'success')
+            schedule_snapshots()
         else:
             flash('삭제할 데이터가 없습니다.', 'warning')
     return redirect(url_for('dashboard.dashboard'))
@@ -1,22 +1,29 @@
-from flask import Blueprint, request, jsonify, send_file
-from service.db import load_from_db
-from service.analysis import pareto_analysis
+from flask import Blueprint, request, jsonify, send_file, current_app
+from service.sales_frame import get_sales_frame, DAY_NAMES
+from service.rolling_store import TOTAL_KEY
+from service.forecast import FORECAST_HORIZONS, FORECAST_INTERVAL
+from service.calendar_analysis import weekday_profiles
+from service.analysis import pareto_analysis, get_product_stats_batch
+from service.trend_calculator import trend_cache_stats
+from service.chart_cache import chart_cache_stats
+from service.chart_snapshots import DASHBOARD_EXCLUDE, dashboard_payload
+from service.chart_payload import encode_charts, compress, payload_etag
 from service.column_validator import ColumnValidator  # 컬럼 검증 추가
 
-from datetime import timedelta
 import pandas as pd
 import numpy as np
-from fuzzywuzzy import process
 from matplotlib.ticker import MaxNLocator
 import matplotlib.pyplot as plt
 import io
+import json
 
 api_bp = Blueprint('api', __name__)
 
 @api_bp.route('/api/inventory-alerts')
 def inventory_alerts():
     try:
-        df = load_from_db()
+        sales_frame = get_sales_frame()
+        df = sales_frame.df
         if df.empty:
             return jsonify({'alerts': []})
         
@@ -25,11 +32,11 @@ def inventory_alerts():
         if not is_valid:
             return jsonify({'error': f'필수 컬럼이 누락되었습니다: {", ".join(missing_columns)}'}), 400
         
-        top_20_products, _, _ = pareto_analysis(df)
+        top_20_products, _, _ = pareto_analysis(sales_frame)
         
         alerts = []
         for product in top_20_products:
-            product_data = df[df['품명'] == product]
+            product_data = sales_frame.select(product).df
             current_stock = product_data['현재고'].sum()
             pending_stock = product_data['미송잔량'].sum()
             avg_daily_sales = product_data['실판매'].sum() / len(product_data) if len(product_data) > 0 else 0
@@ -48,46 +55,155 @@ def inventory_alerts():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/api/product-stats', methods=['GET', 'POST'])
+def product_stats():
+    # 여러 상품/상품-컬러 통계 일괄 조회
+    # GET: ?product=품명&product=...&sku=품명|칼라  /  POST JSON: {"products": [...], "colors": [[품명, 칼라], ...]}
+    try:
+        payload = request.get_json(silent=True) or {}
+        products = payload.get('products') or request.args.getlist('product')
+        colors = payload.get('colors') or [sku.split('|', 1) for sku in request.args.getlist('sku') if '|' in sku]
+        keys = [str(product) for product in products] + [(str(product), str(color)) for product, color in colors]
+        if not keys:
+            return jsonify({'error': '조회할 상품을 지정해주세요.'}), 400
+
+        stats = get_product_stats_batch(get_sales_frame(), keys)
+        result = []
+        for key in keys:
+            product, color = key if isinstance(key, tuple) else (key, None)
+            result.append({'product': product, 'color': color, **stats[key]})
+        return jsonify({'stats': result})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/api/autocomplete')
+def autocomplete():
+    # 상품명/상품-컬러명 자동완성 (부분 문자열 또는 초성 검색)
+    query = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 50)
+    except ValueError:
+        return jsonify({'error': 'limit은 숫자여야 합니다.'}), 400
+    products_only = request.args.get('products_only') == '1'
+    matches = get_sales_frame().name_index().search(query, limit=limit, products_only=products_only)
+    return jsonify({'results': [
+        {'label': label, 'product': product, 'color': color}
+        for label, product, color in matches
+    ]})
+
+@api_bp.route('/api/weekday-profile')
+def weekday_profile():
+    # SKU별 요일 계절성 프로파일 (?product=품명 으로 상품 한정, 요일 순서: 월~일)
+    try:
+        sales_frame = get_sales_frame()
+        product = request.args.get('product')
+        if product:
+            sales_frame = sales_frame.select(product)
+        result = weekday_profiles(sales_frame)
+        return jsonify({
+            'weekdays': DAY_NAMES.tolist(),
+            'profiles': [
+                {
+                    'product': product_name,
+                    'color': color,
+                    'weekday_mean': [round(float(v), 2) for v in mean],
+                    'profile': [round(float(v), 3) for v in profile]
+                }
+                for (product_name, color), mean, profile in zip(result['keys'], result['weekday_mean'], result['profile'])
+            ]
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/api/trend-cache-stats')
+def trend_cache():
+    # 추세(LOWESS) 결과 캐시 적중/미적중 횟수와 크기
+    return jsonify(trend_cache_stats())
+
+@api_bp.route('/api/chart-cache-stats')
+def chart_cache():
+    # 차트 데이터 캐시 적중/미적중 횟수와 크기 (바이트)
+    return jsonify(chart_cache_stats())
+
+@api_bp.route('/api/charts')
+def dashboard_chart_payload():
+    # 대시보드 차트 압축 형식 (product 없으면 메인 차트, 있으면 상품 상세 차트, kinds=쉼표 구분 차트 종류)
+    # gzip/brotli 압축, ETag가 같으면 304 - 화면의 패널마다 따로 요청해 동시에 받음
+    try:
+        sales_frame = get_sales_frame(exclude_products=DASHBOARD_EXCLUDE)
+        product = request.args.get('product')
+        color = request.args.get('color') or None
+        kinds = tuple(kind for kind in request.args.get('kinds', '').split(',') if kind) or None
+        if not sales_frame.empty:
+            is_valid, missing_columns = ColumnValidator.validate_analysis_columns(sales_frame.df)
+            if not is_valid:
+                return jsonify({'error': f'필수 컬럼이 누락되었습니다: {", ".join(missing_columns)}'}), 400
+        if product and product not in sales_frame.products:
+            return jsonify({'error': 'Invalid product'}), 400
+
+        payload = encode_charts(dashboard_payload(sales_frame, product, color, kinds))
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        data, encoding = compress(body, request.accept_encodings)
+        response = current_app.response_class(data, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        # 브라우저가 매번 ETag로 재검증 (데이터 버전이 같으면 본문 없이 304)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.set_etag(payload_etag(body, encoding))
+        return response.make_conditional(request)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @api_bp.route('/api/sales-forecast')
 def sales_forecast():
     try:
-        df = load_from_db()
+        sales_frame = get_sales_frame()
+        df = sales_frame.df
         
         # 컬럼 검증 추가
         is_valid, missing_columns = ColumnValidator.validate_analysis_columns(df)
         if not is_valid:
             return jsonify({'error': f'필수 컬럼이 누락되었습니다: {", ".join(missing_columns)}'}), 400
         
+        model = sales_frame.forecast_model()
+        if request.args.get('all') == '1':
+            # 전체 SKU 기간별(7/14/28일) 예측 합계
+            sku_keys, totals, lower, upper = model.catalog_totals(FORECAST_HORIZONS)
+            start_date = model.start_date
+            return jsonify({
+                'start_date': start_date.strftime('%Y-%m-%d') if start_date is not None else None,
+                'horizons': list(FORECAST_HORIZONS),
+                'interval': FORECAST_INTERVAL,
+                'forecasts': [
+                    {
+                        'product': product,
+                        'color': color,
+                        'predicted_sales': [round(value, 1) for value in row],
+                        'lower': [round(value, 1) for value in low],
+                        'upper': [round(value, 1) for value in high]
+                    }
+                    for (product, color), row, low, high in zip(sku_keys, totals.tolist(), lower.tolist(), upper.tolist())
+                ]
+            })
+
         product = request.args.get('product')
         if product:
-            df = df[df['품명'] == product]
+            df = sales_frame.select(product).df
         if df.empty:
             return jsonify({'forecast': []})
-        df = df.copy()
-        df['판매일자'] = pd.to_datetime(df['판매일자'])
-        daily_sales = df.groupby('판매일자')['실판매'].sum().reset_index()
-        daily_sales['판매일자'] = pd.to_datetime(daily_sales['판매일자'])
-        daily_sales = daily_sales.sort_values('판매일자')
-        x = np.arange(len(daily_sales))
-        sales = daily_sales['실판매'].values
-        # 중간선 추세선 계산
-        roll_min = pd.Series(sales).rolling(7, min_periods=1).min()
-        roll_max = pd.Series(sales).rolling(7, min_periods=1).max()
-        low_trend = np.poly1d(np.polyfit(x, roll_min, 1))(x)
-        high_trend = np.poly1d(np.polyfit(x, roll_max, 1))(x)
-        mid_trend = (low_trend + high_trend) / 2
-
-        # 예측 구간 생성 (향후 7일)
-        forecast_dates = pd.date_range(start=daily_sales['판매일자'].iloc[-1] + timedelta(days=1), periods=7)
-        # 중간선 추세선의 방정식으로 미래 x값에 대해 예측
-        mid_trend_poly = np.poly1d(np.polyfit(x, mid_trend, 1))
+        # 선형 추세 + 요일 효과 모델로 향후 7일 예측 (데이터 버전당 1회 적합), 구간은 잔차 부트스트랩
+        key = product if product else TOTAL_KEY
+        dates, values = model.forecast(key, 7)
+        lower, upper, _, _ = model.intervals([model.rows[key]], 7)
         forecast = []
-        for i, date in enumerate(forecast_dates, 1):
-            pred = int(round(mid_trend_poly(len(daily_sales) + i - 1)))
+        for date, value, low, high in zip(dates, values, lower[0], upper[0]):
             forecast.append({
                 'date': date.strftime('%Y-%m-%d'),
-                'predicted_sales': max(0, pred),
-                'confidence': 0.7
+                'predicted_sales': int(round(value)),
+                'lower': int(round(low)),
+                'upper': int(round(high)),
+                'confidence': FORECAST_INTERVAL
             })
         return jsonify({'forecast': forecast})
     except Exception as e:
@@ -97,7 +213,8 @@ def sales_forecast():
 def product_trend():
     product = request.args.get('product', '')
     query = request.args.get('query', '')
-    df = load_from_db()
+    sales_frame = get_sales_frame()
+    df = sales_frame.df
     
     # 컬럼 검증 추가
     is_valid, missing_columns = ColumnValidator.validate_analysis_columns(df)
@@ -108,16 +225,18 @@ def product_trend():
         return jsonify({'error': '데이터 없음'}), 404
 
     # 유사 상품명 검색
-    all_products = sorted(df['품명'].unique())
+    all_products = sales_frame.products
     if query:
-        matches = process.extract(query, all_products, limit=10, scorer=process.fuzz.WRatio)
-        filtered_products = [m[0] for m in matches if m[1] >= 60]
+        # 데이터 버전별 캐시된 유사 검색기 (후보 축소 + 최근 질의 캐시, 점수는 WRatio와 동일)
+        matches = sales_frame.fuzzy_matcher().extract(query, limit=10, score_cutoff=60)
+        filtered_products = [m[0] for m in matches]
     else:
         filtered_products = all_products
 
     # 상품 데이터 추출
     if product and product in all_products:
-        sub = df[df['품명'] == product].sort_values('판매일자')
+        selected = sales_frame.select(product)
+        sub = selected.df.iloc[selected.date_order]
         if len(sub) < 2:
             return jsonify({'error': '데이터 부족'}), 400
         # 추세선 계산
@@ -145,4 +264,4 @@ def product_trend():
         plt.close()
         return send_file(img, mimetype='image/png')
     else:
-        return jsonify({'products': filtered_products}) 
\ No newline at end of file
+        return jsonify({'products': filtered_products}) 
\ No newline at end of file
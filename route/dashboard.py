@@ -1,9 +1,11 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-from service.db import load_from_db, save_to_db, delete_by_date, reset_db, init_clients_table, set_client_count, get_client_counts, init_weekly_clients_table, set_weekly_client_count, get_weekly_client_counts, get_current_week_client_count, set_pareto_days, get_pareto_days, extract_date_from_filename
-from service.analysis import generate_inventory_alerts, generate_a_grade_alerts, get_pareto_products, get_pareto_products_by_category, get_pareto_products_by_category_current_year, get_product_stats, get_pareto_products_by_category_date_specified, get_pareto_products_date_specified
+from service.db import save_to_db, delete_by_date, reset_db, init_clients_table, set_client_count, get_client_counts, init_weekly_clients_table, set_weekly_client_count, get_current_week_client_count, set_pareto_days, get_pareto_days, extract_date_from_filename
+from service.analysis import get_pareto_products, get_pareto_products_by_category, get_pareto_products_by_category_current_year, get_product_stats, get_product_stats_batch, get_pareto_products_by_category_date_specified
 from service.visualization import create_visualizations
-from service.charts import create_weekly_sales_chart
+from service.chart_snapshots import DASHBOARD_EXCLUDE, dashboard_trend_alerts, dashboard_inventory_alerts, schedule_snapshots
 from service.column_validator import ColumnValidator  # 컬럼 검증 추가
+from service.sales_frame import SalesFrame, get_sales_frame
+from service.rolling_store import TOTAL_KEY
 from datetime import datetime
 import pandas as pd
 import json
@@ -133,25 +135,25 @@ def dashboard():
                     flash(f'파일 {file.filename} 처리 중 오류: {str(e)}', 'error')
         if uploaded_count > 0:
             flash(f'{uploaded_count}개 파일이 성공적으로 업로드되었습니다!', 'success')
+            # 메인/파레토 상품 차트를 백그라운드에서 미리 생성
+            schedule_snapshots()
         elif not files or all(not file.filename for file in files):
             flash('파일을 선택해주세요.', 'error')
         return redirect(url_for('dashboard.dashboard'))
     
-    # 대시보드 렌더링 (GET)
-    df = load_from_db()
+    # 대시보드 렌더링 (GET) - '일반상품' 제외, 데이터 버전당 1회 준비된 SalesFrame 사용
+    # 차트(/api/charts)와 알림 패널(/dashboard/panels/...)은 화면이 뜬 뒤 따로 병렬 요청
+    sales_frame = get_sales_frame(exclude_products=DASHBOARD_EXCLUDE)
     
     # 데이터베이스에서 로드된 데이터의 컬럼 검증
-    if not df.empty:
-        is_valid, missing_columns = ColumnValidator.validate_analysis_columns(df)
+    if not sales_frame.empty:
+        is_valid, missing_columns = ColumnValidator.validate_analysis_columns(sales_frame.df)
         if not is_valid:
             flash(f'데이터베이스에 저장된 데이터에 필수 컬럼이 누락되었습니다: {", ".join(missing_columns)}', 'error')
-            df = pd.DataFrame()  # 빈 데이터프레임으로 초기화
+            sales_frame = SalesFrame(pd.DataFrame())  # 빈 데이터프레임으로 초기화
     
-    # '일반상품' 제외
-    if not df.empty:
-        df = df[df['품명'] != '(일반상품)']
-    product_list = sorted(df['품명'].unique()) if not df.empty else []
-    all_dates = sorted(pd.to_datetime(df['판매일자']).unique()) if not df.empty else []
+    df = sales_frame.df
+    product_list = sales_frame.products
     search_query = request.args.get('search', '')
     
     # 저장된 파레토 설정 일수 가져오기 (먼저 정의)
@@ -161,12 +163,13 @@ def dashboard():
         # 컬러 필터링 적용
         if selected_color:
             # 특정 컬러가 선택된 경우: 해당 상품의 특정 컬러만 필터링
-            filtered_df = df[(df['품명'] == selected_product) & (df['칼라'] == selected_color)]
+            filtered_frame = sales_frame.select(selected_product, selected_color)
             display_name = f"{selected_product} - {selected_color}"
         else:
             # 컬러가 선택되지 않은 경우: 해당 상품 전체
-            filtered_df = df[df['품명'] == selected_product]
+            filtered_frame = sales_frame.select(selected_product)
             display_name = selected_product
+        filtered_df = filtered_frame.df
         
         stats = {
             'total_items': len(filtered_df),
@@ -182,35 +185,15 @@ def dashboard():
         }
         # 상품별 통계 추가
         if selected_color:
-            stats.update(get_product_stats(df, selected_product, selected_color))
+            stats.update(get_product_stats(sales_frame, selected_product, selected_color))
         else:
-            stats.update(get_product_stats(df, selected_product))
-        
-        # 주차별 거래처 수 데이터 가져오기
-        current_year = datetime.now().year
-        weekly_client_data = get_weekly_client_counts(selected_product, current_year)
-        
-        plots = create_visualizations(filtered_df, only_product=True, all_dates=all_dates, compare_df=compare_df, weekly_client_data=weekly_client_data)
-        charts = create_visualizations(df)  # 전체 데이터용
-        
-        # 추세선 알림 데이터 추출
-        trend_alerts = []
-        if plots and 'weekly_sales_trend' in plots and plots['weekly_sales_trend']:
-            weekly_data = plots['weekly_sales_trend']
-            if isinstance(weekly_data, dict) and 'data' in weekly_data:
-                trend_alerts = weekly_data.get('data', {}).get('trend_alerts', [])
-        
-        alert_df = None
-        a_grade_alert_df = None
+            stats.update(get_product_stats(sales_frame, selected_product))
     else:
         filtered_df = df
         # 최근 7일 판매량 계산
         recent_7days_sales = 0
         if not filtered_df.empty:
-            filtered_df['판매일자'] = pd.to_datetime(filtered_df['판매일자'])
-            latest_date = filtered_df['판매일자'].max()
-            last_7_days = latest_date - pd.Timedelta(days=6)
-            recent_7days_sales = filtered_df[filtered_df['판매일자'] >= last_7_days]['실판매'].sum()
+            recent_7days_sales = sales_frame.rolling_store().trailing_sum(TOTAL_KEY, 7)
         stats = {
             'total_items': len(filtered_df),
             'total_sales': filtered_df['실판매'].sum(),
@@ -223,42 +206,11 @@ def dashboard():
             'upload_dates': filtered_df['upload_date'].nunique(),
             'sales_dates': filtered_df['판매일자'].nunique()
         }
-        charts = create_visualizations(filtered_df)
-        plots = None
-        
-        # 파레토 상품들에 대한 추세 알림 생성 (메인 대시보드용)
-        trend_alerts = []
-        if not filtered_df.empty:
-            # 파레토 상품들 가져오기 (저장된 일수 기준)
-            pareto_products = get_pareto_products_date_specified(filtered_df, pareto_days)
-            
-            for product in pareto_products[:10]:  # 상위 10개 파레토 상품만 분석
-                product_df = filtered_df[filtered_df['품명'] == product]
-                if not product_df.empty:
-                    weekly_sales_product = create_weekly_sales_chart(product_df, compare_df=compare_df)
-                    if weekly_sales_product and 'data' in weekly_sales_product:
-                        product_alerts = weekly_sales_product.get('data', {}).get('trend_alerts', [])
-                        # 상품명을 알림 메시지에 추가
-                        for alert in product_alerts:
-                            alert['product'] = product
-                            alert['message'] = f"[{product}] {alert['message']}"
-                        trend_alerts.extend(product_alerts)
-        
-        # 파레토 컬러 상품-컬러 리스트 추출 (저장된 일수 기준)
-        pareto_color_products = []
-        if not filtered_df.empty:
-            from service.analysis import color_pareto_analysis_date_specified
-            pareto_color_products = color_pareto_analysis_date_specified(filtered_df, pareto_days)
-        alert_rows = generate_inventory_alerts(filtered_df, pareto_color_products=pareto_color_products)
-        alert_df = pd.DataFrame(alert_rows) if alert_rows else None
-        a_grade_alert_rows = generate_a_grade_alerts(df)
-        a_grade_alert_df = pd.DataFrame(a_grade_alert_rows) if a_grade_alert_rows else None
     
     # 작년 연도 계산
     last_year = None
     if not df.empty:
-        df['판매일자'] = pd.to_datetime(df['판매일자'])
-        last_year = df['판매일자'].dt.year.max() - 1
+        last_year = df['연도'].max() - 1
     
     # unique_dates 계산 (날짜별 데이터 삭제용)
     unique_dates = []
@@ -267,9 +219,11 @@ def dashboard():
         unique_dates = sorted(df['판매일자'].dt.strftime('%Y-%m-%d').unique())
     
     # 상품별/컬러별 파레토 상품 가져오기 (저장된 일수 기준)
-    pareto_data = get_pareto_products_by_category_date_specified(df, pareto_days) if not df.empty else {'products': [], 'colors': []}
+    pareto_data = get_pareto_products_by_category_date_specified(sales_frame, pareto_days) if not df.empty else {'products': [], 'colors': []}
     sidebar_products = pareto_data['products']
     sidebar_colors = pareto_data['colors']
+    # 사이드바 상품/상품-컬러 통계 (한 번에 계산)
+    sidebar_stats = get_product_stats_batch(sales_frame, sidebar_products + sidebar_colors) if not df.empty else {}
     
     # 파레토 상품별 거래처 수 불러오기
     client_counts = get_client_counts()
@@ -282,12 +236,12 @@ def dashboard():
         current_week_client_count = get_current_week_client_count(selected_product)
     
     return render_template('dashboard.html',
-        charts=charts, plots=plots, stats=stats, product_list=product_list,
+        stats=stats, product_list=product_list,
         selected_product=selected_product, selected_color=selected_color, display_name=display_name if 'display_name' in locals() else selected_product,
-        alert_df=alert_df, a_grade_alert_df=a_grade_alert_df, trend_alerts=trend_alerts if 'trend_alerts' in locals() else [],
         search_query=search_query, last_year=last_year, unique_dates=unique_dates,
         sidebar_products=sidebar_products,
         sidebar_colors=sidebar_colors,
+        sidebar_stats=sidebar_stats,
         sidebar_products_json=json.dumps(sidebar_products),
         sidebar_colors_json=json.dumps(sidebar_colors),
         client_counts=client_counts,
@@ -298,20 +252,54 @@ def dashboard():
         pareto_days=pareto_days
     )
 
+def _dashboard_frame():
+    """알림 패널용 SalesFrame ('일반상품' 제외, 필수 컬럼이 없으면 빈 프레임)"""
+    sales_frame = get_sales_frame(exclude_products=DASHBOARD_EXCLUDE)
+    if not sales_frame.empty and not ColumnValidator.validate_analysis_columns(sales_frame.df)[0]:
+        return SalesFrame(pd.DataFrame())
+    return sales_frame
+
+@dashboard_bp.route('/dashboard/panels/trend-alerts')
+def trend_alerts_panel():
+    """메인 대시보드 추세선 알림 패널 HTML"""
+    try:
+        trend_alerts = dashboard_trend_alerts(_dashboard_frame(), get_pareto_days())
+        return jsonify({
+            'count': len(trend_alerts),
+            'html': render_template('panels/trend_alerts.html', trend_alerts=trend_alerts)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@dashboard_bp.route('/dashboard/panels/inventory-alerts')
+def inventory_alerts_panel():
+    """메인 대시보드 재고 알림 패널 HTML"""
+    try:
+        alert_rows = dashboard_inventory_alerts(_dashboard_frame(), get_pareto_days())
+        alert_df = pd.DataFrame(alert_rows) if alert_rows else None
+        return jsonify({
+            'count': len(alert_rows),
+            'html': render_template('panels/inventory_alerts.html', alert_df=alert_df)
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @dashboard_bp.route('/dashboard/plot')
 def dashboard_plot():
-    df = load_from_db()
-    all_dates = sorted(pd.to_datetime(df['판매일자']).unique()) if not df.empty else []
+    sales_frame = get_sales_frame()
+    df = sales_frame.df
+    all_dates = sorted(df['판매일자'].unique()) if not df.empty else []
     product = request.args.get('product')
-    product_list = sorted(df['품명'].unique()) if not df.empty else []
+    product_list = sales_frame.products
     if product and product in product_list:
-        filtered_df = df[df['품명'] == product]
+        filtered_frame = sales_frame.select(product)
+        filtered_df = filtered_frame.df
         stats = {
             'product_total_sales': int(filtered_df['실판매'].sum()),
             'product_current_stock': int(filtered_df['현재고'].sum()),
-            'product_7days_sales': int(filtered_df.tail(7)['실판매'].sum()),
+            'product_7days_sales': int(filtered_df.iloc[filtered_frame.date_order[-7:]]['실판매'].sum()),
         }
-        plots = create_visualizations(filtered_df, only_product=True, all_dates=all_dates)
+        plots = create_visualizations(filtered_frame, only_product=True, all_dates=all_dates, cache_scope=('plot', product, None))
         return jsonify({
             'plot': plots['sales_trend'],
             'stats': stats,
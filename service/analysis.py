@@ -1,25 +1,29 @@
 import pandas as pd
 import numpy as np
-from datetime import timedelta
 from service.trend_calculator import TrendCalculator  # 추가
 from service.column_validator import ColumnValidator  # 컬럼 검증 추가
+from service.sales_frame import SalesFrame, frame_of, DAY_NAMES
+from service.executor import run_range_jobs
+from service.db import get_alert_results, save_alert_results, invalidate_alert_results
+from service.pareto_sketch import product_sales_ranking
+from service.calendar_analysis import week_weekday_sales, recent_daily_sales
+from service.trend_stream import TREND_STREAM_WINDOW, sku_accumulator, trailing_trend_bands
 
-def pareto_analysis(df):
-    """파레토 분석 - 상위 20% 상품 추출"""
-    product_sales = df.groupby('품명')['실판매'].sum().sort_values(ascending=False)
-    total_sales = product_sales.sum()
+def pareto_analysis(df, mode=None):
+    """파레토 분석 - 상위 20% 상품 추출 (mode: exact/sketch, 기본값은 PARETO_MODE)"""
+    product_sales, total_sales = product_sales_ranking(df, mode)
     cumulative_percentage = (product_sales.cumsum() / total_sales * 100)
     top_20_products = cumulative_percentage[cumulative_percentage <= 20].index.tolist()
     return top_20_products, product_sales, cumulative_percentage
 
 def pareto_analysis_current_year(df):
     """올해(2025년) 데이터 기준 파레토 분석 - 상위 20% 상품 추출"""
-    if df.empty:
+    sales_frame = SalesFrame.wrap(df)
+    if sales_frame.empty:
         return [], pd.Series(), pd.Series()
     
     # 올해(2025년) 데이터만 필터링
-    df['판매일자'] = pd.to_datetime(df['판매일자'])
-    current_year_df = df[df['판매일자'].dt.year == 2025]
+    current_year_df = sales_frame.year(2025).df
     
     if current_year_df.empty:
         return [], pd.Series(), pd.Series()
@@ -32,6 +36,7 @@ def pareto_analysis_current_year(df):
 
 def color_pareto_analysis(df):
     """컬러별 파레토 분석 - 상품-컬러 조합으로 파레토 분석"""
+    df = frame_of(df)
     if df.empty or '칼라' not in df.columns:
         return []
     
@@ -54,10 +59,10 @@ def color_pareto_analysis(df):
 
 def color_pareto_analysis_current_year(df):
     """올해(2025년) 데이터 기준 컬러별 파레토 분석 - (상품명, 컬러명) 튜플 리스트 반환"""
-    if df.empty or '칼라' not in df.columns:
+    sales_frame = SalesFrame.wrap(df)
+    if sales_frame.empty or '칼라' not in sales_frame.df.columns:
         return []
-    df['판매일자'] = pd.to_datetime(df['판매일자'])
-    current_year_df = df[df['판매일자'].dt.year == 2025]
+    current_year_df = sales_frame.year(2025).df
     if current_year_df.empty:
         return []
     color_sales = current_year_df.groupby(['품명', '칼라'])['실판매'].sum().reset_index()
@@ -70,171 +75,249 @@ def color_pareto_analysis_current_year(df):
     return pareto_color_products
 
 def weekly_analysis(df):
-    """주별 분석"""
-    df['판매일자'] = pd.to_datetime(df['판매일자'])
-    df['주차'] = df['판매일자'].dt.isocalendar().week
-    df['요일'] = df['판매일자'].dt.day_name()
-    weekly_sales = df.groupby(['주차', '요일'])['실판매'].sum().reset_index()
-    return weekly_sales
+    """주별 분석 (주차, 요일, 실판매 - 주차/요일 순)"""
+    result = week_weekday_sales(df)
+    # 행이 있는 주차 × 요일 칸만 표시
+    week_idx, weekday = np.nonzero(result['rows'])
+    return pd.DataFrame({
+        '주차': result['weeks'][week_idx],
+        '요일': DAY_NAMES[weekday],
+        '실판매': result['sales'][week_idx, weekday].astype(_sales_dtype(df)),
+    })
+
+def _sales_dtype(df):
+    """실판매 컬럼 dtype (정수 컬럼이면 집계 결과도 정수로 표시)"""
+    sales = frame_of(df)['실판매']
+    return sales.dtype if pd.api.types.is_numeric_dtype(sales) else 'float64'
 
 def recent_7days_analysis(df):
-    """최근 7일간 업로드된 데이터 분석"""
-    df['판매일자'] = pd.to_datetime(df['판매일자'])
-    
-    # 최근 7일 데이터만 필터링
-    latest_date = df['판매일자'].max()
-    seven_days_ago = latest_date - timedelta(days=6)
-    recent_df = df[df['판매일자'] >= seven_days_ago].copy()
-    
-    if recent_df.empty:
+    """최근 7일간 업로드된 데이터 분석 (일별 판매량, 요일별 판매량)"""
+    result = recent_daily_sales(df, 7)
+    if result is None:
         return None, None
     
     # 일별 판매량
-    daily_sales = recent_df.groupby('판매일자')['실판매'].sum().reset_index()
-    daily_sales = daily_sales.sort_values('판매일자')
-    
-    # 요일별 판매량 (최근 7일 기준)
-    recent_df['요일'] = recent_df['판매일자'].dt.day_name()
-    day_sales = recent_df.groupby('요일')['실판매'].sum().reset_index()
+    daily_sales = pd.DataFrame({
+        '판매일자': pd.to_datetime(result['dates']).astype(frame_of(df)['판매일자'].dtype),
+        '실판매': result['sales'].astype(_sales_dtype(df)),
+    })
+    
+    # 요일별 판매량 (최근 7일 기준, 판매일이 있는 요일만)
+    weekdays = np.unique((result['dates'].astype('int64') + 3) % 7)
+    day_sales = pd.DataFrame({
+        '요일': DAY_NAMES[weekdays],
+        '실판매': result['weekday_sales'][weekdays].astype(_sales_dtype(df)),
+    })
     
     return daily_sales, day_sales
 
-def generate_inventory_alerts(df, pareto_color_products=None):
-    """재고 알림 생성 (파레토 상품-컬러만)"""
+def generate_inventory_alerts(df, pareto_color_products=None, use_saved=False):
+    """재고 알림 생성 (파레토 상품-컬러만, use_saved=True이면 저장된 결과에서 변경된 SKU만 재계산)"""
     # 컬럼 검증 추가
-    is_valid, missing_columns = ColumnValidator.validate_analysis_columns(df)
+    is_valid, missing_columns = ColumnValidator.validate_analysis_columns(frame_of(df))
     if not is_valid:
         print(f"경고: 분석에 필요한 컬럼이 누락되었습니다. 누락된 컬럼: {missing_columns}")
         return []  # 빈 리스트 반환하여 오류 방지
     
-    alert_rows = []
-    plot_products = []
-    trend_calculator = TrendCalculator(window=7, frac=0.2)  # LOWESS 기반 중간선 계산기
+    sales_frame = SalesFrame.wrap(df)
+    if '실판매' not in sales_frame.df.columns or '현재고' not in sales_frame.df.columns:
+        return []
 
-    # 파레토 상품-컬러 튜플만 필터링
+    # 파레토 상품-컬러 튜플만 대상으로 SKU 행 범위 선택
+    sku_ranges = sales_frame.sku_ranges
     if pareto_color_products is not None:
-        filter_mask = df.apply(lambda row: (row['품명'], row['칼라']) in pareto_color_products, axis=1)
-        df = df[filter_mask]
-
-    for (prod, color) in df[['품명', '칼라']].drop_duplicates().itertuples(index=False):
-        sub = df[(df['품명'] == prod) & (df['칼라'] == color)].sort_values('판매일자')
-        if len(sub) >= 2:
-            sales = sub['실판매'].astype(float).values
-            if np.ptp(sales) > 0:
-                plot_products.append((prod, color))
-
-    for (prod, color) in plot_products:
-        sub = df[(df['품명'] == prod) & (df['칼라'] == color)].sort_values('판매일자')
-        if sub.empty or '실판매' not in sub.columns or '현재고' not in sub.columns:
-            continue
-        sales = sub['실판매'].astype(float).values
-        if len(sales) < 2:
-            continue
-        x = np.arange(len(sales))
-        # LOWESS 기반 중간선 계산
-        mid_trend_arr = trend_calculator.mid_trend(sales)
-        mid_pred = float(mid_trend_arr[-1]) if len(mid_trend_arr) > 0 else 0
-        cur_stock = sub['현재고'].iloc[-1]
-        try:
-            cur_stock = float(cur_stock)
-        except:
-            cur_stock = 0
-        lack = max(0, int(round(mid_pred - cur_stock)))
-        order_suggestion = f"{lack}개 발주 필요" if lack > 0 else "충분"
-        if len(sales) >= 3:
-            recent_trend = np.mean(sales[-3:]) - np.mean(sales[-6:-3]) if len(sales) >= 6 else sales[-1] - sales[0]
-            if recent_trend > 0:
-                trend = '증가'
-            elif recent_trend < 0:
-                trend = '감소'
-            else:
-                trend = '유지'
+        target_skus = [key for key in dict.fromkeys(pareto_color_products) if key in sku_ranges]
+    else:
+        target_skus = list(sku_ranges)
+
+    def compute(keys):
+        jobs = [(key, *sku_ranges[key]) for key in keys]
+        arrays = sales_frame.column_arrays()
+        store = sales_frame.rolling_store()
+        recent_means = {key: store.trailing_mean(key, 7) for key in keys}
+        # SKU별 최근 판매 행 중간선 (전체 카탈로그 프레임은 저장된 추세 누적기에서 변경된 SKU만 갱신)
+        mid_preds = {key: mid for key, (_, mid, _) in trailing_trend_bands(sales_frame, keys).items()}
+        return run_range_jobs(inventory_alert_row, arrays, jobs, {'recent_means': recent_means, 'mid_preds': mid_preds})
+
+    if use_saved:
+        return _saved_alert_rows('inventory', sales_frame, target_skus, compute, lambda row: (row['품명'], row['칼라']))
+    return compute(target_skus)
+
+def inventory_alert_row(key, columns, recent_means=None, mid_preds=None):
+    """SKU 1개의 재고 알림 행 계산 (columns: 날짜순 정렬된 실판매/현재고/판매일자 배열,
+    recent_means: 키별 최근 7일 평균, mid_preds: 키별 최근 판매 행 끝점 LOWESS 중간선 값)"""
+    prod, color = key
+    sales = columns['실판매']
+    if len(sales) < 2 or np.ptp(sales) <= 0:
+        return None
+    if mid_preds is not None and key in mid_preds:
+        mid_pred = mid_preds[key]
+    else:
+        # 최근 판매 행 창(현재고/최근 7일 평균과 같은 행 단위)의 끝점 LOWESS 중간선 계산
+        accumulator = sku_accumulator(columns, 0, len(sales), TREND_STREAM_WINDOW)
+        mid_pred = float(TrendCalculator().trailing_bands(accumulator.values)[1])
+    cur_stock = float(columns['현재고'][-1])
+    if np.isnan(cur_stock):
+        cur_stock = 0
+    lack = max(0, int(round(mid_pred - cur_stock)))
+    order_suggestion = f"{lack}개 발주 필요" if lack > 0 else "충분"
+    if len(sales) >= 3:
+        recent_trend = np.mean(sales[-3:]) - np.mean(sales[-6:-3]) if len(sales) >= 6 else sales[-1] - sales[0]
+        if recent_trend > 0:
+            trend = '증가'
+        elif recent_trend < 0:
+            trend = '감소'
         else:
             trend = '유지'
-        sub['판매일자'] = pd.to_datetime(sub['판매일자'])
-        last_date = sub['판매일자'].max()
-        # 최근 7일 평균 판매량 기준 소진예상일 계산
-        recent7 = sub[sub['판매일자'] >= last_date - pd.Timedelta(days=6)]
-        avg7 = recent7['실판매'].mean() if not recent7.empty else 0.0
-        if avg7 > 0:
-            days_left = cur_stock / avg7
-        else:
-            days_left = np.inf
-        if days_left <= 3:
-            alert_level = '위험'
-        elif days_left <= 7:
-            alert_level = '주의'
-        else:
-            alert_level = '안정'
-        alert_rows.append({
-            '날짜': str(last_date.date()),
-            '상품명': f"{prod} - {color}",
-            '품명': prod,
-            '칼라': color,
-            '최근 판매 경향': trend,
-            '중간선': int(round(mid_pred)),
-            '현재고': int(round(cur_stock)),
-            '부족수량': lack,
-            '발주제안': order_suggestion,
-            '소진예상일': round(days_left, 1) if days_left != np.inf else '-',
-            '경고등급': alert_level
-        })
-    return alert_rows
-
-def generate_a_grade_alerts(df):
-    """A급 상품 알림 생성 (파레토 A급 + 소진임박)"""
+    else:
+        trend = '유지'
+    dates = columns['판매일자']
+    last_date = dates[-1]
+    # 최근 7일 평균 판매량 기준 소진예상일 계산
+    avg7 = _recent_mean(key, sales, dates, recent_means)
+    if avg7 > 0:
+        days_left = cur_stock / avg7
+    else:
+        days_left = np.inf
+    if days_left <= 3:
+        alert_level = '위험'
+    elif days_left <= 7:
+        alert_level = '주의'
+    else:
+        alert_level = '안정'
+    return {
+        '날짜': str(np.datetime_as_string(last_date, unit='D')),
+        '상품명': f"{prod} - {color}",
+        '품명': prod,
+        '칼라': color,
+        '최근 판매 경향': trend,
+        '중간선': int(round(mid_pred)),
+        '현재고': int(round(cur_stock)),
+        '부족수량': lack,
+        '발주제안': order_suggestion,
+        '소진예상일': round(days_left, 1) if days_left != np.inf else '-',
+        '경고등급': alert_level
+    }
+
+def generate_a_grade_alerts(df, use_saved=False):
+    """A급 상품 알림 생성 (파레토 A급 + 소진임박, use_saved=True이면 저장된 결과에서 변경된 상품만 재계산)"""
     # 컬럼 검증 추가
-    is_valid, missing_columns = ColumnValidator.validate_analysis_columns(df)
+    is_valid, missing_columns = ColumnValidator.validate_analysis_columns(frame_of(df))
     if not is_valid:
         print(f"경고: A급 상품 분석에 필요한 컬럼이 누락되었습니다. 누락된 컬럼: {missing_columns}")
         return []  # 빈 리스트 반환하여 오류 방지
     
+    sales_frame = SalesFrame.wrap(df)
+    if '실판매' not in sales_frame.df.columns or '현재고' not in sales_frame.df.columns:
+        return []
     # 파레토 A급 + 소진임박(7일 이하) 상품만 추출
-    top_20_products, product_sales, cumulative_percentage = pareto_analysis(df)
+    top_20_products, product_sales, cumulative_percentage = pareto_analysis(sales_frame)
     total_sales = product_sales.sum()
     cum_perc = (product_sales.cumsum() / total_sales * 100)
     a_grade = cum_perc[cum_perc <= 80].index.tolist()
-    alert_rows = []
-    for prod in a_grade:
-        sub = df[df['품명'] == prod].sort_values('판매일자')
-        if sub.empty or '실판매' not in sub.columns or '현재고' not in sub.columns:
-            continue
-        sub['판매일자'] = pd.to_datetime(sub['판매일자'])
-        last_date = sub['판매일자'].max()
-        cur_stock = sub['현재고'].iloc[-1]
-        try:
-            cur_stock = float(cur_stock)
-        except:
-            cur_stock = 0
-        recent7 = sub[sub['판매일자'] >= last_date - pd.Timedelta(days=6)]
-        avg7 = recent7['실판매'].mean() if not recent7.empty else 0.0
-        if avg7 > 0:
-            days_left = cur_stock / avg7
-        else:
-            days_left = np.inf
-        if days_left <= 7:
-            alert_rows.append({
-                '날짜': str(last_date.date()),
-                '상품명': prod,
-                '현재고': int(round(cur_stock)),
-                '최근7일평균판매': round(avg7, 1),
-                '소진예상일': round(days_left, 1) if days_left != np.inf else '-',
-            })
-    return alert_rows
-
-def search_products(query, products):
-    """상품명 검색"""
+    product_ranges = sales_frame.product_ranges
+    target_products = [prod for prod in a_grade if prod in product_ranges]
+
+    def compute(products):
+        jobs = [(prod, *product_ranges[prod]) for prod in products]
+        store = sales_frame.rolling_store()
+        recent_means = {prod: store.trailing_mean(prod, 7) for prod in products}
+        return run_range_jobs(a_grade_alert_row, sales_frame.column_arrays(), jobs, {'recent_means': recent_means})
+
+    if use_saved:
+        # 상품 단위 알림은 칼라 = ''로 저장
+        return _saved_alert_rows('a_grade', sales_frame, [(prod, '') for prod in target_products],
+                                 lambda keys: compute([prod for prod, _ in keys]), lambda row: (row['상품명'], ''))
+    return compute(target_products)
+
+def a_grade_alert_row(prod, columns, recent_means=None):
+    """상품 1개의 A급 소진임박 알림 행 계산 (소진예상일 7일 초과면 None)"""
+    # 상품 범위는 컬러별로 정렬되어 있으므로 날짜순으로 다시 정렬
+    order = np.argsort(columns['판매일자'], kind='stable')
+    dates = columns['판매일자'][order]
+    sales = columns['실판매'][order]
+    last_date = dates[-1]
+    cur_stock = float(columns['현재고'][order[-1]])
+    if np.isnan(cur_stock):
+        cur_stock = 0
+    avg7 = _recent_mean(prod, sales, dates, recent_means)
+    if avg7 > 0:
+        days_left = cur_stock / avg7
+    else:
+        days_left = np.inf
+    if days_left > 7:
+        return None
+    return {
+        '날짜': str(np.datetime_as_string(last_date, unit='D')),
+        '상품명': prod,
+        '현재고': int(round(cur_stock)),
+        '최근7일평균판매': round(avg7, 1),
+        '소진예상일': round(days_left, 1) if days_left != np.inf else '-',
+    }
+
+def _saved_alert_rows(kind, sales_frame, keys, compute, key_of):
+    """저장된 알림 행 재사용 - 변경 기록으로 무효화된 키와 아직 계산되지 않은 키만 compute로 계산해 저장
+
+    알림 행은 해당 SKU/상품 자신의 행만으로 계산되므로(최근 7일 기준일도 자신의 마지막 판매일),
+    변경 기록에 없는 키의 저장된 결과는 그대로 유효하다.
+    """
+    invalidate_alert_results(sales_frame.change_id)
+    saved = get_alert_results(kind, keys)
+    missing = [key for key in keys if key not in saved]
+    if missing:
+        computed = {key_of(row): row for row in compute(missing)}
+        fresh = {key: computed.get(key) for key in missing}
+        # 그 사이 다른 요청이 더 새 데이터를 반영했으면 저장하지 않음 (이번 응답에는 그대로 사용)
+        save_alert_results(kind, fresh, sales_frame.change_id)
+        saved.update(fresh)
+    return [saved[key] for key in keys if saved[key] is not None]
+
+def _recent_mean(key, sales, dates, recent_means=None):
+    """최근 7일 행 평균 판매량 (미리 계산된 값이 있으면 사용, 없으면 배열에서 계산)"""
+    if recent_means is not None and key in recent_means:
+        return recent_means[key]
+    recent7 = sales[dates >= dates.max() - np.timedelta64(6, 'D')]
+    return float(recent7.mean()) if len(recent7) > 0 else 0.0
+
+def generate_weekly_trend_alerts(df, products):
+    """상품별 주별 판매량이 전년 추세선을 벗어난 주차 알림 생성 (메인 대시보드용)"""
+    sales_frame = SalesFrame.wrap(df)
+    product_ranges = sales_frame.product_ranges
+    jobs = [(prod, *product_ranges[prod]) for prod in products if prod in product_ranges]
+    alerts = []
+    for product_alerts in run_range_jobs(weekly_trend_alerts_for_product, sales_frame.column_arrays(), jobs):
+        alerts.extend(product_alerts)
+    return alerts
+
+def weekly_trend_alerts_for_product(prod, columns):
+    """상품 1개의 주별 추세 이탈 알림 목록 계산 (차트 설정 없이 53칸 주차 배열로만 계산)"""
+    from service.charts import weekly_sales_trend_alerts
+    sales = columns['실판매']
+    # 실판매는 정수 컬럼이므로 float 배열을 정수로 되돌려 알림 메시지 표기를 유지
+    if not np.isnan(sales).any() and np.array_equal(sales, np.round(sales)):
+        sales = sales.astype('int64')
+    product_alerts = weekly_sales_trend_alerts(columns['판매일자'], sales)
+    # 상품명을 알림 메시지에 추가
+    for alert in product_alerts:
+        alert['product'] = prod
+        alert['message'] = f"[{prod}] {alert['message']}"
+    return product_alerts
+
+def search_products(query, products, index=None):
+    """상품명 검색 (index: SalesFrame.name_index()가 있으면 n-gram 인덱스로 조회, 결과는 products 순서 유지)"""
     if not query:
         return products
+    if index is not None:
+        matched = {product for _, product, _ in index.search(query, limit=None, products_only=True)}
+        return [p for p in products if p in matched]
     return [p for p in products if query.lower() in p.lower()]
 
-def get_pareto_products(df):
-    """파레토 상품 목록 반환 (상품별)"""
-    if df.empty:
+def get_pareto_products(df, mode=None):
+    """파레토 상품 목록 반환 (상품별, mode: exact/sketch, 기본값은 PARETO_MODE)"""
+    if frame_of(df).empty:
         return []
     
-    product_sales = df.groupby('품명')['실판매'].sum().sort_values(ascending=False)
-    total_sales = product_sales.sum()
+    product_sales, total_sales = product_sales_ranking(df, mode)
     cumulative_percentage = (product_sales.cumsum() / total_sales * 100)
     
     # 80% 기준으로 파레토 상품 선택
@@ -243,12 +326,12 @@ def get_pareto_products(df):
 
 def get_pareto_products_current_year(df):
     """올해(2025년) 데이터 기준 파레토 상품 목록 반환 (상품별)"""
-    if df.empty:
+    sales_frame = SalesFrame.wrap(df)
+    if sales_frame.empty:
         return []
     
     # 올해(2025년) 데이터만 필터링
-    df['판매일자'] = pd.to_datetime(df['판매일자'])
-    current_year_df = df[df['판매일자'].dt.year == 2025]
+    current_year_df = sales_frame.year(2025).df
     
     if current_year_df.empty:
         return []
@@ -263,7 +346,7 @@ def get_pareto_products_current_year(df):
 
 def get_pareto_products_by_category(df):
     """상품별/컬러별 파레토 상품 목록 반환"""
-    if df.empty:
+    if frame_of(df).empty:
         return {'products': [], 'colors': []}
     
     # 상품별 파레토
@@ -279,6 +362,7 @@ def get_pareto_products_by_category(df):
 
 def get_pareto_products_by_category_current_year(df):
     """올해(2025년) 데이터 기준 상품별/컬러별 파레토 상품 목록 반환"""
+    df = SalesFrame.wrap(df)
     if df.empty:
         return {'products': [], 'colors': []}
     
@@ -297,41 +381,42 @@ def get_product_stats(df, product_name, color_name=None):
     """
     선택된 상품(및 선택된 컬러)의 누적 판매량, 현재고(가장 최근 날짜), 최근 7일 판매량을 반환
     """
-    if df.empty or product_name not in df['품명'].unique():
-        return {
-            'product_total_sales': 0,
-            'product_current_stock': 0,
-            'product_7days_sales': 0
+    key = (product_name, color_name) if color_name else product_name
+    return get_product_stats_batch(df, [key])[key]
+
+def get_product_stats_batch(df, keys):
+    """
+    여러 상품/상품-컬러의 누적 판매량, 현재고(가장 최근 날짜), 최근 7일 판매량을 한 번에 계산
+    keys: 품명 문자열 또는 (품명, 칼라) 튜플 목록 (혼합 가능)
+    반환: {key: get_product_stats와 같은 형식의 dict}
+    """
+    keys = list(dict.fromkeys(keys))
+    results = {
+        key: {'product_total_sales': 0, 'product_current_stock': 0, 'product_7days_sales': 0}
+        for key in keys
+    }
+    sales_frame = SalesFrame.wrap(df)
+    if sales_frame.empty or not keys:
+        return results
+
+    # 누적합 저장소 조회 (키별 O(1))
+    store = sales_frame.rolling_store()
+    for key in keys:
+        if key not in store.rows:
+            continue
+        results[key] = {
+            'product_total_sales': int(store.total_sum(key)),
+            'product_current_stock': int(store.current_stock(key)),
+            'product_7days_sales': int(store.trailing_sum(key, 7))
         }
-    if color_name:
-        product_df = df[(df['품명'] == product_name) & (df['칼라'] == color_name)].copy()
-    else:
-        product_df = df[df['품명'] == product_name].copy()
-    # 누적 판매량
-    total_sales = product_df['실판매'].sum()
-    # 날짜 컬럼 변환
-    product_df['판매일자'] = pd.to_datetime(product_df['판매일자'])
-    # 현재고: 가장 최근 날짜의 모든 행의 현재고 합산
-    latest_date = product_df['판매일자'].max()
-    latest_rows = product_df[product_df['판매일자'] == latest_date]
-    current_stock = latest_rows['현재고'].sum() if not latest_rows.empty else 0
-    # 최근 7일 판매량
-    last_7_days = latest_date - pd.Timedelta(days=6)
-    sales_7days = product_df[product_df['판매일자'] >= last_7_days]['실판매'].sum()
-    return {
-        'product_total_sales': int(total_sales),
-        'product_current_stock': int(current_stock),
-        'product_7days_sales': int(sales_7days)
-    } 
+    return results
 
 def get_pareto_products_date_specified(df, days):
     """지정된 일수 기준 파레토 상품 목록 반환 (상품별)"""
+    df = SalesFrame.wrap(df).df
     if df.empty:
         return []
     
-    # 날짜 컬럼 변환
-    df['판매일자'] = pd.to_datetime(df['판매일자'])
-    
     # 최신 날짜부터 지정된 일수만큼의 데이터만 필터링
     latest_date = df['판매일자'].max()
     start_date = latest_date - pd.Timedelta(days=days)
@@ -356,12 +441,10 @@ def get_pareto_products_date_specified(df, days):
 
 def color_pareto_analysis_date_specified(df, days):
     """지정된 일수 기준 컬러별 파레토 분석 - (상품명, 컬러명) 튜플 리스트 반환"""
+    df = SalesFrame.wrap(df).df
     if df.empty or '칼라' not in df.columns:
         return []
     
-    # 날짜 컬럼 변환
-    df['판매일자'] = pd.to_datetime(df['판매일자'])
-    
     # 최신 날짜부터 지정된 일수만큼의 데이터만 필터링
     latest_date = df['판매일자'].max()
     start_date = latest_date - pd.Timedelta(days=days)
@@ -390,6 +473,7 @@ def color_pareto_analysis_date_specified(df, days):
 
 def get_pareto_products_by_category_date_specified(df, days):
     """지정된 일수 기준 상품별/컬러별 파레토 상품 목록 반환"""
+    df = SalesFrame.wrap(df)
     if df.empty:
         return {'products': [], 'colors': []}
     
@@ -402,4 +486,4 @@ def get_pareto_products_by_category_date_specified(df, days):
     return {
         'products': product_pareto,
         'colors': color_pareto
-    } 
\ No newline at end of file
+    } 
\ No newline at end of file
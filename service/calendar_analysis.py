@@ -0,0 +1,104 @@
+"""
+달력 기준 판매 분석 모듈
+단일 책임: 정수 키(ISO 주차, 요일번호 0=월요일)와 bincount 집계로 주별/요일별/최근 N일 판매량 배열 계산
+
+문자열 요일명/그룹 키 없이 SalesFrame의 준비된 달력 컬럼만 사용하며, 결과는 numpy 배열 dict로 반환한다.
+"""
+import numpy as np
+import pandas as pd
+from service.sales_frame import SalesFrame
+from service.rolling_store import TOTAL_KEY
+
+ISO_WEEKS = 53
+
+
+def _sales_array(df):
+    return pd.to_numeric(df['실판매'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+
+
+def week_weekday_sales(df):
+    """ISO 주차 × 요일 판매량
+
+    Returns:
+        dict: weeks(행이 있는 ISO 주차, 오름차순), sales((주차 수, 7) 요일별 합계), rows((주차 수, 7) 행 수)
+    """
+    sales_frame = SalesFrame.wrap(df)
+    if sales_frame.empty:
+        return {'weeks': np.array([], dtype='int64'), 'sales': np.zeros((0, 7)), 'rows': np.zeros((0, 7), dtype='int64')}
+    frame = sales_frame.df
+    week_index = frame['ISO주차'].to_numpy(dtype='int64') - 1
+    weekday = frame['요일번호'].to_numpy(dtype='int64')
+    cells = week_index * 7 + weekday
+    totals = np.bincount(cells, weights=_sales_array(frame), minlength=ISO_WEEKS * 7).reshape(ISO_WEEKS, 7)
+    rows = np.bincount(cells, minlength=ISO_WEEKS * 7).reshape(ISO_WEEKS, 7)
+    present = rows.sum(axis=1) > 0
+    return {
+        'weeks': np.flatnonzero(present) + 1,
+        'sales': totals[present],
+        'rows': rows[present],
+    }
+
+
+def recent_daily_sales(df, days=7):
+    """최근 days일 일별/요일별 판매량 (전체 마지막 판매일 기준, 판매 행이 있는 날짜만)
+
+    Returns:
+        dict: dates(datetime64[D]), sales(일별 합계), weekday_sales(요일번호별 합계, 길이 7)
+        데이터가 없으면 None
+    """
+    sales_frame = SalesFrame.wrap(df)
+    if sales_frame.empty:
+        return None
+    dates, sales, counts = sales_frame.rolling_store().daily_values(TOTAL_KEY, days)
+    has_rows = counts > 0
+    if not has_rows.any():
+        return None
+    dates, sales = dates[has_rows], sales[has_rows]
+    # datetime64[D]는 1970-01-01(목요일) 기준 일수 → (일수 + 3) % 7 = 요일번호(0=월요일)
+    weekday = (dates.astype('int64') + 3) % 7
+    return {
+        'dates': dates,
+        'sales': sales,
+        'weekday_sales': np.bincount(weekday, weights=sales, minlength=7),
+    }
+
+
+def weekday_profiles(df):
+    """SKU별 요일 계절성 프로파일 (한 번의 bincount로 전체 SKU 계산)
+
+    각 SKU의 첫 판매일~마지막 판매일 사이 모든 날짜(판매 없는 날은 0)를 기준으로
+    요일별 일평균 판매량과, 이를 전체 일평균으로 나눈 지수(1.0 = 평균적인 요일)를 계산한다.
+
+    Returns:
+        dict: keys([(품명, 칼라)]), weekday_mean((SKU 수, 7)), profile((SKU 수, 7))
+    """
+    sales_frame = SalesFrame.wrap(df)
+    sku_ranges = sales_frame.sku_ranges
+    keys = list(sku_ranges)
+    if not keys:
+        return {'keys': [], 'weekday_mean': np.zeros((0, 7)), 'profile': np.zeros((0, 7))}
+
+    frame = sales_frame.df
+    bounds = np.array([sku_ranges[key] for key in keys], dtype='int64')
+    # SKU 행 범위 밖(품명/칼라 결측) 행은 집계에서 제외
+    codes = np.full(len(frame), -1, dtype='int64')
+    for code, (start, stop) in enumerate(bounds):
+        codes[start:stop] = code
+    valid = codes >= 0
+    weekday = frame['요일번호'].to_numpy(dtype='int64')
+    totals = np.bincount(codes[valid] * 7 + weekday[valid], weights=_sales_array(frame)[valid],
+                         minlength=len(keys) * 7).reshape(len(keys), 7)
+
+    # SKU 범위는 날짜순 정렬이므로 첫 행/마지막 행이 첫/마지막 판매일
+    days = frame['판매일자'].to_numpy(dtype='datetime64[D]').astype('int64')
+    first, last = days[bounds[:, 0]], days[bounds[:, 1] - 1]
+    span = last - first + 1
+    first_weekday = (first + 3) % 7
+    # 기간 내 요일별 날짜 수 = 완전한 주 수 + 남은 날에 포함되는지 여부
+    offset = (np.arange(7)[None, :] - first_weekday[:, None]) % 7
+    day_counts = (span // 7)[:, None] + (offset < (span % 7)[:, None])
+
+    weekday_mean = np.divide(totals, day_counts, out=np.zeros_like(totals), where=day_counts > 0)
+    daily_mean = totals.sum(axis=1) / span
+    profile = np.divide(weekday_mean, daily_mean[:, None], out=np.zeros_like(totals), where=daily_mean[:, None] != 0)
+    return {'keys': keys, 'weekday_mean': weekday_mean, 'profile': profile}
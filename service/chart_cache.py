@@ -0,0 +1,94 @@
+"""
+차트 데이터 캐시 모듈
+단일 책임: ECharts 차트 데이터를 (차트 종류, 범위(상품/컬러), 데이터 버전, 날짜, 비교 파일 지문 등) 키로 LRU 보관
+
+- 크기 상한은 항목 수가 아니라 직렬화 크기(pickle 바이트) 합계 기준 (CHART_CACHE_BYTES)
+- 데이터 버전이 키에 들어가므로 업로드/삭제 후에는 자동으로 새 키가 되고, 이전 버전 항목은 LRU로 밀려남
+- 메모리에 없으면 업로드 후 미리 만든 스냅샷(chart_snapshots 테이블, chart_snapshots.py)을 먼저 찾고 없을 때만 생성
+- 반환되는 차트 데이터는 캐시와 공유하므로 호출한 쪽에서 수정하지 않는다
+"""
+import os
+import json
+import pickle
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from service.db import get_chart_snapshot
+
+# 차트 캐시 크기 상한 (바이트, 기본 64MB)
+CHART_CACHE_BYTES = int(os.environ.get('CHART_CACHE_BYTES', 64 * 1024 * 1024))
+
+_charts = OrderedDict()
+_chart_counts = {'hits': 0, 'snapshot_hits': 0, 'misses': 0, 'bytes': 0}
+# 요청 스레드와 스냅샷 생성 스레드가 같이 쓰므로 목록 갱신은 잠금 안에서 (차트 생성은 잠금 밖)
+_lock = threading.Lock()
+# 스레드별 기록 중인 {캐시 키 JSON: 차트 데이터 pickle} (recording() 안에서만)
+_local = threading.local()
+
+
+def snapshot_key(key):
+    """캐시 키 → 스냅샷 테이블 키 (JSON 문자열)"""
+    return json.dumps(key, ensure_ascii=False)
+
+
+def _store(key, payload, data, counter):
+    """메모리 LRU에 저장 (data: payload의 pickle, 상한을 넘으면 오래된 항목부터 제거, counter: 같은 잠금 안에서 올릴 횟수 항목)"""
+    size = len(data)
+    with _lock:
+        _chart_counts[counter] += 1
+        if size > CHART_CACHE_BYTES:
+            return
+        previous = _charts.pop(key, None)
+        if previous is not None:
+            _chart_counts['bytes'] -= previous[1]
+        _charts[key] = (payload, size)
+        _chart_counts['bytes'] += size
+        while _chart_counts['bytes'] > CHART_CACHE_BYTES:
+            _, (_, evicted) = _charts.popitem(last=False)
+            _chart_counts['bytes'] -= evicted
+
+
+def cached_chart(key, build):
+    """key의 차트 데이터 반환 (메모리 → 스냅샷 → build() 순, key가 None이면 캐시하지 않음)"""
+    if key is None:
+        return build()
+    recorded = getattr(_local, 'recorded', None)
+    with _lock:
+        entry = _charts.get(key)
+        if entry is not None:
+            _charts.move_to_end(key)
+            _chart_counts['hits'] += 1
+    if entry is not None:
+        payload = entry[0]
+        if recorded is not None:
+            recorded[snapshot_key(key)] = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        return payload
+    # 스냅샷은 JSON이 아니라 pickle로 저장 (정수 키 dict/튜플 등이 그대로 복원되어 화면 출력이 같음)
+    data = get_chart_snapshot(snapshot_key(key))
+    if data is not None:
+        payload = pickle.loads(data)
+        counter = 'snapshot_hits'
+    else:
+        payload = build()
+        data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        counter = 'misses'
+    _store(key, payload, data, counter)
+    if recorded is not None:
+        recorded[snapshot_key(key)] = data
+    return payload
+
+
+@contextmanager
+def recording():
+    """이 스레드에서 조회/생성한 차트를 {캐시 키 JSON: 차트 데이터 pickle}로 모음 (스냅샷 저장용)"""
+    _local.recorded = {}
+    try:
+        yield _local.recorded
+    finally:
+        _local.recorded = None
+
+
+def chart_cache_stats():
+    """차트 캐시 적중(메모리/스냅샷)/미적중 횟수와 현재 크기"""
+    with _lock:
+        return {**_chart_counts, 'entries': len(_charts), 'capacity_bytes': CHART_CACHE_BYTES}
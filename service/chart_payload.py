@@ -0,0 +1,155 @@
+"""
+차트 전송 형식 모듈
+단일 책임: 차트 데이터를 화면 전송용 압축 열 형식(JSON)으로 변환하고 gzip/brotli로 압축
+
+형식 (static/chart_payload.js의 decodeChartPayload가 원래 ECharts config로 복원):
+- 날짜 축: 하루씩 이어지는 'YYYY-MM-DD' 목록 → {"$d": [시작일, 길이]},
+  판매일만 있는 증가 날짜 목록 → {"$d": [시작일, [이전 날짜와의 일수 차이, ...]]}
+- 숫자 라벨 축: '1'~'53'처럼 1씩 이어지는 숫자 문자열 목록 → {"$i": [시작, 길이]}
+- x축 데이터는 payload의 axes 목록에 한 번만 두고 차트에서는 {"$a": 번호}로 참조 (같은 축을 쓰는 차트끼리 공유)
+- 시리즈 데이터: 소수점 CHART_PRECISION자리 고정(정수값은 정수), 연속 None은 [개수],
+  같은 값이 3번 이상 이어지면 [개수, 값] → {"$r": [...]}
+- 서버에서만 쓰는 data(날짜/실판매/추세 원본 배열)는 보내지 않고 title, config, 주차 날짜 범위만 보냄
+"""
+import os
+import gzip
+import hashlib
+import numpy as np
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 시리즈/설정 숫자 소수점 자리수
+CHART_PRECISION = int(os.environ.get('CHART_PRECISION', 2))
+# 이 길이 이상인 시리즈만 구간 부호화 (짧은 목록은 반올림만)
+RUN_MIN_LENGTH = 8
+# 같은 값 반복을 [개수, 값]으로 묶는 최소 반복 수
+RUN_MIN_REPEAT = 3
+
+
+def _number(value):
+    """반올림한 숫자 (정수값이면 int, 유한하지 않으면 None) - 시리즈 구간 부호화와 같은 np.round 사용"""
+    value = float(value)
+    if not np.isfinite(value):
+        return None
+    value = float(np.round(value, CHART_PRECISION))
+    return int(value) if value.is_integer() else value
+
+
+def _is_number(value):
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
+def _encode_series(values):
+    """숫자/None 목록 → {"$r": [...]} (None 구간은 [개수], 같은 값 반복은 [개수, 값])"""
+    array = np.array([np.nan if value is None else value for value in values], dtype='float64')
+    array = np.where(np.isfinite(array), np.round(array, CHART_PRECISION), np.nan)
+    # 값이 바뀌는 위치로 구간 나누기 (NaN끼리는 같은 값으로 봄)
+    same = (array[1:] == array[:-1]) | (np.isnan(array[1:]) & np.isnan(array[:-1]))
+    starts = np.concatenate([[0], np.flatnonzero(~same) + 1])
+    lengths = np.diff(np.append(starts, len(array)))
+    items = []
+    for start, length in zip(starts.tolist(), lengths.tolist()):
+        value = _number(array[start])
+        if value is None:
+            items.append([length])
+        elif length >= RUN_MIN_REPEAT:
+            items.append([length, value])
+        else:
+            items.extend([value] * length)
+    return {'$r': items}
+
+
+def _encode_axis(labels):
+    """x축 라벨 목록 → 날짜/숫자 구간 표기 (해당하지 않으면 그대로)"""
+    if len(labels) < 2 or not all(isinstance(label, str) for label in labels):
+        return labels
+    if all(label.isdigit() for label in labels):
+        numbers = np.array(labels, dtype='int64')
+        if np.all(np.diff(numbers) == 1) and labels == [str(number) for number in numbers.tolist()]:
+            return {'$i': [int(numbers[0]), len(labels)]}
+        return labels
+    try:
+        days = np.array(labels, dtype='datetime64[D]')
+    except ValueError:
+        return labels
+    steps = np.diff(days).astype('int64')
+    if np.any(steps <= 0) or np.datetime_as_string(days).tolist() != labels:
+        return labels
+    if np.all(steps == 1):
+        return {'$d': [labels[0], len(labels)]}
+    return {'$d': [labels[0], steps.tolist()]}
+
+
+class _Encoder:
+    """차트 여러 개를 부호화하면서 x축 데이터를 axes 목록으로 모음"""
+
+    def __init__(self):
+        self.axes = []
+        self._axis_index = {}
+
+    def axis(self, labels):
+        """x축 데이터 → {"$a": 번호} (같은 축은 같은 번호)"""
+        encoded = _encode_axis(labels)
+        key = repr(encoded)
+        if key not in self._axis_index:
+            self._axis_index[key] = len(self.axes)
+            self.axes.append(encoded)
+        return {'$a': self._axis_index[key]}
+
+    def value(self, value, key=None):
+        """config 값 부호화 (xAxis.data는 공유 축, series[].data는 구간 부호화, 숫자는 반올림)"""
+        if isinstance(value, dict):
+            encoded = {}
+            for name, item in value.items():
+                if key == 'xAxis' and name == 'data' and isinstance(item, list):
+                    encoded[name] = self.axis(item)
+                elif key == 'series' and name == 'data' and isinstance(item, list) and len(item) >= RUN_MIN_LENGTH \
+                        and all(element is None or _is_number(element) for element in item):
+                    encoded[name] = _encode_series(item)
+                else:
+                    encoded[name] = self.value(item, name)
+            return encoded
+        if isinstance(value, (list, tuple)):
+            # xAxis/series가 목록이면 각 항목에 같은 규칙 적용
+            return [self.value(item, key) for item in value]
+        if _is_number(value):
+            return _number(value)
+        return value
+
+    def chart(self, chart):
+        """차트 데이터 → {'title', 'config'[, 'week_date_ranges']} (숫자/문자 값은 그대로)"""
+        if not isinstance(chart, dict):
+            return self.value(chart)
+        encoded = {'title': chart.get('title'), 'config': self.value(chart.get('config'))}
+        week_date_ranges = (chart.get('data') or {}).get('week_date_ranges')
+        if week_date_ranges:
+            encoded['week_date_ranges'] = {str(week): label for week, label in week_date_ranges.items()}
+        return encoded
+
+
+def encode_charts(groups):
+    """{묶음 이름: {차트 이름: 차트 데이터} 또는 None} → 전송용 dict {'axes': [...], 묶음 이름: {차트 이름: 부호화 차트}}"""
+    encoder = _Encoder()
+    payload = {}
+    for group, charts in groups.items():
+        payload[group] = None if charts is None else {name: encoder.chart(chart) for name, chart in charts.items()}
+    payload['axes'] = encoder.axes
+    return payload
+
+
+def compress(body, accepted):
+    """JSON bytes → (압축 bytes, Content-Encoding 또는 None) - accepted(Accept-Encoding) 중 brotli(설치된 경우) > gzip"""
+    if brotli is not None and 'br' in accepted:
+        return brotli.compress(body, quality=5), 'br'
+    if 'gzip' in accepted:
+        return gzip.compress(body, compresslevel=6), 'gzip'
+    return body, None
+
+
+def payload_etag(body, encoding):
+    """압축 전 본문 해시 + 압축 방식 (방식별로 본문 바이트가 다르므로 ETag도 구분)"""
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return f'{digest}-{encoding or "identity"}'
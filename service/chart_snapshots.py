@@ -0,0 +1,131 @@
+"""
+차트 스냅샷 사전 계산 모듈
+단일 책임: 업로드 후 백그라운드 스레드에서 메인 대시보드 차트와 파레토 상품/상품-컬러 상세 차트를 미리 만들어
+chart_snapshots 테이블에 저장 (업로드 직후 첫 조회도 캐시 적중)
+
+- 대시보드 라우트와 사전 계산이 같은 캐시 키를 쓰도록 차트 생성 인자는 dashboard_charts/dashboard_plots 한 곳에서 정함
+- 스냅샷 키에 데이터 버전과 날짜가 들어가므로 이후 업로드/날짜 변경 시에는 자연히 쓰이지 않고, 다음 저장 때 삭제됨
+- 생성 중에 또 업로드되면 끝난 뒤 최신 버전으로 한 번 더 생성
+- 메인 대시보드 알림 패널(추세선 알림, 재고 알림)도 같은 캐시/스냅샷에 보관 (패널 JSON 엔드포인트에서 사용)
+"""
+import threading
+from datetime import date, datetime
+from service.db import get_pareto_days, get_weekly_client_counts, load_compare_product, save_chart_snapshots
+from service.sales_frame import get_sales_frame
+from service.analysis import (get_pareto_products_by_category_date_specified, get_pareto_products_date_specified,
+                              color_pareto_analysis_date_specified, generate_weekly_trend_alerts, generate_inventory_alerts)
+from service.visualization import create_visualizations
+from service.chart_cache import cached_chart, recording
+
+# 대시보드에서 제외하는 상품
+DASHBOARD_EXCLUDE = ('(일반상품)',)
+
+_running = threading.Lock()
+_pending = threading.Event()
+
+
+def dashboard_charts(sales_frame, kinds=None):
+    """메인 대시보드 차트 (kinds: 만들 차트 종류, 없으면 전체)"""
+    return create_visualizations(sales_frame, cache_scope=('dashboard', None, None), kinds=kinds)
+
+
+def dashboard_plots(sales_frame, product, color=None, all_dates=None, compare_df=None, weekly_client_data=None, kinds=None):
+    """상품(-컬러) 상세 페이지 차트 (all_dates: 전체 판매일자 목록, 없으면 sales_frame에서 계산)"""
+    color = color or None
+    filtered_frame = sales_frame.select(product, color)
+    if all_dates is None:
+        all_dates = sorted(sales_frame.df['판매일자'].unique()) if not sales_frame.empty else []
+    return create_visualizations(filtered_frame, only_product=True, all_dates=all_dates, compare_df=compare_df,
+                                 weekly_client_data=weekly_client_data, cache_scope=('dashboard', product, color), kinds=kinds)
+
+
+def product_inputs(product, year):
+    """상품 상세 차트 추가 입력 (비교 상품 DataFrame 또는 None, year년 주차별 거래처 수)"""
+    return load_compare_product(product)[0], get_weekly_client_counts(product, year)
+
+
+def dashboard_payload(sales_frame, product=None, color=None, kinds=None):
+    """화면 차트 묶음 - 상품이 없으면 {'charts': 메인 대시보드 차트}, 있으면 {'plots': 상품(-컬러) 상세 차트}"""
+    if not product:
+        return {'charts': dashboard_charts(sales_frame, kinds)}
+    needs_inputs = kinds is None or 'sales_trend' in kinds or 'weekly_sales_trend' in kinds
+    compare_df, weekly_client_data = product_inputs(product, datetime.now().year) if needs_inputs else (None, None)
+    return {'plots': dashboard_plots(sales_frame, product, color, compare_df=compare_df,
+                                     weekly_client_data=weekly_client_data, kinds=kinds)}
+
+
+def _panel_key(kind, sales_frame, pareto_days):
+    return (kind, 'dashboard', None, None, sales_frame.version, date.today().isoformat(), pareto_days)
+
+
+def dashboard_trend_alerts(sales_frame, pareto_days):
+    """메인 대시보드 추세선 알림 (상위 10개 파레토 상품)"""
+    if sales_frame.empty:
+        return []
+
+    def build():
+        pareto_products = get_pareto_products_date_specified(sales_frame, pareto_days)
+        return generate_weekly_trend_alerts(sales_frame, pareto_products[:10])
+
+    return cached_chart(_panel_key('trend_alerts', sales_frame, pareto_days), build)
+
+
+def dashboard_inventory_alerts(sales_frame, pareto_days):
+    """메인 대시보드 재고 알림 행 목록 (파레토 상품-컬러)"""
+    if sales_frame.empty:
+        return []
+
+    def build():
+        pareto_color_products = color_pareto_analysis_date_specified(sales_frame, pareto_days)
+        return generate_inventory_alerts(sales_frame, pareto_color_products=pareto_color_products, use_saved=True)
+
+    return cached_chart(_panel_key('inventory_alerts', sales_frame, pareto_days), build)
+
+
+def build_snapshots():
+    """현재 데이터 버전의 메인/파레토 상품 차트를 만들어 저장 - 저장한 차트 수 반환"""
+    sales_frame = get_sales_frame(exclude_products=DASHBOARD_EXCLUDE)
+    if sales_frame.empty:
+        return 0
+    started = datetime.now()
+    pareto_days = get_pareto_days()
+    pareto = get_pareto_products_by_category_date_specified(sales_frame, pareto_days)
+    all_dates = sorted(sales_frame.df['판매일자'].unique())
+    current_year = started.year
+    targets = [(product, None) for product in pareto['products']] + list(pareto['colors'])
+    inputs = {}
+    with recording() as recorded:
+        dashboard_charts(sales_frame)
+        dashboard_trend_alerts(sales_frame, pareto_days)
+        dashboard_inventory_alerts(sales_frame, pareto_days)
+        for product, color in targets:
+            if product not in inputs:
+                inputs[product] = product_inputs(product, current_year)
+            dashboard_plots(sales_frame, product, color, all_dates, *inputs[product])
+    save_chart_snapshots(str(sales_frame.version), list(recorded.items()))
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"차트 스냅샷 저장: {len(recorded)}개 (상품/컬러 {len(targets)}개, {elapsed:.1f}초)")
+    return len(recorded)
+
+
+def _run():
+    while True:
+        try:
+            while _pending.is_set():
+                _pending.clear()
+                try:
+                    build_snapshots()
+                except Exception as e:
+                    print(f"차트 스냅샷 생성 중 오류: {e}")
+        finally:
+            _running.release()
+        # 잠금 해제 직전에 들어온 요청은 여기서 이어서 처리
+        if not (_pending.is_set() and _running.acquire(blocking=False)):
+            return
+
+
+def schedule_snapshots():
+    """업로드/삭제 후 호출 - 백그라운드 스레드에서 스냅샷 생성 (이미 생성 중이면 끝난 뒤 1회 더)"""
+    _pending.set()
+    if _running.acquire(blocking=False):
+        threading.Thread(target=_run, name='chart-snapshots', daemon=True).start()
@@ -0,0 +1,133 @@
+"""
+비교 상품 데이터 정렬 모듈
+단일 책임: 비교 엑셀(날짜, 판매량)을 1회 파싱해 올해 달력의 일별(연중 일 번호)/주별(ISO 주차) 오버레이 배열로 변환
+
+- 일별: 비교 날짜의 월/일을 올해 같은 월/일 칸에 매핑 (같은 월/일이 여러 번이면 가장 늦은 날짜 값,
+  올해가 평년이면 2월 29일은 제외). 같은 시각의 행은 합계
+- 주별: ISO 주차(1~53)별 합계 (연도 구분 없이 합산)
+- 값이 없는 칸은 None
+- fingerprint: 정렬 결과(연도, 일별/주별 값)의 해시 - 차트 캐시 키에서 비교 파일을 구분하는 데 사용
+"""
+import hashlib
+import json
+import numpy as np
+import pandas as pd
+from service.date_dimension import date_dimension, dimension_positions
+
+DATE_KEYWORDS = ['거래일자', '판매일자', '날짜', 'date']
+SALES_KEYWORDS = ['판매량', '실판매', '수량', 'quantity', 'sales']
+ISO_WEEKS = 53
+
+
+def _find_columns(compare_df):
+    """(날짜 컬럼, 판매량 컬럼) - 키워드 우선, 없으면 첫 컬럼/첫 숫자 컬럼/두 번째 컬럼"""
+    date_col = next((col for col in compare_df.columns
+                     if any(keyword in str(col).lower() for keyword in DATE_KEYWORDS)), None)
+    sales_col = next((col for col in compare_df.columns
+                      if any(keyword in str(col).lower() for keyword in SALES_KEYWORDS)), None)
+    if date_col is None:
+        date_col = compare_df.columns[0]
+    if sales_col is None:
+        sales_col = next((col for col in compare_df.columns
+                          if col != date_col and pd.api.types.is_numeric_dtype(compare_df[col])), None)
+        if sales_col is None:
+            sales_col = compare_df.columns[1]
+    return date_col, sales_col
+
+
+def _parse_dates(values):
+    """날짜 변환 - 문자열/날짜 형식이 안 되거나 2000년 이전이면 Unix timestamp(ms → us → ns)로 재시도"""
+    dates = pd.to_datetime(values, errors='coerce')
+    for unit in ('ms', 'us', 'ns'):
+        if not (dates.isna().all() or dates.dt.year.min() < 2000):
+            break
+        dates = pd.to_datetime(values, unit=unit, errors='coerce')
+    if dates.dt.year.min() < 2000:
+        print(f"⚠️ 경고: 1970년대 날짜 발견 - 최소 연도: {dates.dt.year.min()}")
+    return dates
+
+
+def parse_compare(compare_df):
+    """비교 엑셀의 유효 (날짜 datetime64[ns], 판매량 float64) 배열 - 마지막 행(합계 행)은 제외, 실패하면 None"""
+    if compare_df is None or compare_df.empty or len(compare_df.columns) < 2:
+        return None
+    date_col, sales_col = _find_columns(compare_df)
+    print(f"날짜 컬럼: {date_col}, 판매량 컬럼: {sales_col}")
+    try:
+        dates = _parse_dates(compare_df[date_col])
+    except Exception as e:
+        print(f"날짜 변환 중 오류: {e}")
+        return None
+    sales = pd.to_numeric(compare_df[sales_col], errors='coerce')
+    valid = (dates.notna() & sales.notna()).to_numpy()
+    dates = dates.to_numpy(dtype='datetime64[ns]')[valid]
+    sales = sales.to_numpy(dtype='float64')[valid]
+    if len(dates) == 0:
+        return None
+    # 마지막 행(합계 행) 제거 - 무조건 제거
+    return dates[:-1], sales[:-1]
+
+
+def day_of_year_slots(dates, year):
+    """날짜의 월/일을 year년의 연중 일 번호(0부터)로 변환 - year년에 없는 날짜(평년의 2월 29일)는 -1"""
+    days = dates.astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    day_in_month = (days - months).astype('int64')
+    month_number = months.astype('int64') % 12
+    # year년 각 월 1일의 연중 일 번호와 월 길이 (윤년 반영)
+    month_starts = np.arange(f'{year}-01', f'{year + 1}-02', dtype='datetime64[M]').astype('datetime64[D]')
+    offsets = (month_starts - month_starts[0]).astype('int64')
+    lengths = np.diff(offsets)
+    return np.where(day_in_month < lengths[month_number], offsets[month_number] + day_in_month, -1)
+
+
+class CompareOverlay:
+    """올해 달력에 맞춘 비교 상품 판매량 (daily: 연도 일수 길이, weekly: 53주, 값이 없으면 None)"""
+
+    def __init__(self, year, daily, weekly):
+        self.year = year
+        self.daily = daily
+        self.weekly = weekly
+        digest = hashlib.blake2b(json.dumps([year, daily, weekly]).encode(), digest_size=16)
+        self.fingerprint = digest.hexdigest()
+
+    @classmethod
+    def from_frame(cls, compare_df, year):
+        """비교 엑셀 DataFrame → CompareOverlay (유효 데이터가 없으면 None)"""
+        parsed = parse_compare(compare_df)
+        if parsed is None:
+            return None
+        dates, sales = parsed
+        n_days = date_dimension(year).year_length(year)
+
+        # 일별: 같은 시각끼리 합계 → 월/일 칸에 시각 순서대로 기록 (나중 값 우선)
+        stamps, inverse = np.unique(dates, return_inverse=True)
+        stamp_sales = np.bincount(inverse, weights=sales, minlength=len(stamps))
+        slots = day_of_year_slots(stamps, year)
+        daily = np.full(n_days, np.nan)
+        mapped = slots >= 0
+        unique_slots, last = np.unique(slots[mapped][::-1], return_index=True)
+        daily[unique_slots] = stamp_sales[mapped][::-1][last]
+
+        # 주별: ISO 주차 합계 (날짜 차원에서 조회)
+        dimension, positions = dimension_positions(dates)
+        weeks = dimension.iso_week[positions] - 1
+        weekly = np.bincount(weeks, weights=sales, minlength=ISO_WEEKS)
+        weekly = np.where(np.bincount(weeks, minlength=ISO_WEEKS) > 0, weekly, np.nan)
+
+        print(f"비교 데이터 정렬: 일별 {int(np.isfinite(daily).sum())}일, 주별 {int(np.isfinite(weekly).sum())}주")
+        to_list = lambda values: [float(v) if np.isfinite(v) else None for v in values]
+        return cls(year, to_list(daily), to_list(weekly))
+
+
+def compare_overlay(compare, year):
+    """비교 데이터(DataFrame 또는 이미 정렬된 CompareOverlay) → year년 CompareOverlay 또는 None"""
+    if isinstance(compare, CompareOverlay):
+        return compare if compare.year == year else None
+    if compare is None or compare.empty:
+        return None
+    try:
+        return CompareOverlay.from_frame(compare, year)
+    except Exception as e:
+        print(f"비교 데이터 처리 중 오류: {e}")
+        return None
@@ -0,0 +1,111 @@
+"""
+날짜 차원 모듈
+단일 책임: 연도 범위의 날짜별 달력 속성(연도, ISO 연도/주차, 요일번호, 연중 일 번호, 'YYYY-MM-DD' 라벨)과
+ISO 주차별 날짜 범위 라벨을 한 번 계산해 배열로 보관 (날짜 → 속성은 일수 인덱스 한 번으로 조회)
+
+- 범위는 요청된 연도 앞뒤 1년까지 포함 (1주차가 전년 12월에, 52/53주차가 다음 해 1월에 걸치는 ISO 주차 때문)
+- 더 넓은 연도가 필요하면 기존 범위와 합쳐 새로 만들어 교체 (만들어진 차원 객체는 수정하지 않음)
+"""
+import numpy as np
+import pandas as pd
+
+
+class DateDimension:
+    """first_year 1월 1일 ~ last_year 12월 31일의 날짜별 달력 속성 배열 (인덱스 = 시작일부터의 일수)"""
+
+    def __init__(self, first_year, last_year):
+        self.first_year = first_year
+        self.last_year = last_year
+        self.start = np.datetime64(f'{first_year}-01-01', 'D')
+        self.days = np.arange(self.start, np.datetime64(f'{last_year + 1}-01-01', 'D'))
+        index = pd.DatetimeIndex(self.days.astype('datetime64[ns]'))
+        iso = index.isocalendar()
+        self.year = index.year.to_numpy(dtype='int64')
+        self.iso_year = iso['year'].to_numpy(dtype='int64')
+        self.iso_week = iso['week'].to_numpy(dtype='int64')
+        self.weekday = index.weekday.to_numpy(dtype='int64')
+        # 연중 일 번호 (0부터)
+        self.day_of_year = index.dayofyear.to_numpy(dtype='int64') - 1
+        self.labels = np.datetime_as_string(self.days)
+        year_starts = np.flatnonzero(self.day_of_year == 0)
+        year_stops = np.append(year_starts[1:], len(self.days))
+        self._year_slices = {int(self.year[start]): slice(int(start), int(stop))
+                             for start, stop in zip(year_starts, year_stops)}
+        self._year_index = {}
+        self._week_ranges = {}
+
+    def covers(self, first_year, last_year):
+        return self.first_year <= first_year and last_year <= self.last_year
+
+    def positions(self, dates):
+        """날짜 배열(datetime64 또는 Series) → 일수 인덱스 배열"""
+        days = np.asarray(dates).astype('datetime64[D]')
+        return (days - self.start).astype('int64')
+
+    def position(self, day):
+        """날짜 하나 → 일수 인덱스"""
+        return int((np.datetime64(day, 'D') - self.start).astype('int64'))
+
+    def year_length(self, year):
+        """year년 일수 (365 또는 366)"""
+        year_slice = self._year_slices[year]
+        return year_slice.stop - year_slice.start
+
+    def year_index(self, year):
+        """year년 1월 1일~12월 31일 DatetimeIndex (reindex용, 연도별 1회 생성)"""
+        index = self._year_index.get(year)
+        if index is None:
+            index = pd.DatetimeIndex(self.days[self._year_slices[year]].astype('datetime64[ns]'))
+            self._year_index[year] = index
+        return index
+
+    def year_labels(self, year):
+        """year년 전체 날짜의 'YYYY-MM-DD' 목록"""
+        return self.labels[self._year_slices[year]].tolist()
+
+    def week_date_ranges(self, iso_year):
+        """ISO 연도의 주차별(1~52/53) 날짜 범위 라벨 {주차: '월/일~월/일'} (연도별 1회 계산, 반환값은 복사본)"""
+        ranges = self._week_ranges.get(iso_year)
+        if ranges is None:
+            in_year = self.iso_year == iso_year
+            mondays = np.flatnonzero(in_year & (self.weekday == 0))
+            sundays = np.flatnonzero(in_year & (self.weekday == 6))
+            months = self.days.astype('datetime64[M]')
+            month_numbers = months.astype('int64') % 12 + 1
+            day_numbers = (self.days - months.astype('datetime64[D]')).astype('int64') + 1
+            ranges = {
+                int(week): f"{start_month}/{start_day}~{end_month}/{end_day}"
+                for week, start_month, start_day, end_month, end_day in zip(
+                    self.iso_week[mondays].tolist(), month_numbers[mondays].tolist(), day_numbers[mondays].tolist(),
+                    month_numbers[sundays].tolist(), day_numbers[sundays].tolist())
+            }
+            self._week_ranges[iso_year] = ranges
+        return dict(ranges)
+
+
+_dimension = None
+
+
+def date_dimension(first_year, last_year=None):
+    """first_year~last_year를 (앞뒤 1년까지) 덮는 날짜 차원 (모든 호출이 같은 객체 공유, 범위가 모자라면 넓혀서 다시 생성)"""
+    global _dimension
+    last_year = first_year if last_year is None else last_year
+    first_year, last_year = int(first_year) - 1, int(last_year) + 1
+    dimension = _dimension
+    if dimension is None or not dimension.covers(first_year, last_year):
+        if dimension is not None:
+            first_year = min(first_year, dimension.first_year)
+            last_year = max(last_year, dimension.last_year)
+        dimension = DateDimension(first_year, last_year)
+        _dimension = dimension
+    return dimension
+
+
+def dimension_positions(dates):
+    """날짜 배열을 덮는 날짜 차원과 각 날짜의 일수 인덱스 (날짜가 없으면 올해 차원과 빈 인덱스)"""
+    days = np.asarray(dates).astype('datetime64[D]')
+    if len(days) == 0:
+        return date_dimension(pd.Timestamp.now().year), np.array([], dtype='int64')
+    years = days[[days.argmin(), days.argmax()]].astype('datetime64[Y]').astype('int64') + 1970
+    dimension = date_dimension(years[0], years[1])
+    return dimension, dimension.positions(days)
@@ -60,6 +60,88 @@ def init_db():
         INSERT OR IGNORE INTO pareto_settings (id, days) VALUES (1, 365)
     ''')
     
+    # 판매 데이터 변경 기록 테이블 (업로드/삭제 시 변경된 판매일자-상품-컬러, 증분 갱신용)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sales_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            판매일자 TEXT,
+            품명 TEXT,
+            칼라 TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # 알림 계산 결과 테이블 (SKU/상품별 알림 행, 변경 기록에 포함된 키만 재계산)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS alert_results (
+            kind TEXT,
+            품명 TEXT,
+            칼라 TEXT,
+            row_data TEXT,
+            PRIMARY KEY (kind, 품명, 칼라)
+        )
+    ''')
+    
+    # 알림 계산 결과가 반영한 마지막 변경 기록 id
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS alert_state (
+            id INTEGER PRIMARY KEY,
+            change_id INTEGER
+        )
+    ''')
+    cursor.execute('''
+        INSERT OR IGNORE INTO alert_state (id, change_id) VALUES (1, 0)
+    ''')
+    # 저장된 알림 행은 이전 버전 계산식(추세선 등)으로 만들어졌을 수 있으므로 시작 시 비움
+    cursor.execute('DELETE FROM alert_results')
+    
+    # 파레토 상위 상품 스케치 (Space-Saving 카운터, 상태 행이 없으면 첫 사용 시 전체 생성)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pareto_sketch (
+            품명 TEXT PRIMARY KEY,
+            count REAL,
+            error REAL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pareto_sketch_state (
+            id INTEGER PRIMARY KEY,
+            capacity INTEGER,
+            total REAL,
+            max_date TEXT,
+            change_id INTEGER
+        )
+    ''')
+    
+    # SKU별 추세 누적기 (최근 window_size개 일별 판매량, 상태 행이 없으면 첫 사용 시 전체 생성)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS trend_stream (
+            품명 TEXT,
+            칼라 TEXT,
+            last_date TEXT,
+            tail TEXT,
+            PRIMARY KEY (품명, 칼라)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS trend_stream_state (
+            id INTEGER PRIMARY KEY,
+            window_size INTEGER,
+            change_id INTEGER
+        )
+    ''')
+    
+    # 차트 스냅샷 (업로드 후 미리 만든 차트 데이터 pickle, cache_key는 차트 캐시 키의 JSON - 데이터 버전/날짜 포함)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS chart_snapshots (
+            cache_key TEXT PRIMARY KEY,
+            version TEXT,
+            payload BLOB
+        )
+    ''')
+    # 저장된 스냅샷은 이전 버전 차트 형식으로 만들어졌을 수 있으므로 시작 시 비움
+    cursor.execute('DELETE FROM chart_snapshots')
+    
     conn.commit()
     conn.close()
 
@@ -80,12 +162,206 @@ def save_to_db(df, upload_date, filename):
     if not df.empty:
         # 기존 데이터 삭제 (판매일자 기준)
         cursor = conn.cursor()
+        _record_sales_changes(cursor, sales_date, df[['품명', '칼라']].drop_duplicates().itertuples(index=False))
         cursor.execute("DELETE FROM sales_data WHERE 판매일자 = ?", (sales_date,))
-        conn.commit()
-        # 새 데이터 저장
+        # 새 데이터 저장 (변경 기록/삭제/저장을 한 트랜잭션으로 커밋)
         df.to_sql('sales_data', conn, if_exists='append', index=False)
     conn.close()
 
+def _record_sales_changes(cursor, sales_date, new_pairs=()):
+    """해당 판매일자의 기존 상품-컬러와 새로 저장될 상품-컬러를 변경 기록에 추가"""
+    cursor.execute('''
+        INSERT INTO sales_changes (판매일자, 품명, 칼라)
+        SELECT DISTINCT 판매일자, 품명, 칼라 FROM sales_data WHERE 판매일자 = ?
+    ''', (sales_date,))
+    cursor.executemany(
+        'INSERT INTO sales_changes (판매일자, 품명, 칼라) VALUES (?, ?, ?)',
+        [(sales_date, product, color) for product, color in new_pairs]
+    )
+
+def get_last_change_id():
+    """가장 최근 변경 기록 id (기록이 없으면 0)"""
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(id) FROM sales_changes")
+    result = cursor.fetchone()
+    conn.close()
+    return result[0] or 0
+
+def get_sales_changes(since_id):
+    """since_id 이후의 변경 기록 [(id, 판매일자, 품명, 칼라)] 반환"""
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, 판매일자, 품명, 칼라 FROM sales_changes WHERE id > ? ORDER BY id", (since_id,))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+def get_alert_results(kind, keys):
+    """저장된 알림 행 조회 {(품명, 칼라): row dict 또는 None} (상품 단위 알림은 칼라 = '')"""
+    import json
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    cursor.execute("SELECT 품명, 칼라, row_data FROM alert_results WHERE kind = ?", (kind,))
+    wanted = set(keys)
+    results = {}
+    for product, color, row_data in cursor.fetchall():
+        if (product, color) in wanted:
+            results[(product, color)] = json.loads(row_data) if row_data is not None else None
+    conn.close()
+    return results
+
+def save_alert_results(kind, rows, change_id):
+    """알림 행 저장 rows: {(품명, 칼라): row dict 또는 None(알림 없음)}
+
+    change_id(계산에 쓴 데이터의 변경 기록 id)가 저장된 반영 id와 같을 때만 같은 트랜잭션 안에서 저장
+    (이전 데이터로 계산한 요청이 새 데이터 반영 뒤에 저장하지 않도록) - 저장했으면 True
+    """
+    import json
+    conn = sqlite3.connect('inventory.db', isolation_level=None)
+    cursor = conn.cursor()
+    try:
+        cursor.execute('BEGIN IMMEDIATE')
+        cursor.execute("SELECT change_id FROM alert_state WHERE id = 1")
+        result = cursor.fetchone()
+        applied_id = result[0] if result else 0
+        if applied_id != change_id:
+            cursor.execute('ROLLBACK')
+            return False
+        cursor.executemany(
+            'INSERT OR REPLACE INTO alert_results (kind, 품명, 칼라, row_data) VALUES (?, ?, ?, ?)',
+            [(kind, product, color, json.dumps(row, ensure_ascii=False) if row is not None else None)
+             for (product, color), row in rows.items()]
+        )
+        cursor.execute('COMMIT')
+        return True
+    except Exception:
+        if conn.in_transaction:
+            cursor.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+def invalidate_alert_results(change_id):
+    """마지막 반영 이후 변경된 상품-컬러의 알림 행 삭제 후 반영 id를 change_id로 갱신"""
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    cursor.execute("SELECT change_id FROM alert_state WHERE id = 1")
+    result = cursor.fetchone()
+    applied_id = result[0] if result else 0
+    if change_id > applied_id:
+        # SKU 알림은 해당 상품-컬러, 상품 단위 알림(칼라 = '')은 해당 상품 전체가 무효화됨
+        cursor.execute('''
+            DELETE FROM alert_results WHERE EXISTS (
+                SELECT 1 FROM sales_changes
+                WHERE sales_changes.id > ?
+                  AND sales_changes.품명 = alert_results.품명
+                  AND (alert_results.칼라 = '' OR sales_changes.칼라 = alert_results.칼라)
+            )
+        ''', (applied_id,))
+        cursor.execute("INSERT OR REPLACE INTO alert_state (id, change_id) VALUES (1, ?)", (change_id,))
+    conn.commit()
+    conn.close()
+
+def load_pareto_sketch():
+    """저장된 파레토 스케치 반환 (상태 dict 또는 None, [(품명, count, error)])"""
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    cursor.execute("SELECT capacity, total, max_date, change_id FROM pareto_sketch_state WHERE id = 1")
+    result = cursor.fetchone()
+    state = None
+    if result:
+        state = dict(zip(['capacity', 'total', 'max_date', 'change_id'], result))
+    cursor.execute("SELECT 품명, count, error FROM pareto_sketch")
+    rows = cursor.fetchall()
+    conn.close()
+    return state, rows
+
+def save_pareto_sketch(capacity, total, max_date, change_id, rows):
+    """파레토 스케치 전체 교체 저장 rows: [(품명, count, error)]"""
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM pareto_sketch")
+    cursor.executemany("INSERT INTO pareto_sketch (품명, count, error) VALUES (?, ?, ?)", rows)
+    cursor.execute('''
+        INSERT OR REPLACE INTO pareto_sketch_state (id, capacity, total, max_date, change_id)
+        VALUES (1, ?, ?, ?, ?)
+    ''', (capacity, total, max_date, change_id))
+    conn.commit()
+    conn.close()
+
+def load_trend_stream():
+    """저장된 추세 누적기 반환 (상태 dict 또는 None, [(품명, 칼라, last_date, 최근 값 list)])"""
+    import json
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    cursor.execute("SELECT window_size, change_id FROM trend_stream_state WHERE id = 1")
+    result = cursor.fetchone()
+    state = None
+    if result:
+        state = dict(zip(['window_size', 'change_id'], result))
+    cursor.execute("SELECT 품명, 칼라, last_date, tail FROM trend_stream")
+    rows = [(product, color, last_date, json.loads(tail)) for product, color, last_date, tail in cursor.fetchall()]
+    conn.close()
+    return state, rows
+
+def save_trend_stream(window_size, change_id, rows, replace=False):
+    """추세 누적기 저장 rows: [(품명, 칼라, last_date, 최근 값 list 또는 None(삭제))], replace=True이면 전체 교체"""
+    import json
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    if replace:
+        cursor.execute("DELETE FROM trend_stream")
+    cursor.executemany(
+        "DELETE FROM trend_stream WHERE 품명 = ? AND 칼라 = ?",
+        [(product, color) for product, color, _, tail in rows if tail is None]
+    )
+    cursor.executemany(
+        "INSERT OR REPLACE INTO trend_stream (품명, 칼라, last_date, tail) VALUES (?, ?, ?, ?)",
+        [(product, color, last_date, json.dumps(tail)) for product, color, last_date, tail in rows if tail is not None]
+    )
+    cursor.execute('''
+        INSERT OR REPLACE INTO trend_stream_state (id, window_size, change_id) VALUES (1, ?, ?)
+    ''', (window_size, change_id))
+    conn.commit()
+    conn.close()
+
+def get_chart_snapshot(cache_key):
+    """저장된 차트 스냅샷 조회 (pickle bytes 또는 None)"""
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    cursor.execute("SELECT payload FROM chart_snapshots WHERE cache_key = ?", (cache_key,))
+    result = cursor.fetchone()
+    conn.close()
+    return result[0] if result else None
+
+def save_chart_snapshots(version, rows):
+    """차트 스냅샷 저장 rows: [(cache_key, payload pickle bytes)] - 다른 데이터 버전의 스냅샷은 삭제"""
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM chart_snapshots WHERE version != ?", (version,))
+    cursor.executemany(
+        "INSERT OR REPLACE INTO chart_snapshots (cache_key, version, payload) VALUES (?, ?, ?)",
+        [(cache_key, version, payload) for cache_key, payload in rows]
+    )
+    conn.commit()
+    conn.close()
+
+def read_sales_weights(dates=None, chunksize=50000):
+    """품명/실판매/판매일자 행을 chunksize 단위 DataFrame으로 순회 (dates 지정 시 해당 판매일자만)"""
+    conn = sqlite3.connect('inventory.db')
+    try:
+        query = "SELECT 품명, 실판매, 판매일자 FROM sales_data"
+        params = ()
+        if dates is not None:
+            dates = list(dates)
+            query += f" WHERE 판매일자 IN ({', '.join('?' * len(dates))})"
+            params = tuple(dates)
+        for chunk in pd.read_sql_query(query, conn, params=params, chunksize=chunksize):
+            yield chunk
+    finally:
+        conn.close()
+
 def save_compare_product(product_name, compare_df, upload_date, filename=None):
     """비교 상품 데이터를 데이터베이스에 저장"""
     import json
@@ -206,6 +482,15 @@ def load_from_db():
     conn.close()
     return df
 
+def get_data_version():
+    """판매 데이터 버전 반환 (행 수, 최대 id) - 업로드/삭제 시마다 값이 바뀜"""
+    conn = sqlite3.connect('inventory.db')
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*), MAX(id) FROM sales_data")
+    result = cursor.fetchone()
+    conn.close()
+    return tuple(result) if result else (0, None)
+
 def delete_by_date(date):
     """특정 날짜의 데이터 삭제"""
     conn = sqlite3.connect('inventory.db')
@@ -217,6 +502,7 @@ def delete_by_date(date):
     print(f"삭제 요청 날짜: {date}")
     print(f"데이터베이스에 있는 날짜들: {existing_dates}")
     
+    _record_sales_changes(cursor, date)
     cursor.execute("DELETE FROM sales_data WHERE 판매일자 = ?", (date,))
     deleted_count = cursor.rowcount
     print(f"삭제된 행 수: {deleted_count}")
@@ -0,0 +1,160 @@
+"""
+분석 작업 실행 모듈
+단일 책임: SKU/상품 단위 분석 작업을 프로세스 풀에 분할 실행 (소규모 카탈로그는 직렬 실행)
+
+작업 함수는 모듈 최상위 함수여야 하며 func(key, columns, **params) 형태로 호출된다.
+columns는 해당 SKU 행 범위에 대한 {컬럼명: numpy 배열} 이고, 병렬 실행 시에는
+공유 메모리에 올린 입력 컬럼의 뷰가 전달된다. params(키별 dict 등)도 한 번만 pickle해서
+공유 메모리에 올리고, 워커는 호출마다 한 번만 복원해서 모든 분할 묶음에 재사용한다.
+"""
+import os
+import pickle
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+# 프로세스 풀 크기 (환경변수로 조정, 1 이하이면 항상 직렬 실행)
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', os.cpu_count() or 1))
+# 이 개수 미만의 작업은 프로세스 풀을 쓰지 않고 직렬 실행
+PARALLEL_MIN_JOBS = int(os.environ.get('ANALYSIS_PARALLEL_MIN_JOBS', 200))
+# 워커당 분할 개수 (작업량 편차 완화용)
+SHARDS_PER_WORKER = 4
+
+_pool = None
+# 병렬 호출 번호 (워커의 params 재사용 구분용 - 해제된 공유 메모리 이름은 다시 쓰일 수 있음)
+_call_ids = itertools.count()
+# 워커 프로세스에서 마지막으로 복원한 params (호출 번호, params)
+_worker_params = (None, None)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        # 요청 스레드/스냅샷 스레드가 잡고 있는 잠금(sqlite, logging 등)이 워커에 복제되지 않도록 fork 대신 forkserver
+        _pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS, mp_context=multiprocessing.get_context('forkserver'))
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+def run_range_jobs(func, arrays, jobs, params=None):
+    """행 범위 작업 실행
+
+    Args:
+        func: 작업 함수 func(key, columns, **params) -> 결과 또는 None
+        arrays: {컬럼명: numpy 배열} 전체 입력 컬럼
+        jobs: [(key, 시작 행, 끝 행)] 목록
+        params: 작업 함수에 전달할 추가 인자
+
+    Returns:
+        list: jobs 순서대로의 결과 (None 결과는 제외)
+    """
+    params = params or {}
+    jobs = list(jobs)
+    if ANALYSIS_WORKERS <= 1 or len(jobs) < PARALLEL_MIN_JOBS:
+        return _run_serial(func, arrays, jobs, params)
+    try:
+        return _run_parallel(func, arrays, jobs, params)
+    except Exception as e:
+        print(f"병렬 분석 실행 실패, 직렬 실행으로 전환: {e}")
+        _reset_pool()
+        return _run_serial(func, arrays, jobs, params)
+
+
+def _run_serial(func, arrays, jobs, params):
+    results = []
+    for key, start, stop in jobs:
+        columns = {name: values[start:stop] for name, values in arrays.items()}
+        result = func(key, columns, **params)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def _run_parallel(func, arrays, jobs, params):
+    blocks = []
+    try:
+        # 입력 컬럼을 공유 메모리에 한 번만 복사 (워커는 이름으로 연결해서 뷰로 사용)
+        specs = {}
+        for name, values in arrays.items():
+            values = np.ascontiguousarray(values)
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+            specs[name] = (block.name, values.shape, values.dtype.str)
+
+        # params는 분할 묶음마다 pickle하지 않고 공유 메모리에 한 번만 기록
+        params_spec = None
+        if params:
+            data = pickle.dumps(params, protocol=pickle.HIGHEST_PROTOCOL)
+            block = shared_memory.SharedMemory(create=True, size=len(data))
+            blocks.append(block)
+            block.buf[:len(data)] = data
+            params_spec = (next(_call_ids), block.name, len(data))
+
+        # 연속된 작업 묶음으로 분할 → 결과를 이어 붙이면 원래 순서 유지
+        shard_count = min(len(jobs), ANALYSIS_WORKERS * SHARDS_PER_WORKER)
+        shards = [shard.tolist() for shard in np.array_split(np.arange(len(jobs)), shard_count)]
+        pool = _get_pool()
+        futures = [
+            pool.submit(_run_shard, func, specs, [jobs[i] for i in shard], params_spec)
+            for shard in shards if shard
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _attach(name):
+    """워커에서 공유 메모리 연결 (unlink는 생성한 부모 프로세스가 담당)"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.13 미만: 워커는 부모의 리소스 트래커를 공유하므로 중복 등록은 무시됨
+        return shared_memory.SharedMemory(name=name)
+
+
+def _load_params(params_spec):
+    """워커에서 공유 메모리의 params 복원 (같은 호출의 다른 묶음은 복원한 params 재사용)"""
+    global _worker_params
+    if params_spec is None:
+        return {}
+    call_id, name, size = params_spec
+    if _worker_params[0] != call_id:
+        block = _attach(name)
+        try:
+            with block.buf[:size] as data:
+                _worker_params = (call_id, pickle.loads(data))
+        finally:
+            block.close()
+    return _worker_params[1]
+
+
+def _run_shard(func, specs, jobs, params_spec):
+    """워커 프로세스에서 작업 묶음 실행"""
+    blocks = []
+    try:
+        params = _load_params(params_spec)
+        arrays = {}
+        for name, (block_name, shape, dtype) in specs.items():
+            block = _attach(block_name)
+            blocks.append(block)
+            arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        results = _run_serial(func, arrays, jobs, params)
+        del arrays
+        return results
+    finally:
+        for block in blocks:
+            block.close()
@@ -0,0 +1,166 @@
+"""
+판매 예측 모듈
+단일 책임: 전체/상품/SKU 일별 판매량에 선형 추세 + 요일 효과를 한 번의 최소제곱으로 적합하고 향후 N일 예측
+
+- 입력은 누적합 저장소(RollingWindowStore)의 최근 history_days일 일별 합계 (키 × 일 행렬, 판매 없는 날은 0)
+- 모든 키가 같은 날짜 구간/같은 설계 행렬을 쓰므로 계수는 행렬곱 1번 (Y @ pinv(X).T)
+- 예측 시작일은 전체 마지막 판매일 다음 날, 일별 예측값은 0 미만이면 0
+- 예측 구간은 잔차 부트스트랩: 키별 적합 잔차를 복원 추출해 (1) 적합 구간에 더해 다시 적합한 계수(추세 불확실성)로
+  예측하고 (2) 예측 기간에도 더한 경로의 분위수. 재적합은 선형이므로 추출 잔차 @ pinv(X).T 행렬곱 1번이고,
+  여러 키를 (키 × 일 × 표본) 배열로 계산한다. 키가 많으면 원소 수 상한까지 표본 수를 줄이되 최소 표본 수
+  (분위수가 보정된 구간이 되는 하한) 아래로는 줄이지 않고, 그 이상의 키는 청크로 나눠 메모리만 묶어 둔다
+- SalesFrame.forecast_model()로 데이터 버전당 1회 적합
+"""
+import os
+import numpy as np
+import pandas as pd
+
+# 예측 기간 (일)
+FORECAST_HORIZONS = (7, 14, 28)
+# 적합에 쓰는 최근 일수
+FORECAST_HISTORY_DAYS = int(os.environ.get('FORECAST_HISTORY_DAYS', 56))
+# 요일 효과를 넣는 최소 일수 (2주 미만이면 추세만 적합)
+WEEKDAY_MIN_DAYS = 14
+# 예측 구간 포함 확률
+FORECAST_INTERVAL = float(os.environ.get('FORECAST_INTERVAL', 0.8))
+# 키당 최대/최소 부트스트랩 표본 수 (최소 표본 수 미만이면 80% 분위수가 보정되지 않음)
+BOOTSTRAP_SAMPLES = int(os.environ.get('FORECAST_BOOTSTRAP_SAMPLES', 500))
+BOOTSTRAP_MIN_SAMPLES = 50
+# 구간 계산 1회의 (키 × 일 × 표본) 원소 수 목표 - 키가 많으면 최소 표본 수까지 키당 표본 수를 줄임
+BOOTSTRAP_BUDGET = int(os.environ.get('FORECAST_BOOTSTRAP_BUDGET', 4000000))
+# 한 번에 만드는 경로 배열 원소 수 상한 (메모리 상한)
+BOOTSTRAP_CHUNK = 1000000
+
+
+def _design(day_numbers, end_day, with_weekday):
+    """설계 행렬 (절편, 마지막 날 기준 주 단위 시간, 화~일 요일 더미)"""
+    t = (day_numbers - end_day) / 7.0
+    columns = [np.ones(len(day_numbers)), t]
+    if with_weekday:
+        # datetime64[D] 일수 → (일수 + 3) % 7 = 요일번호(0=월요일)
+        weekday = (day_numbers + 3) % 7
+        columns += [(weekday == w).astype('float64') for w in range(1, 7)]
+    return np.stack(columns, axis=1)
+
+
+def _quantiles(values, quantiles):
+    """마지막 축 분위수 (np.quantile 기본 선형 보간과 같은 값) - 표본 축이 짧으면 정렬이 partition보다 빠름"""
+    ordered = np.sort(values, axis=-1)
+    positions = np.asarray(quantiles) * (values.shape[-1] - 1)
+    low = np.floor(positions).astype('int64')
+    high = np.minimum(low + 1, values.shape[-1] - 1)
+    weight = positions - low
+    return np.stack([ordered[..., lo] * (1 - w) + ordered[..., hi] * w for lo, hi, w in zip(low, high, weight)])
+
+
+class ForecastModel:
+    """키별 선형 추세 + 요일 효과 예측 모델
+
+    keys: 저장소 키 목록 (TOTAL_KEY, 품명, (품명, 칼라)), coefficients: (키 수, 계수 수),
+    residuals: (키 수, 적합 일수) 적합 잔차, end_day: 마지막 적합일 (datetime64[D] 일수)
+    """
+
+    def __init__(self, keys, coefficients, residuals, end_day, with_weekday, solver=None):
+        self.keys = list(keys)
+        self.rows = {key: i for i, key in enumerate(self.keys)}
+        self.coefficients = coefficients
+        self.residuals = residuals
+        # pinv(X) (계수 수, 적합 일수) - 부트스트랩 재적합용
+        self.solver = solver
+        self.end_day = end_day
+        self.with_weekday = with_weekday
+        self._catalog = {}
+
+    @classmethod
+    def from_store(cls, store, history_days=FORECAST_HISTORY_DAYS):
+        """누적합 저장소의 전체 키를 한 번에 적합"""
+        if store.start_day is None or store.n_days == 0:
+            return cls(store.keys, np.zeros((len(store.keys), 2)), np.zeros((len(store.keys), 0)), None, False)
+        stop = store.n_days
+        start = max(stop - history_days, 0)
+        # 키 × 일 일별 합계 (누적합 차분)
+        history = np.diff(store.sums[:, start:stop + 1], axis=1)
+        start_day = int(store.start_day.astype('int64'))
+        day_numbers = start_day + np.arange(start, stop)
+        end_day = start_day + stop - 1
+        with_weekday = stop - start >= WEEKDAY_MIN_DAYS
+        design = _design(day_numbers, end_day, with_weekday)
+        solver = np.linalg.pinv(design)
+        coefficients = history @ solver.T
+        # 적합 잔차는 실제 오차보다 작으므로 자유도 보정 (√(n / (n - 계수 수)))
+        n, p = design.shape
+        residuals = (history - coefficients @ design.T) * np.sqrt(n / max(n - p, 1))
+        return cls(store.keys, coefficients, residuals, end_day, with_weekday, solver)
+
+    @property
+    def start_date(self):
+        """예측 첫날 (없으면 None)"""
+        if self.end_day is None:
+            return None
+        return pd.Timestamp(np.datetime64(self.end_day + 1, 'D'))
+
+    def predict(self, rows, horizon):
+        """키 행 번호 목록의 향후 horizon일 일별 예측 (행 수, horizon), 음수는 0"""
+        if self.end_day is None:
+            return np.zeros((len(rows), horizon))
+        design = _design(self.end_day + 1 + np.arange(horizon), self.end_day, self.with_weekday)
+        return np.maximum(self.coefficients[rows] @ design.T, 0)
+
+    def forecast(self, key, horizon):
+        """키 하나의 향후 horizon일 일별 예측 (날짜 목록, 값 배열) - 모르는 키면 None"""
+        row = self.rows.get(key)
+        if row is None or self.end_day is None:
+            return None
+        dates = pd.date_range(start=self.start_date, periods=horizon)
+        return dates, self.predict([row], horizon)[0]
+
+    def intervals(self, rows, horizon, level=FORECAST_INTERVAL, seed=0):
+        """잔차 부트스트랩 예측 구간 (모든 키가 같은 추출 위치를 쓰므로 시드가 같으면 결과도 같음)
+
+        Returns:
+            tuple: (일별 하한, 일별 상한, 누적 하한, 누적 상한) 각각 (행 수, horizon) - 누적은 1일~d일 합계 구간
+        """
+        rows = np.asarray(rows, dtype='int64')
+        bounds = np.zeros((4, len(rows), horizon))
+        if len(rows) == 0 or self.end_day is None or self.residuals.shape[1] == 0:
+            return tuple(bounds)
+        fitted_days = self.residuals.shape[1]
+        width = horizon + fitted_days
+        # 원소 수 목표 안에서 키당 표본 수 결정 (최소 표본 수 아래로는 줄이지 않고, 메모리는 아래 청크로 묶음)
+        samples = int(np.clip(BOOTSTRAP_BUDGET // (len(rows) * width), BOOTSTRAP_MIN_SAMPLES, BOOTSTRAP_SAMPLES))
+        rng = np.random.default_rng(seed)
+        # 적합 구간 재추출 → 계수 변화량, 예측 기간 재추출 → 일별 오차 (모든 키가 같은 추출 위치 사용)
+        refit_picks = rng.integers(0, fitted_days, size=(samples, fitted_days))
+        future_picks = rng.integers(0, fitted_days, size=(horizon, samples))
+        future_design = _design(self.end_day + 1 + np.arange(horizon), self.end_day, self.with_weekday)
+        refit = self.solver.T @ future_design.T
+        quantiles = [(1 - level) / 2, (1 + level) / 2]
+        # 한 번에 처리하는 키 수 (경로 배열 원소 수 상한)
+        chunk = max(BOOTSTRAP_CHUNK // (samples * width), 1)
+        for start in range(0, len(rows), chunk):
+            block = slice(start, start + chunk)
+            residuals = self.residuals[rows[block]]
+            # (키, 일, 표본) 경로 = 재적합 계수의 예측값 + 잔차 복원 추출 (판매량이므로 0 미만은 0)
+            mean = (self.coefficients[rows[block]] @ future_design.T)[:, :, None]
+            shift = (residuals[:, refit_picks] @ refit).transpose(0, 2, 1)
+            paths = np.maximum(mean + shift + residuals[:, future_picks], 0)
+            bounds[0:2, block] = _quantiles(paths, quantiles)
+            bounds[2:4, block] = _quantiles(np.cumsum(paths, axis=1), quantiles)
+        return tuple(bounds)
+
+    def catalog_totals(self, horizons=FORECAST_HORIZONS):
+        """전체 SKU의 기간별 예측 합계와 부트스트랩 구간 (데이터 버전당 1회 계산)
+
+        Returns:
+            tuple: ([(품명, 칼라)], 합계, 하한, 상한) - 각 배열은 (SKU 수, 기간 수)
+        """
+        horizons = tuple(horizons)
+        if horizons not in self._catalog:
+            sku_keys = [key for key in self.keys if isinstance(key, tuple)]
+            rows = [self.rows[key] for key in sku_keys]
+            columns = [horizon - 1 for horizon in horizons]
+            daily = self.predict(rows, max(horizons))
+            _, _, lower, upper = self.intervals(rows, max(horizons))
+            totals = np.cumsum(daily, axis=1)[:, columns]
+            self._catalog[horizons] = (sku_keys, totals, lower[:, columns], upper[:, columns])
+        return self._catalog[horizons]
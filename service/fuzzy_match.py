@@ -0,0 +1,170 @@
+"""
+상품명 유사 검색 모듈
+단일 책임: 정규화된 상품명 코퍼스를 데이터 버전당 1회 만들고, 후보를 걸러낸 뒤 WRatio로 유사 상품 검색
+
+점수는 process.extract(query, names, scorer=WRatio)와 동일하다 (같은 전처리/같은 scorer).
+- 전처리가 같은 이름은 한 번만 채점 (한글만 다른 이름은 ASCII 전처리 후 같은 문자열이 됨)
+- 질의와 공통 문자가 하나도 없는 이름은 WRatio의 모든 구성 점수가 0이므로 채점 없이 0점
+- 공유 단어가 없는 이름은 공통 문자 수 o로 WRatio 상한을 구해, 상한이 기준 점수에 못 미치면 채점하지 않음
+  (ratio = 2·LCS/(두 길이 합) ≤ 2o/(두 길이 합), partial_ratio는 짧은 쪽 길이 s와 창 길이 w ≤ s에 대해
+  2·LCS/(s + w) ≤ 2m/(s + m), m = min(o, s) - 끝에서 잘린 창 포함. token_sort/token_set은 정렬/중복 제거한
+  단어 문자열 길이로 같은 식을 쓰고, 각 구성 점수의 반올림(0.5)과 가중치(0.95/0.9/0.6)를 반영)
+- limit이 있으면 상한 내림차순으로 채점하다가 남은 상한이 현재 limit번째 점수에 못 미치면 중단
+"""
+import os
+import threading
+from collections import Counter, OrderedDict
+import numpy as np
+from fuzzywuzzy import fuzz, utils
+
+# 최근 질의 결과 캐시 크기
+FUZZY_CACHE_SIZE = int(os.environ.get('FUZZY_CACHE_SIZE', 256))
+# limit번째 점수로 중단 여부를 확인하는 채점 단위 (후보 수)
+SCORE_BATCH = 32
+
+
+class FuzzyMatcher:
+    """상품명 유사 검색기 (데이터 버전당 1회 생성, 최근 질의 LRU 포함)"""
+
+    def __init__(self, names):
+        self.names = list(names)
+        processed = [utils.full_process(name, force_ascii=True) for name in self.names]
+        corpus = list(dict.fromkeys(processed))
+        code_of = {text: i for i, text in enumerate(corpus)}
+        self.corpus = corpus
+        self.codes = np.array([code_of[text] for text in processed], dtype='int64')
+        # 코퍼스 문자열별 이름 수 (limit번째 점수 계산용)
+        self.counts = np.bincount(self.codes, minlength=len(corpus))
+        # 코퍼스별 (전처리, 단어 정렬, 단어 집합 정렬) 문자열 길이 - WRatio 구성 점수의 상한 계산용
+        self.lengths = np.array([_lengths(text) for text in corpus], dtype='float64').reshape(-1, 3)
+
+        # 문자 → (코퍼스 번호, 등장 횟수), 단어 → 코퍼스 번호
+        char_postings = {}
+        token_postings = {}
+        for i, text in enumerate(corpus):
+            for ch, count in Counter(text).items():
+                char_postings.setdefault(ch, ([], []))
+                char_postings[ch][0].append(i)
+                char_postings[ch][1].append(count)
+            for token in set(text.split()):
+                token_postings.setdefault(token, []).append(i)
+        self._char_postings = {ch: (np.array(ids), np.array(counts)) for ch, (ids, counts) in char_postings.items()}
+        self._token_postings = {token: np.array(ids) for token, ids in token_postings.items()}
+        self._recent = OrderedDict()
+        # 요청 스레드끼리 같은 검색기를 쓰므로 최근 질의 목록/카운터 갱신은 잠금 안에서 (채점은 잠금 밖)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _candidates(self, query, score_cutoff):
+        """(채점할 코퍼스 번호, WRatio 상한, 공통 문자 수) - 채점 대상은 상한 내림차순
+
+        채점 대상은 공통 문자가 있고 공유 단어가 있거나 상한이 기준 점수 이상인 것.
+        """
+        overlap = np.zeros(len(self.corpus))
+        for ch, count in Counter(query).items():
+            posting = self._char_postings.get(ch)
+            if posting is not None:
+                ids, counts = posting
+                overlap[ids] += np.minimum(counts, count)
+        bound = _wratio_bound(overlap, np.array(_lengths(query), dtype='float64'), self.lengths)
+        for token in set(query.split()):
+            ids = self._token_postings.get(token)
+            if ids is not None:
+                # 공유 단어가 있으면 token_set 점수가 100까지 나올 수 있음
+                bound[ids] = np.inf
+        # 점수는 반올림된 정수이므로 0.5점 여유를 둠
+        keep = np.flatnonzero((overlap > 0) & (bound >= score_cutoff - 0.5 - 1e-9))
+        keep = keep[np.argsort(-bound[keep], kind='stable')]
+        return keep, bound[keep], overlap
+
+    def _limit_score(self, scores, limit, score_cutoff):
+        """채점된 이름 중 limit번째 높은 점수 (기준 점수 이상인 이름이 limit개 미만이면 None)"""
+        scored = np.flatnonzero((scores >= 0) & (scores >= score_cutoff))
+        if self.counts[scored].sum() < limit:
+            return None
+        ordered = scored[np.argsort(-scores[scored], kind='stable')]
+        position = np.searchsorted(np.cumsum(self.counts[ordered]), limit)
+        return scores[ordered[position]]
+
+    def extract(self, query, limit=10, score_cutoff=60):
+        """유사 상품명 [(상품명, 점수)] - 점수 내림차순, 동점은 names 순서 (score_cutoff 미만 제외)"""
+        key = (query, limit, score_cutoff)
+        with self._lock:
+            cached = self._recent.get(key)
+            if cached is not None:
+                self._recent.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        processed_query = utils.full_process(query, force_ascii=True)
+        matches = []
+        if utils.validate_string(processed_query) and len(self.corpus) > 0:
+            candidates, bounds, overlap = self._candidates(processed_query, score_cutoff)
+            # 공통 문자가 없는 이름은 0점, 채점하지 않은 이름은 -1
+            scores = np.where(overlap > 0, -1, 0).astype('int64')
+            for start in range(0, len(candidates), SCORE_BATCH):
+                if limit is not None and start > 0:
+                    limit_score = self._limit_score(scores, limit, score_cutoff)
+                    # 남은 상한이 limit번째 점수 - 0.5 미만이면 남은 이름은 limit 안에 들 수 없음
+                    if limit_score is not None and bounds[start] < limit_score - 0.5 - 1e-9:
+                        break
+                for i in candidates[start:start + SCORE_BATCH]:
+                    scores[i] = fuzz.WRatio(processed_query, self.corpus[i], full_process=False)
+            name_scores = scores[self.codes]
+            matched = np.flatnonzero((name_scores >= 0) & (name_scores >= score_cutoff))
+            order = matched[np.argsort(-name_scores[matched], kind='stable')]
+            if limit is not None:
+                order = order[:limit]
+            matches = [(self.names[i], int(name_scores[i])) for i in order]
+
+        with self._lock:
+            self._recent[key] = matches
+            if len(self._recent) > FUZZY_CACHE_SIZE:
+                self._recent.popitem(last=False)
+        return matches
+
+
+def _lengths(text):
+    """(전처리 문자열, 단어 정렬 문자열, 단어 집합 정렬 문자열) 길이 - token_sort/token_set이 비교하는 문자열"""
+    tokens = text.split()
+    return len(text), len(' '.join(tokens)), len(' '.join(set(tokens)))
+
+
+def _ratio_bound(overlap, a, b):
+    """ratio(x, y) 상한 (길이 a, b, 공통 문자 수 overlap, 반올림 0.5 포함)"""
+    total = a + b
+    common = np.minimum(overlap, np.minimum(a, b))
+    return np.divide(200 * common, total, out=np.zeros_like(common), where=total > 0) + 0.5
+
+
+def _partial_bound(overlap, a, b):
+    """partial_ratio(x, y) 상한 - 짧은 쪽 길이 s, 창 길이 w ≤ s이면 2·min(o, w)/(s + w) ≤ 2m/(s + m), m = min(o, s)"""
+    shorter = np.minimum(a, b)
+    common = np.minimum(overlap, shorter)
+    total = shorter + common
+    return np.divide(200 * common, total, out=np.zeros_like(common), where=total > 0) + 0.5
+
+
+def _wratio_bound(overlap, query_lengths, lengths):
+    """공유 단어가 없는 이름의 WRatio 반올림 전 상한 (fuzz.WRatio와 같은 분기/가중치)"""
+    a, b = query_lengths[0], lengths[:, 0]
+    longer, shorter = np.maximum(a, b), np.minimum(a, b)
+    length_ratio = np.divide(longer, shorter, out=np.full_like(longer, np.inf), where=shorter > 0)
+    base = _ratio_bound(overlap, a, b)
+    # 길이 비 1.5 미만: token_sort/token_set (× 0.95)
+    whole = np.maximum.reduce([
+        base,
+        _ratio_bound(overlap, query_lengths[1], lengths[:, 1]) * 0.95,
+        _ratio_bound(overlap, query_lengths[2], lengths[:, 2]) * 0.95,
+    ])
+    # 길이 비 1.5 이상: partial 계열 (× 0.9, 8배 초과면 × 0.6)
+    scale = np.where(length_ratio > 8, 0.6, 0.9)
+    partial = np.maximum.reduce([
+        base,
+        _partial_bound(overlap, a, b) * scale,
+        _partial_bound(overlap, query_lengths[1], lengths[:, 1]) * 0.95 * scale,
+        _partial_bound(overlap, query_lengths[2], lengths[:, 2]) * 0.95 * scale,
+    ])
+    return np.where(length_ratio < 1.5, whole, partial)
@@ -0,0 +1,52 @@
+"""
+차트 시계열 빈칸 채우기 모듈
+단일 책임: 관측 위치/값 배열로 전체 길이 시계열의 빈칸을 numpy 연산으로 채우거나(추세선), 관측값만 남김(실판매)
+
+- fill_linear: 관측 위치 사이는 선형 보간, 첫 관측 이전/마지막 관측 이후는 양 끝 값 유지 (np.interp와 같은 규칙)
+  보간값은 기존 차트 출력과 같도록 start + (end - start) · (j - s) / (e - s) 순서로 계산한다
+  (np.interp는 기울기를 먼저 계산해 마지막 자리 반올림이 달라질 수 있음)
+- keep_observed: 관측값은 그대로, 나머지는 None (ECharts connectNulls로 선만 이어짐)
+"""
+import numpy as np
+
+
+def fill_linear(indices, values, length):
+    """관측 위치(오름차순) indices의 값으로 길이 length 시계열 채우기
+
+    values: (관측 수,) 또는 (행, 관측 수) - 여러 추세선을 한 번에 채울 수 있음.
+    값이 관측 위치보다 적으면 모자란 위치는 0으로 본다.
+    Returns:
+        np.ndarray: (length,) 또는 (행, length) float64. 관측 위치나 값이 없으면 0으로 채운 배열
+    """
+    indices = np.asarray(indices, dtype='int64')
+    values = np.asarray(values, dtype='float64')
+    count = values.shape[-1] if values.ndim > 0 else 0
+    if len(indices) == 0 or count == 0:
+        return np.zeros(values.shape[:-1] + (length,) if values.ndim > 1 else (length,))
+    if count < len(indices):
+        values = np.concatenate([values, np.zeros(values.shape[:-1] + (len(indices) - count,))], axis=-1)
+    values = values[..., :len(indices)]
+
+    positions = np.arange(length)
+    # 각 위치를 감싸는 관측 구간 [left, right] (관측이 1개면 그 관측 하나)
+    right = np.minimum(np.maximum(np.searchsorted(indices, positions, side='left'), 1), len(indices) - 1)
+    left = np.maximum(right - 1, 0)
+    start, end = indices[left], indices[right]
+    span = np.where(end > start, end - start, 1)
+    ratio = (positions - start) / span
+    start_values, end_values = values[..., left], values[..., right]
+    result = start_values + (end_values - start_values) * ratio
+
+    # 관측 위치는 원래 값, 양 끝 바깥은 첫/마지막 값 유지
+    in_range = (indices >= 0) & (indices < length)
+    result[..., indices[in_range]] = values[..., in_range]
+    result[..., positions < indices[0]] = values[..., :1]
+    result[..., positions > indices[-1]] = values[..., -1:]
+    return result
+
+
+def keep_observed(data_list):
+    """관측값(None이 아닌 값)은 그대로, 빈칸은 None인 새 목록 - 빈칸을 값으로 채우지 않음"""
+    if not data_list:
+        return data_list
+    return list(data_list)
@@ -0,0 +1,106 @@
+"""
+상품명 검색 인덱스 모듈
+단일 책임: 상품명/상품-컬러명 n-gram 인덱스로 부분 문자열/초성 검색 (자동완성용)
+
+- 정규화: NFKC + 소문자 + 공백 정리 (전각/반각, 대소문자 무시)
+- 3글자 이하 질의는 해당 n-gram 목록을 그대로 사용, 그보다 긴 질의는 가장 희소한 3-gram 후보만 검증
+- 질의에 한글 자음(ㄱ~ㅎ)이 있으면 질의/상품명 모두 초성 문자열로 바꿔 검색 (예: 'ㅅㅍ01' → '상품01')
+"""
+import re
+import unicodedata
+
+# 한글 음절 초성 (유니코드 음절 순서)
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+HANGUL_START, HANGUL_END = 0xAC00, 0xD7A3
+# NFKC는 호환 자모(ㄱ)를 첫소리 자모(U+1100~)로 바꾸므로 다시 호환 자모로 되돌림
+_LEADING_JAMO = str.maketrans({chr(0x1100 + i): ch for i, ch in enumerate(CHOSEONG)})
+MAX_GRAM = 3
+
+
+def normalize_name(text):
+    """검색용 정규화 (NFKC, 소문자, 연속 공백 1개로)"""
+    text = unicodedata.normalize('NFKC', str(text)).lower().translate(_LEADING_JAMO)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def choseong_of(text):
+    """한글 음절을 초성으로 바꾼 문자열 (한글 외 문자는 그대로)"""
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_START <= code <= HANGUL_END:
+            chars.append(CHOSEONG[(code - HANGUL_START) // 588])
+        else:
+            chars.append(ch)
+    return ''.join(chars)
+
+
+def _has_choseong(text):
+    return any(ch in CHOSEONG for ch in text)
+
+
+def _build_grams(strings):
+    """1~3-gram → 항목 번호 목록 (번호 오름차순)"""
+    grams = {}
+    for i, text in enumerate(strings):
+        seen = set()
+        for size in range(1, MAX_GRAM + 1):
+            for start in range(len(text) - size + 1):
+                gram = text[start:start + size]
+                if gram not in seen:
+                    seen.add(gram)
+                    grams.setdefault(gram, []).append(i)
+    return grams
+
+
+class NameIndex:
+    """상품명/상품-컬러명 검색 인덱스 (데이터 버전당 1회 생성)
+
+    entries: [(표시명, 품명, 칼라 또는 None)]
+    """
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.normalized = [normalize_name(label) for label, _, _ in self.entries]
+        self.choseong = [choseong_of(text) for text in self.normalized]
+        self._grams = _build_grams(self.normalized)
+        self._choseong_grams = _build_grams(self.choseong)
+
+    @classmethod
+    def from_frame(cls, sales_frame):
+        """SalesFrame의 상품/상품-컬러 목록으로 인덱스 생성"""
+        entries = [(product, product, None) for product in sales_frame.products]
+        entries += [(f"{product} - {color}", product, color) for product, color in sorted(sales_frame.sku_ranges)]
+        return cls(entries)
+
+    def _candidates(self, query, strings, grams):
+        """질의를 부분 문자열로 포함하는 항목 번호 목록"""
+        if len(query) <= MAX_GRAM:
+            return grams.get(query, [])
+        # 가장 희소한 3-gram 목록만 실제 문자열로 검증
+        postings = []
+        for start in range(len(query) - MAX_GRAM + 1):
+            posting = grams.get(query[start:start + MAX_GRAM])
+            if not posting:
+                return []
+            postings.append(posting)
+        rarest = min(postings, key=len)
+        return [i for i in rarest if query in strings[i]]
+
+    def search(self, query, limit=10, products_only=False):
+        """부분 문자열/초성 검색 - 접두 일치 > 앞쪽 일치 > 짧은 이름 > 이름 순 [(표시명, 품명, 칼라)]"""
+        query = normalize_name(query)
+        if not query:
+            return []
+        if _has_choseong(query):
+            query = choseong_of(query)
+            strings, grams = self.choseong, self._choseong_grams
+        else:
+            strings, grams = self.normalized, self._grams
+        matches = self._candidates(query, strings, grams)
+        if products_only:
+            matches = [i for i in matches if self.entries[i][2] is None]
+        ranked = sorted(matches, key=lambda i: (strings[i].find(query), len(strings[i]), self.normalized[i]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [self.entries[i] for i in ranked]
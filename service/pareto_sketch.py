@@ -0,0 +1,139 @@
+"""
+파레토 상위 상품 스케치 모듈
+단일 책임: 전체 기간 상품별 판매량 상위 K개를 Space-Saving 스케치로 고정 메모리에 유지/저장
+
+PARETO_MODE=sketch 이면 전체 기간 파레토(pareto_analysis, get_pareto_products, 파레토 차트)가
+스케치 상위 항목으로 계산되고, 기본값(exact)은 기존처럼 전체 행을 집계한다 (감사용 정확 모드).
+각 상품 추정치의 과대 오차는 저장된 error 이하이며, error는 (전체 판매량 / 용량) 이하이다.
+"""
+import os
+import threading
+import pandas as pd
+from service.db import load_pareto_sketch, save_pareto_sketch, read_sales_weights, get_sales_changes, get_last_change_id
+from service.sales_frame import SalesFrame, frame_of
+
+# 파레토 계산 모드: exact(전체 집계) / sketch(상위 K 스케치)
+PARETO_MODE = os.environ.get('PARETO_MODE', 'exact')
+# 스케치가 추적하는 최대 상품 수
+SKETCH_CAPACITY = int(os.environ.get('PARETO_SKETCH_CAPACITY', 500))
+
+
+class SpaceSavingSketch:
+    """가중치 Space-Saving 스케치 (capacity개 카운터로 상위 상품 판매량 추정)
+
+    counters: 품명 → [추정 판매량, 최대 과대 오차]
+    """
+
+    def __init__(self, capacity, counters=None, total=0.0, max_date=None, change_id=0):
+        self.capacity = capacity
+        self.counters = counters or {}
+        self.total = total
+        self.max_date = max_date
+        self.change_id = change_id
+
+    def add(self, key, weight):
+        """상품 판매량 추가 (반품 등 음수는 추적 중인 카운터와 전체 합계에만 반영)"""
+        self.total += weight
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += weight
+        elif weight <= 0:
+            return
+        elif len(self.counters) < self.capacity:
+            self.counters[key] = [weight, 0.0]
+        else:
+            # 가장 작은 카운터를 새 상품으로 교체 (교체 전 값이 새 상품의 최대 오차)
+            evicted = min(self.counters, key=lambda k: self.counters[k][0])
+            floor = self.counters.pop(evicted)[0]
+            self.counters[key] = [floor + weight, floor]
+
+    def add_rows(self, chunk):
+        """품명/실판매 DataFrame 청크 반영 (청크 내 상품별 합계를 먼저 구해 카운터 갱신 횟수 축소)"""
+        if chunk.empty:
+            return
+        weights = pd.to_numeric(chunk['실판매'], errors='coerce').fillna(0).groupby(chunk['품명'], sort=False).sum()
+        for key, weight in weights.items():
+            self.add(key, float(weight))
+        if '판매일자' in chunk.columns:
+            latest = chunk['판매일자'].max()
+            if self.max_date is None or latest > self.max_date:
+                self.max_date = latest
+
+    def top(self):
+        """추정 판매량 내림차순 [(품명, 추정 판매량, 최대 오차)]"""
+        items = [(key, count, error) for key, (count, error) in self.counters.items()]
+        return sorted(items, key=lambda item: item[1], reverse=True)
+
+    def rows(self):
+        return [(key, count, error) for key, (count, error) in self.counters.items()]
+
+
+_sketch = None
+# 적재/증분 반영/저장과 카운터 읽기를 직렬화 (동시 요청이 같은 청크를 두 번 더하지 않도록)
+_sketch_lock = threading.Lock()
+
+
+def _build_sketch(change_id):
+    """sales_data 전체를 청크 단위로 스트리밍해서 스케치 생성"""
+    sketch = SpaceSavingSketch(SKETCH_CAPACITY, change_id=change_id)
+    for chunk in read_sales_weights():
+        sketch.add_rows(chunk)
+    return sketch
+
+
+def get_pareto_sketch():
+    """변경 기록까지 반영된 스케치 반환 (새 판매일자 업로드는 증분 반영, 기존 날짜 덮어쓰기/삭제는 재생성)"""
+    with _sketch_lock:
+        return _sync_sketch()
+
+
+def _sync_sketch():
+    """get_pareto_sketch 본체 (_sketch_lock을 잡은 상태에서 호출)"""
+    global _sketch
+    if _sketch is None:
+        state, rows = load_pareto_sketch()
+        if state is not None and state['capacity'] == SKETCH_CAPACITY:
+            counters = {key: [count, error] for key, count, error in rows}
+            _sketch = SpaceSavingSketch(state['capacity'], counters, state['total'], state['max_date'], state['change_id'])
+
+    if _sketch is None:
+        # 생성 중 들어온 변경은 다음 조회 때 재생성으로 처리됨 (이미 반영된 날짜이므로)
+        _sketch = _build_sketch(get_last_change_id())
+    else:
+        changes = get_sales_changes(_sketch.change_id)
+        if not changes:
+            return _sketch
+        change_id = max(change[0] for change in changes)
+        dates = sorted({change[1] for change in changes})
+        if _sketch.max_date is not None and dates[0] <= _sketch.max_date:
+            # Space-Saving은 감산을 지원하지 않으므로 이미 반영된 날짜가 바뀌면 전체 재생성
+            _sketch = _build_sketch(change_id)
+        else:
+            for chunk in read_sales_weights(dates):
+                _sketch.add_rows(chunk)
+            _sketch.change_id = change_id
+    save_pareto_sketch(_sketch.capacity, _sketch.total, _sketch.max_date, _sketch.change_id, _sketch.rows())
+    return _sketch
+
+
+def product_sales_ranking(df, mode=None):
+    """상품별 판매량 내림차순 Series와 전체 판매량 (파레토 계산 공통)
+
+    스케치 모드는 get_sales_frame()으로 얻은 전체 카탈로그 프레임에만 적용되며,
+    상품/기간으로 잘라낸 프레임은 항상 정확 집계한다. 스케치 결과는 추적 중인 상위 상품만 포함한다.
+    """
+    mode = mode or PARETO_MODE
+    exclude_products = getattr(df, 'exclude_products', None)
+    if mode == 'sketch' and isinstance(df, SalesFrame) and exclude_products is not None:
+        with _sketch_lock:
+            sketch = _sync_sketch()
+            top = [(key, count) for key, count, _ in sketch.top() if key not in exclude_products]
+            excluded = sum(sketch.counters[key][0] for key in exclude_products if key in sketch.counters)
+            total = sketch.total
+        product_sales = pd.Series(dict(top), dtype='float64').rename_axis('품명').rename('실판매')
+        if not product_sales.empty and (product_sales == product_sales.round()).all():
+            product_sales = product_sales.astype('int64')
+        return product_sales, total - excluded
+
+    product_sales = frame_of(df).groupby('품명')['실판매'].sum().sort_values(ascending=False)
+    return product_sales, product_sales.sum()
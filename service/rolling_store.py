@@ -0,0 +1,254 @@
+"""
+누적합 기반 기간 판매량 저장소
+단일 책임: SKU/상품/전체별 일 단위 누적합 배열로 최근 N일 합계/평균을 O(1)에 조회
+
+키 종류: (품명, 칼라) 튜플 = SKU, 품명 문자열 = 상품, TOTAL_KEY(None) = 전체
+"""
+import numpy as np
+import pandas as pd
+
+TOTAL_KEY = None
+
+
+class RollingWindowStore:
+    """키별 일 단위 누적합(실판매, 행 수) 배열 저장소
+
+    sums[k, d+1] - sums[k, s] = 키 k의 s일~d일 실판매 합계 (일 번호는 start_day 기준)
+    counts는 같은 방식의 행 수 누적합으로, 기존 '최근 7일 행 평균'과 같은 평균을 낼 때 사용한다.
+    """
+
+    def __init__(self, keys, start_day, sums, counts, last_day, latest_stock, change_id=0):
+        self.keys = list(keys)
+        self.rows = {key: i for i, key in enumerate(self.keys)}
+        self.start_day = start_day
+        self.sums = sums
+        self.counts = counts
+        self.last_day = last_day
+        self.latest_stock = latest_stock
+        self.change_id = change_id
+
+    @property
+    def n_days(self):
+        return self.sums.shape[1] - 1
+
+    @classmethod
+    def from_frame(cls, sales_frame, change_id=0):
+        """SalesFrame 전체로부터 저장소 생성"""
+        df = sales_frame.df
+        if df.empty or '판매일자' not in df.columns:
+            return cls([TOTAL_KEY], None, np.zeros((1, 1)), np.zeros((1, 1), dtype='int64'),
+                       np.array([-1]), np.zeros(1), change_id)
+
+        start_day = df['판매일자'].min().to_datetime64().astype('datetime64[D]')
+        keys, codes = _frame_keys(df)
+        day = _day_numbers(df, start_day)
+        n_days = int(day.max()) + 1
+        daily_sums, daily_counts = _daily_matrix(df, codes, day, len(keys), n_days)
+
+        sums = np.zeros((len(keys), n_days + 1))
+        counts = np.zeros((len(keys), n_days + 1), dtype='int64')
+        np.cumsum(daily_sums, axis=1, out=sums[:, 1:])
+        np.cumsum(daily_counts, axis=1, out=counts[:, 1:])
+        last_day = _last_active_day(daily_counts)
+        latest_stock = _stock_on_day(df, codes, day, last_day, len(keys))
+        return cls(keys, start_day, sums, counts, last_day, latest_stock, change_id)
+
+    def day_number(self, date):
+        """날짜 → start_day 기준 일 번호"""
+        day = pd.Timestamp(date).to_datetime64().astype('datetime64[D]')
+        return int((day - self.start_day).astype('int64'))
+
+    def _window(self, row, days, as_of):
+        """누적합 조회 구간 (시작, 끝+1) - as_of가 없으면 해당 키의 마지막 판매일 기준"""
+        if self.start_day is None:
+            return 0, 0
+        end = int(self.last_day[row]) if as_of is None else self.day_number(as_of)
+        if end < 0:
+            return 0, 0
+        end = min(end, self.n_days - 1)
+        start = max(end - days + 1, 0)
+        return start, end + 1
+
+    def trailing_sum(self, key, days, as_of=None):
+        """최근 days일 실판매 합계"""
+        row = self.rows.get(key)
+        if row is None:
+            return 0.0
+        start, stop = self._window(row, days, as_of)
+        return float(self.sums[row, stop] - self.sums[row, start])
+
+    def trailing_count(self, key, days, as_of=None):
+        """최근 days일 행 수"""
+        row = self.rows.get(key)
+        if row is None:
+            return 0
+        start, stop = self._window(row, days, as_of)
+        return int(self.counts[row, stop] - self.counts[row, start])
+
+    def trailing_mean(self, key, days, as_of=None, per_day=False):
+        """최근 days일 평균 (기본: 행 평균, per_day=True이면 일 평균)"""
+        total = self.trailing_sum(key, days, as_of)
+        if per_day:
+            return total / days
+        count = self.trailing_count(key, days, as_of)
+        return total / count if count > 0 else 0.0
+
+    def total_sum(self, key):
+        """전체 기간 실판매 합계"""
+        row = self.rows.get(key)
+        return float(self.sums[row, -1]) if row is not None else 0.0
+
+    def last_date(self, key):
+        """키의 마지막 판매일 (없으면 None)"""
+        row = self.rows.get(key)
+        if row is None or self.last_day[row] < 0:
+            return None
+        return pd.Timestamp(self.start_day + np.timedelta64(int(self.last_day[row]), 'D'))
+
+    def current_stock(self, key):
+        """키의 마지막 판매일 현재고 합계"""
+        row = self.rows.get(key)
+        return float(self.latest_stock[row]) if row is not None else 0.0
+
+    def daily_values(self, key, days, as_of=None):
+        """최근 days일의 (날짜 배열, 일별 합계, 일별 행 수)"""
+        row = self.rows.get(key)
+        if row is None or self.start_day is None:
+            return np.array([], dtype='datetime64[D]'), np.array([]), np.array([], dtype='int64')
+        start, stop = self._window(row, days, as_of)
+        dates = self.start_day + np.arange(start, stop).astype('timedelta64[D]')
+        return dates, np.diff(self.sums[row, start:stop + 1]), np.diff(self.counts[row, start:stop + 1])
+
+    def updated(self, sales_frame, changes, change_id):
+        """변경된 (판매일자, 품명, 칼라)만 반영한 새 저장소 반환 (반영할 수 없으면 None → 전체 재생성)
+
+        changes: db.get_sales_changes() 결과. 변경일의 값은 새 SalesFrame에서 다시 집계해
+        (새 값 - 기존 값)만 더하므로 같은 변경을 두 번 반영해도 결과는 같다.
+        """
+        df = sales_frame.df
+        if self.start_day is None or df.empty:
+            return None
+        changed_days = np.array(sorted({self.day_number(date) for _, date, _, _ in changes}), dtype='int64')
+        if len(changed_days) == 0:
+            return RollingWindowStore(self.keys, self.start_day, self.sums, self.counts,
+                                      self.last_day, self.latest_stock, change_id)
+        if changed_days[0] < 0:
+            return None
+
+        # 변경일의 행만 다시 집계
+        touched = df[df['판매일자'].isin(self.start_day + changed_days.astype('timedelta64[D]'))]
+        touched_keys, touched_codes = _frame_keys(touched)
+        keys = list(self.keys)
+        rows = dict(self.rows)
+        for key in touched_keys:
+            if key not in rows:
+                rows[key] = len(keys)
+                keys.append(key)
+        # 변경 기록의 키 + 전체 키 (삭제로 사라진 키도 포함)
+        changed_rows = {rows[TOTAL_KEY]}
+        for _, _, product, color in changes:
+            for key in ((product, color), product):
+                if key in rows:
+                    changed_rows.add(rows[key])
+        changed_rows = np.array(sorted(changed_rows))
+
+        # 배열 복사 후 새 키(행)/새 날짜(열) 확장 - 새 열은 마지막 누적값을 이어 받음
+        n_days = max(self.n_days, int(changed_days[-1]) + 1)
+        sums = _extend(self.sums, len(keys), n_days)
+        counts = _extend(self.counts, len(keys), n_days)
+
+        # 변경일별 새 값 (키 행 × 변경일 열)
+        local_to_row = np.array([rows[key] for key in touched_keys])
+        row_codes = np.where(touched_codes >= 0, local_to_row[np.maximum(touched_codes, 0)], -1)
+        touched_day = np.searchsorted(changed_days, _day_numbers(touched, self.start_day))
+        new_sums, new_counts = _daily_matrix(touched, row_codes, touched_day, len(keys), len(changed_days))
+
+        # 변경일 이후 누적합에 (새 값 - 기존 값)을 더함
+        for i, day in enumerate(changed_days):
+            old_sums = sums[changed_rows, day + 1] - sums[changed_rows, day]
+            old_counts = counts[changed_rows, day + 1] - counts[changed_rows, day]
+            sums[changed_rows, day + 1:] += (new_sums[changed_rows, i] - old_sums)[:, None]
+            counts[changed_rows, day + 1:] += (new_counts[changed_rows, i] - old_counts)[:, None]
+
+        old_last_day = np.concatenate([self.last_day, np.full(len(keys) - len(self.keys), -1)])
+        last_day = old_last_day.copy()
+        last_day[changed_rows] = _last_active_day(np.diff(counts[changed_rows], axis=1))
+
+        # 마지막 판매일 현재고: 마지막 판매일이 변경일이면 변경일 행에서 재계산,
+        # 삭제로 마지막 판매일이 과거로 이동한 경우는 전체 재생성
+        latest_stock = np.concatenate([self.latest_stock, np.zeros(len(keys) - len(self.keys))])
+        on_changed_day = np.isin(last_day, changed_days)
+        if np.any((last_day != old_last_day) & ~on_changed_day & (last_day >= 0)):
+            return None
+        stock = _stock_on_day(touched, row_codes, _day_numbers(touched, self.start_day), last_day, len(keys))
+        latest_stock[on_changed_day] = stock[on_changed_day]
+        latest_stock[last_day < 0] = 0
+        return RollingWindowStore(keys, self.start_day, sums, counts, last_day, latest_stock, change_id)
+
+
+def _frame_keys(df):
+    """DataFrame에 등장하는 키 목록과 행별 키 번호 (열: 전체/상품/SKU, 해당 없음은 -1)"""
+    product_codes, product_uniques = pd.factorize(df['품명'])
+    color_codes, color_uniques = pd.factorize(df['칼라'])
+    n_colors = max(len(color_uniques), 1)
+    valid = (product_codes >= 0) & (color_codes >= 0)
+    pair = pd.Series(product_codes.astype('int64') * n_colors + color_codes).where(valid)
+    sku_codes, sku_uniques = pd.factorize(pair)
+    sku_uniques = np.asarray(sku_uniques, dtype='int64')
+
+    keys = [TOTAL_KEY] + list(product_uniques)
+    keys += [(product_uniques[code // n_colors], color_uniques[code % n_colors]) for code in sku_uniques]
+    offset = 1 + len(product_uniques)
+    codes = np.column_stack([
+        np.zeros(len(df), dtype='int64'),
+        np.where(product_codes >= 0, 1 + product_codes, -1),
+        np.where(sku_codes >= 0, offset + sku_codes, -1),
+    ])
+    return keys, codes
+
+
+def _day_numbers(df, start_day):
+    return (df['판매일자'].to_numpy(dtype='datetime64[D]') - start_day).astype('int64')
+
+
+def _daily_matrix(df, codes, day, n_keys, n_days):
+    """키 × 일 실판매 합계/행 수 행렬"""
+    sales = pd.to_numeric(df['실판매'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+    daily_sums = np.zeros(n_keys * n_days)
+    daily_counts = np.zeros(n_keys * n_days, dtype='int64')
+    for level in range(codes.shape[1]):
+        valid = codes[:, level] >= 0
+        flat = codes[valid, level] * n_days + day[valid]
+        daily_sums += np.bincount(flat, weights=sales[valid], minlength=n_keys * n_days)
+        daily_counts += np.bincount(flat, minlength=n_keys * n_days)
+    return daily_sums.reshape(n_keys, n_days), daily_counts.reshape(n_keys, n_days)
+
+
+def _stock_on_day(df, codes, day, target_day, n_keys):
+    """키별 target_day[키] 날짜의 현재고 합계"""
+    stock = pd.to_numeric(df['현재고'], errors='coerce').fillna(0).to_numpy(dtype='float64')
+    result = np.zeros(n_keys)
+    for level in range(codes.shape[1]):
+        key_rows = codes[:, level]
+        valid = key_rows >= 0
+        on_day = valid & (day == target_day[np.maximum(key_rows, 0)])
+        result += np.bincount(key_rows[on_day], weights=stock[on_day], minlength=n_keys)
+    return result
+
+
+def _last_active_day(daily_counts):
+    """키별 행이 있는 마지막 일 번호 (없으면 -1)"""
+    active = daily_counts > 0
+    if active.shape[1] == 0:
+        return np.full(active.shape[0], -1)
+    last = active.shape[1] - 1 - np.argmax(active[:, ::-1], axis=1)
+    return np.where(active.any(axis=1), last, -1)
+
+
+def _extend(cumulative, n_rows, n_days):
+    """누적합 배열을 (n_rows, n_days+1)로 복사 확장 (새 열은 마지막 누적값 유지, 새 행은 0)"""
+    extended = np.zeros((n_rows, n_days + 1), dtype=cumulative.dtype)
+    old_rows, old_cols = cumulative.shape
+    extended[:old_rows, :old_cols] = cumulative
+    extended[:old_rows, old_cols:] = cumulative[:, -1:]
+    return extended
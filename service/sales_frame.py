@@ -0,0 +1,222 @@
+"""
+판매 데이터 준비 모듈
+단일 책임: 데이터 버전당 1회 날짜 파싱/달력 컬럼 계산/SKU 정렬을 수행한 SalesFrame 제공
+"""
+import numpy as np
+import pandas as pd
+from service.db import load_from_db, get_data_version, get_last_change_id, get_sales_changes
+from service.rolling_store import RollingWindowStore
+from service.name_index import NameIndex
+from service.fuzzy_match import FuzzyMatcher
+from service.forecast import ForecastModel
+from service.date_dimension import dimension_positions
+
+# 요일번호(0=월요일) → 요일명 (pandas day_name()과 동일한 표기)
+DAY_NAMES = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+
+
+class SalesFrame:
+    """날짜/달력 컬럼이 미리 계산되고 SKU(품명, 칼라) 순으로 정렬된 판매 데이터 래퍼
+
+    분석/차트 함수는 이 객체를 그대로 받아 사용하며, 내부 DataFrame(df)을 수정하지 않는다.
+    추가되는 컬럼: 연도, ISO연도, ISO주차, 요일번호(0=월요일)
+    """
+
+    SORT_COLUMNS = ['품명', '칼라', '판매일자']
+    # 프로세스 풀 분석 작업에 넘기는 숫자/날짜 컬럼
+    ANALYSIS_COLUMNS = ['실판매', '현재고', '판매일자']
+
+    def __init__(self, df, version=None, prepared=False, change_id=0, exclude_products=None):
+        self.df = df if prepared else self._prepare(df)
+        self.version = version
+        self.change_id = change_id
+        # get_sales_frame()으로 만든 전체 카탈로그 프레임만 제외 상품 튜플을 가짐 (잘라낸 프레임은 None)
+        self.exclude_products = exclude_products
+        self._rolling_store = None
+        self._products = None
+        self._name_index = None
+        self._fuzzy_matcher = None
+        self._forecast_model = None
+        self._sku_ranges = None
+        self._product_ranges = None
+        self._date_order = None
+        self._column_arrays = None
+
+    @classmethod
+    def wrap(cls, data):
+        """DataFrame 또는 SalesFrame을 SalesFrame으로 변환 (이미 준비된 경우 그대로 반환)"""
+        if isinstance(data, cls):
+            return data
+        return cls(data)
+
+    @staticmethod
+    def _prepare(df):
+        """날짜 파싱, 달력 컬럼 추가, SKU/날짜 순 정렬 (생성 시 1회만 수행)"""
+        df = df.copy()
+        if '판매일자' in df.columns:
+            dates = pd.to_datetime(df['판매일자'])
+            df['판매일자'] = dates
+            # 달력 컬럼은 날짜 차원에서 일수 인덱스로 한 번에 조회
+            dimension, positions = dimension_positions(dates)
+            df['연도'] = dimension.year[positions]
+            df['ISO연도'] = dimension.iso_year[positions]
+            df['ISO주차'] = dimension.iso_week[positions]
+            df['요일번호'] = dimension.weekday[positions]
+        sort_columns = [col for col in SalesFrame.SORT_COLUMNS if col in df.columns]
+        if sort_columns and not df.empty:
+            df = df.sort_values(sort_columns, kind='mergesort')
+        return df.reset_index(drop=True)
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    def __len__(self):
+        return len(self.df)
+
+    @property
+    def sku_ranges(self):
+        """(품명, 칼라) → (시작 행, 끝 행) 범위 인덱스 (정렬된 프레임 기준, 지연 생성)"""
+        if self._sku_ranges is None:
+            if self.df.empty or '품명' not in self.df.columns or '칼라' not in self.df.columns:
+                self._sku_ranges = {}
+            else:
+                positions = self.df.groupby(['품명', '칼라'], sort=False).indices
+                self._sku_ranges = {key: (int(pos[0]), int(pos[-1]) + 1) for key, pos in positions.items()}
+        return self._sku_ranges
+
+    @property
+    def product_ranges(self):
+        """품명 → (시작 행, 끝 행) 범위 인덱스 (품명 우선 정렬이므로 상품 행도 연속, 지연 생성)"""
+        if self._product_ranges is None:
+            if self.df.empty or '품명' not in self.df.columns:
+                self._product_ranges = {}
+            else:
+                positions = self.df.groupby('품명', sort=False).indices
+                self._product_ranges = {key: (int(pos[0]), int(pos[-1]) + 1) for key, pos in positions.items()}
+        return self._product_ranges
+
+    def column_arrays(self):
+        """분석 작업용 컬럼 배열 {컬럼명: numpy 배열} (실판매/현재고는 float64, 판매일자는 datetime64[ns])"""
+        if self._column_arrays is None:
+            arrays = {}
+            for column in self.ANALYSIS_COLUMNS:
+                if column not in self.df.columns:
+                    continue
+                if column == '판매일자':
+                    arrays[column] = self.df[column].to_numpy(dtype='datetime64[ns]')
+                else:
+                    arrays[column] = pd.to_numeric(self.df[column], errors='coerce').to_numpy(dtype='float64')
+            self._column_arrays = arrays
+        return self._column_arrays
+
+    def rolling_store(self):
+        """최근 N일 합계/평균 조회용 누적합 저장소 (지연 생성)"""
+        if self._rolling_store is None:
+            self._rolling_store = RollingWindowStore.from_frame(self, self.change_id)
+        return self._rolling_store
+
+    @property
+    def products(self):
+        """정렬된 상품명 목록 (sorted(df['품명'].unique())와 동일, 지연 생성)"""
+        if self._products is None:
+            self._products = sorted(self.product_ranges)
+        return self._products
+
+    def name_index(self):
+        """상품/상품-컬러명 검색 인덱스 (지연 생성)"""
+        if self._name_index is None:
+            self._name_index = NameIndex.from_frame(self)
+        return self._name_index
+
+    def fuzzy_matcher(self):
+        """상품명 유사 검색기 (지연 생성)"""
+        if self._fuzzy_matcher is None:
+            self._fuzzy_matcher = FuzzyMatcher(self.products)
+        return self._fuzzy_matcher
+
+    def forecast_model(self):
+        """전체/상품/SKU 판매 예측 모델 (누적합 저장소로 지연 적합)"""
+        if self._forecast_model is None:
+            self._forecast_model = ForecastModel.from_store(self.rolling_store())
+        return self._forecast_model
+
+    @property
+    def date_order(self):
+        """판매일자 기준 안정 정렬 순서 (행 위치 배열)"""
+        if self._date_order is None:
+            if self.df.empty or '판매일자' not in self.df.columns:
+                self._date_order = np.arange(len(self.df))
+            else:
+                self._date_order = np.argsort(self.df['판매일자'].values, kind='stable')
+        return self._date_order
+
+    @property
+    def latest_date(self):
+        """가장 최근 판매일자"""
+        if self.df.empty:
+            return None
+        return self.df['판매일자'].max()
+
+    def sku_frame(self, product, color):
+        """특정 SKU(품명, 칼라)의 행 (날짜순 정렬 상태)"""
+        return self.select(product, color).df
+
+    def select(self, product, color=None):
+        """상품(또는 상품-컬러) 행을 범위 인덱스로 잘라 SalesFrame으로 반환 (전체 비교 없이 O(k))
+
+        정렬된 프레임의 연속 구간이므로 df[df['품명'] == product]와 같은 행/순서가 된다.
+        """
+        if color is None:
+            bounds = self.product_ranges.get(product)
+        else:
+            bounds = self.sku_ranges.get((product, color))
+        start, stop = bounds if bounds is not None else (0, 0)
+        return SalesFrame(self.df.iloc[start:stop], version=self.version, prepared=True)
+
+    def filter(self, mask):
+        """행 필터링 결과를 SalesFrame으로 반환 (날짜 재파싱/복사 없음)"""
+        return SalesFrame(self.df[mask], version=self.version, prepared=True)
+
+    def year(self, year):
+        """특정 연도 데이터만 반환"""
+        if self.df.empty:
+            return self
+        return self.filter(self.df['연도'] == year)
+
+
+def frame_of(data):
+    """SalesFrame이면 내부 DataFrame을, DataFrame이면 그대로 반환 (날짜가 필요 없는 집계용)"""
+    if isinstance(data, SalesFrame):
+        return data.df
+    return data
+
+
+# 데이터 버전별 SalesFrame 캐시
+_frame_cache = {}
+
+
+def get_sales_frame(exclude_products=()):
+    """현재 데이터 버전의 SalesFrame 반환 (버전이 바뀐 경우에만 DB에서 다시 로드)
+
+    이전 버전의 누적합 저장소가 있으면 변경 기록(sales_changes)에 있는 날짜만 반영해 이어 받는다.
+    """
+    version = get_data_version()
+    key = tuple(exclude_products)
+    cached = _frame_cache.get(key)
+    if cached is not None and cached.version == version:
+        return cached
+
+    # 변경 기록 id를 먼저 읽음 (로드 중 들어온 변경은 다음 갱신 때 다시 반영되며, 반영은 멱등)
+    change_id = get_last_change_id()
+    df = load_from_db()
+    if exclude_products and not df.empty and '품명' in df.columns:
+        df = df[~df['품명'].isin(exclude_products)]
+    sales_frame = SalesFrame(df, version=version, change_id=change_id, exclude_products=key)
+    if cached is not None and cached._rolling_store is not None:
+        previous = cached._rolling_store
+        sales_frame._rolling_store = previous.updated(
+            sales_frame, get_sales_changes(previous.change_id), change_id
+        )
+    _frame_cache[key] = sales_frame
+    return sales_frame
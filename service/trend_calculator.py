@@ -1,31 +1,271 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 import numpy as np
+from numpy.lib.stride_tricks import as_strided
 from scipy import interpolate
 
+# series_bands에서 한 번에 계산하는 최대 행 수 (메모리 상한)
+BATCH_ROWS = 256
+# 추세 결과 LRU 크기 ((시계열 지문, window, frac, 종류) 단위)
+TREND_CACHE_SIZE = int(os.environ.get('TREND_CACHE_SIZE', 512))
+
+_trend_cache = OrderedDict()
+_trend_cache_counts = {'hits': 0, 'misses': 0}
+# 요청 스레드(패널 병렬 요청)와 스냅샷 생성 스레드가 같이 쓰므로 목록 갱신은 잠금 안에서 (계산은 잠금 밖)
+_trend_lock = threading.Lock()
+
+
+def _fingerprint(y):
+    """시계열 지문 (float64 바이트 해시 + 모양)"""
+    y = np.ascontiguousarray(y, dtype='float64')
+    return hashlib.blake2b(y.tobytes(), digest_size=16).digest(), y.shape
+
+
+def _freeze(result):
+    """캐시에 넣는 배열은 읽기 전용으로 (호출한 쪽의 수정이 캐시에 섞이지 않도록)"""
+    for array in (result if isinstance(result, tuple) else (result,)):
+        if isinstance(array, np.ndarray):
+            array.setflags(write=False)
+    return result
+
+
+def trend_cache_stats():
+    """추세 캐시 적중/미적중 횟수와 현재 크기"""
+    return {**_trend_cache_counts, 'size': len(_trend_cache), 'capacity': TREND_CACHE_SIZE}
+
+
+@lru_cache(maxsize=64)
+def _kernels(n, k):
+    """길이 n, 이웃 k개일 때의 tricube 모멘트 커널 (w, w·x, w·x², x는 점 기준 상대 위치)
+
+    등간격이므로 이웃 창은 연속 구간이고, 양 끝 k//2, k-1-k//2개 점을 제외한 내부 점은
+    모두 같은 커널을 쓴다. 반환: (내부 커널 (k, 3), 앞쪽 점별 커널 (k, h·3), 뒤쪽 점별 커널 (k, t·3),
+    가중치 1일 때의 점별 모멘트 (n, 3))
+    """
+    points = np.arange(n)
+    start = np.clip(points - k // 2, 0, n - k)
+    offset = (start[:, None] + np.arange(k)[None, :] - points[:, None]).astype('float64')
+    # 창 안에서 가장 먼 이웃까지의 거리로 정규화 (가장 먼 이웃은 가중치 0)
+    radius = np.maximum(np.abs(offset).max(axis=1, keepdims=True), 1)
+    weights = (1 - np.clip(np.abs(offset) / radius, 0, 1) ** 3) ** 3
+    moments = np.stack([weights, weights * offset, weights * offset * offset], axis=-1)
+    head, tail = k // 2, k - 1 - k // 2
+    # 양 끝 점별 커널은 (k, 점 수 × 3) 행렬로 펼쳐 한 번의 행렬곱으로 계산
+    edge = lambda part: np.ascontiguousarray(part.transpose(1, 0, 2).reshape(k, -1))
+    return moments[head], edge(moments[:head]), edge(moments[n - tail:]), moments.sum(axis=1)
+
+
+def _window_moments(values, kernels):
+    """값 배열(마지막 축이 시계열)의 점별 이웃 창 가중합 (..., n, 3) - 내부 점은 sliding window @ 커널"""
+    interior, head, tail, _ = kernels
+    values = np.ascontiguousarray(values)
+    k, n = interior.shape[0], values.shape[-1]
+    lead = values.shape[:-1]
+    step = values.strides[-1]
+    windows = as_strided(values, shape=lead + (n - k + 1, k), strides=values.strides + (step,), writeable=False)
+    return np.concatenate([
+        (values[..., :k] @ head).reshape(lead + (-1, 3)),
+        windows @ interior,
+        (values[..., -k:] @ tail).reshape(lead + (-1, 3)),
+    ], axis=-2)
+
+
+def _median(values):
+    """마지막 축 중앙값 (keepdims, NaN 제외 - 값이 없으면 0)"""
+    ordered = np.sort(values, axis=-1)
+    count = np.isfinite(values).sum(axis=-1, keepdims=True)
+    low = np.take_along_axis(ordered, np.maximum((count - 1) // 2, 0), axis=-1)
+    high = np.take_along_axis(ordered, np.maximum(count // 2 - (count == 0), 0), axis=-1)
+    return np.where(count > 0, (low + high) / 2, 0.0)
+
+
+def _solve(s, t, fallback):
+    """가중 모멘트 (s0, s1, s2), (t0, t1)로 국소 선형 회귀의 점 위치(상대 x=0) 적합값 계산
+
+    창 안 가중치 합이 0인 점은 fallback 값을 유지한다.
+    """
+    s0, s1, s2 = s[..., 0], s[..., 1], s[..., 2]
+    t0, t1 = t[..., 0], t[..., 1]
+    det = s0 * s2 - s1 * s1
+    # 가중치가 한쪽에 몰려 기울기를 정할 수 없으면 가중 평균 사용
+    level = np.where(s0 > 0, t0 / np.where(s0 > 0, s0, 1), fallback)
+    return np.divide(s2 * t0 - s1 * t1, det, out=level, where=det > 1e-10 * s0 * s2)
+
+
 class TrendCalculator:
-    """LOWESS 기반 추세 계산기"""
-    
-    def __init__(self, window=7, frac=0.2):
+    """LOWESS 기반 추세 계산기
+
+    등간격 x(0, 1, ..., n-1)에 대한 국소 선형 회귀. 각 점에서 가장 가까운 k = ceil(frac·n)개
+    (최소 window개, 최대 n개) 이웃에 tricube 가중치를 주고, 잔차 bisquare 가중치로
+    robust_iterations번 다시 적합한다. 가중합은 고정 커널의 sliding window 곱으로 계산한다 (O(n·k)).
+    y는 1차원(시계열 1개) 또는 2차원(행별 시계열, NaN = 결측)을 받는다.
+    결측 칸은 가중치 0으로 적합에서 빠지고, 이웃에 관측값이 있으면 적합값이 채워진다 (없으면 NaN).
+    """
+
+    def __init__(self, window=7, frac=0.2, robust_iterations=2):
         self.window = window
         self.frac = frac
-    
-    def _lowess(self, y):
-        """LOWESS 스무딩"""
-        n = len(y)
+        self.robust_iterations = robust_iterations
+
+    def _cached(self, kind, y, compute):
+        """같은 시계열/설정의 결과는 LRU에서 반환 (없으면 compute(y) 후 저장)"""
+        y = np.asarray(y, dtype='float64')
+        key = (_fingerprint(y), self.window, self.frac, self.robust_iterations, kind)
+        with _trend_lock:
+            cached = _trend_cache.get(key)
+            if cached is not None:
+                _trend_cache.move_to_end(key)
+                _trend_cache_counts['hits'] += 1
+                return cached
+            _trend_cache_counts['misses'] += 1
+        result = _freeze(compute(y))
+        with _trend_lock:
+            _trend_cache[key] = result
+            if len(_trend_cache) > TREND_CACHE_SIZE:
+                _trend_cache.popitem(last=False)
+        return result
+
+    def _neighbors(self, n):
+        """이웃 수 k"""
+        k = int(np.ceil(self.frac * n - 1e-10))
+        return int(min(max(k, self.window, 3), n))
+
+    def _fit(self, y, with_spread=True):
+        """(중간선, 국소 평균 절대 잔차 또는 None) - 밴드 계산 공통"""
+        y = np.asarray(y, dtype='float64')
+        n = y.shape[-1]
         if n < 3:
-            return np.array(y)
-        
-        # 간단한 이동평균 기반 스무딩
-        smoothed = np.convolve(y, np.ones(self.window)/self.window, mode='same')
-        return smoothed
-    
+            return y.copy(), np.zeros_like(y)
+        kernels = _kernels(n, self._neighbors(n))
+        observed = np.isfinite(y)
+        complete = bool(observed.all())
+        values = y if complete else np.where(observed, y, 0.0)
+        prior = observed.astype('float64')
+
+        if complete:
+            fitted = _solve(kernels[3], _window_moments(values, kernels), np.nan)
+        else:
+            moments = _window_moments(np.stack([prior, values], axis=-2), kernels)
+            fitted = _solve(moments[..., 0, :, :], moments[..., 1, :, :], np.nan)
+        for _ in range(self.robust_iterations):
+            residual = np.where(observed, values - fitted, 0.0)
+            abs_residual = np.abs(residual)
+            scale = _median(abs_residual if complete else np.where(observed, abs_residual, np.nan))
+            # 판매가 드문 시계열은 잔차 중앙값이 0이 되기 쉬우므로 평균 절대 잔차로 대체
+            mean_abs = abs_residual.sum(axis=-1, keepdims=True) / np.maximum(observed.sum(axis=-1, keepdims=True), 1)
+            scale = np.where(scale > 0, scale, mean_abs)
+            if not scale.any():
+                break
+            u = np.divide(residual, 6 * scale, out=np.zeros_like(residual), where=scale > 0)
+            robust = np.maximum(1 - u * u, 0) ** 2
+            if not complete:
+                robust *= prior
+            # robust 가중치와 (가중치 × y)의 모멘트를 한 번에 계산
+            moments = _window_moments(np.stack([robust, robust * values], axis=-2), kernels)
+            fitted = _solve(moments[..., 0, :, :], moments[..., 1, :, :], fitted)
+
+        if not with_spread:
+            return fitted, None
+        deviation = np.where(observed, np.abs(values - fitted), 0.0)
+        if complete:
+            spread = _window_moments(deviation, kernels)[..., 0] / kernels[3][:, 0]
+        else:
+            moments = _window_moments(np.stack([prior, deviation], axis=-2), kernels)
+            weight = moments[..., 0, :, 0]
+            spread = np.divide(moments[..., 1, :, 0], weight, out=np.full_like(weight, np.nan), where=weight > 0)
+        return fitted, spread
+
+    def _lowess(self, y):
+        """LOWESS 스무딩 (robust 반복 포함)"""
+        return self._fit(y, with_spread=False)[0]
+
+    def bands(self, y):
+        """(하단, 중간, 상단) 추세선을 LOWESS 1회로 계산 - 하단/상단은 중간선 ∓ 국소 평균 절대 잔차
+
+        y가 2차원이면 모든 행을 한 번의 행렬 연산으로 계산한다. 결과는 추세 캐시에서 공유하므로 읽기 전용.
+        """
+        def compute(y):
+            mid, spread = self._fit(y)
+            return mid - spread, mid, mid + spread
+        return self._cached('bands', y, compute)
+
+    def trailing_bands(self, values):
+        """마지막 점의 (하단, 중간, 상단) - 최근 값 창 전체를 이웃으로 하는 끝점 LOWESS (O(창 길이))
+
+        values: (창,) 또는 (행, 창) 최근 값 (오래된 값 → 최근 값, NaN = 결측/앞쪽 채움).
+        마지막 점 기준 tricube 가중 국소 선형 회귀(가장 오래된 관측값 가중치 0)를 하고,
+        창 안 잔차로 robust_iterations번 bisquare 재적합한다. 하단/상단은 중간선 ∓ 가중 평균 절대 잔차.
+        """
+        return self._cached('trailing', values, self._trailing_bands)
+
+    def _trailing_bands(self, values):
+        """trailing_bands 계산 (캐시 없음)"""
+        observed = np.isfinite(values)
+        y = np.where(observed, values, 0.0)
+        width = values.shape[-1]
+        x = np.arange(width, dtype='float64') - (width - 1)
+        # 행별 첫 관측값까지의 거리로 정규화
+        radius = np.maximum(width - 1 - np.argmax(observed, axis=-1), 1)[..., None]
+        base = (1 - np.clip(np.abs(x) / radius, 0, 1) ** 3) ** 3 * observed
+
+        def fit(weights):
+            s0, s1, s2 = weights.sum(axis=-1), (weights * x).sum(axis=-1), (weights * x * x).sum(axis=-1)
+            t0, t1 = (weights * y).sum(axis=-1), (weights * x * y).sum(axis=-1)
+            det = s0 * s2 - s1 * s1
+            # 기울기를 정할 수 없으면 가중 평균 (끝점 x = 0이므로 절편이 적합값)
+            slope = np.where(det > 1e-10 * s0 * s2, (s0 * t1 - s1 * t0) / np.where(det > 0, det, 1), 0.0)
+            level = np.where(s0 > 0, (t0 - slope * s1) / np.where(s0 > 0, s0, 1), np.nan)
+            return level, np.where(observed, y - level[..., None] - slope[..., None] * x, 0.0)
+
+        mid, residual = fit(base)
+        for _ in range(self.robust_iterations):
+            abs_residual = np.abs(residual)
+            scale = _median(np.where(observed, abs_residual, np.nan))
+            mean_abs = abs_residual.sum(axis=-1, keepdims=True) / np.maximum(observed.sum(axis=-1, keepdims=True), 1)
+            scale = np.where(scale > 0, scale, mean_abs)
+            if not scale.any():
+                break
+            u = np.divide(residual, 6 * scale, out=np.zeros_like(residual), where=scale > 0)
+            mid, residual = fit(base * np.maximum(1 - u * u, 0) ** 2)
+
+        weight = base.sum(axis=-1)
+        spread = np.divide((base * np.abs(residual)).sum(axis=-1), weight, out=np.zeros_like(weight), where=weight > 0)
+        return mid - spread, mid, mid + spread
+
+    def _by_length(self, series_list, compute):
+        """길이가 같은 시계열끼리 2차원으로 묶어 compute(행렬) 실행 후 입력 순서대로 행 결과 반환"""
+        series_list = [np.asarray(series, dtype='float64') for series in series_list]
+        results = [None] * len(series_list)
+        groups = {}
+        for i, series in enumerate(series_list):
+            groups.setdefault(len(series), []).append(i)
+        for members in groups.values():
+            for start in range(0, len(members), BATCH_ROWS):
+                chunk = members[start:start + BATCH_ROWS]
+                computed = compute(np.stack([series_list[i] for i in chunk]))
+                for row, i in enumerate(chunk):
+                    results[i] = computed[row]
+        return results
+
+    def series_bands(self, series_list):
+        """길이가 서로 다른 시계열 목록의 밴드 [(하단, 중간, 상단)] (시계열별 bands()와 같은 결과)"""
+        return [tuple(rows) for rows in self._by_length(series_list, lambda matrix: np.stack(self.bands(matrix), axis=1))]
+
+    def series_mid_trend(self, series_list):
+        """길이가 서로 다른 시계열 목록의 중간 추세선 (시계열별 mid_trend()와 같은 결과)"""
+        return self._by_length(series_list, self.mid_trend)
+
     def lower_trend(self, y):
-        """하단 추세선"""
-        return self._lowess(y) * 0.8
-    
+        """하단 추세선 (중간선 - 국소 평균 절대 잔차)"""
+        return self.bands(y)[0]
+
     def upper_trend(self, y):
-        """상단 추세선"""
-        return self._lowess(y) * 1.2
-    
+        """상단 추세선 (중간선 + 국소 평균 절대 잔차)"""
+        return self.bands(y)[2]
+
     def mid_trend(self, y):
-        """중간 추세선"""
-        return self._lowess(y) 
\ No newline at end of file
+        """중간 추세선 (읽기 전용)"""
+        return self._cached('mid', y, self._lowess)
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+SKU별 추세 누적기 모듈
+단일 책임: SKU별 최근 window개 판매 행의 실판매를 유지/저장해서 새 판매일이 들어오면 O(window)로 끝점 추세 밴드 갱신
+
+- 값은 날짜순 판매 행(사이즈 단위) 그대로이며 일별 합계가 아님 (재고 알림의 현재고/최근 7일 평균과 같은 단위)
+- 새 판매일(기존 마지막 판매일 이후) 업로드는 해당 SKU 누적기에 그날 행 값만 추가
+- 기존 날짜 덮어쓰기/삭제가 섞인 SKU는 누적기를 버리고, 다음 조회 때 SalesFrame에서 그 SKU만 다시 만듦
+- 밴드는 TrendCalculator.trailing_bands (마지막 행 기준 끝점 LOWESS, 창 = 최근 window개 행)
+"""
+import os
+import threading
+import numpy as np
+from service.db import load_trend_stream, save_trend_stream, get_sales_changes
+from service.trend_calculator import TrendCalculator
+
+# SKU별로 유지하는 최근 판매 행 수 (끝점 추세 창 크기)
+TREND_STREAM_WINDOW = int(os.environ.get('TREND_STREAM_WINDOW', 60))
+
+
+class TrendAccumulator:
+    """SKU 1개의 최근 window개 판매 행 실판매 (날짜순, 오래된 값 → 최근 값)"""
+
+    def __init__(self, window, values=(), last_date=None):
+        self.window = window
+        self.values = np.asarray(values, dtype='float64')[-window:]
+        self.last_date = last_date
+
+    def append(self, date, values):
+        """새 판매일의 행 값 추가 - 마지막 판매일 이전이거나 같은 날짜면 False (그날 행 전체를 알 수 없으므로)"""
+        if self.last_date is not None and date <= self.last_date:
+            return False
+        self.values = np.append(self.values, values)[-self.window:]
+        self.last_date = date
+        return True
+
+
+def sku_accumulator(arrays, start, stop, window):
+    """SalesFrame SKU 행 범위(날짜순)의 최근 window개 행 실판매로 누적기 생성"""
+    sales = np.nan_to_num(np.asarray(arrays['실판매'][max(start, stop - window):stop], dtype='float64'))
+    last_date = arrays['판매일자'][stop - 1].astype('datetime64[D]') if stop > start else None
+    return TrendAccumulator(window, sales, last_date)
+
+
+class TrendStream:
+    """SKU → TrendAccumulator 모음과 반영한 변경 기록 id"""
+
+    def __init__(self, window, accumulators=None, change_id=0):
+        self.window = window
+        self.accumulators = accumulators or {}
+        self.change_id = change_id
+
+    def ensure(self, sales_frame, keys):
+        """누적기가 없는 SKU를 SalesFrame에서 생성 - 새로 만든 키 목록 반환"""
+        sku_ranges = sales_frame.sku_ranges
+        missing = [key for key in keys if key not in self.accumulators and key in sku_ranges]
+        if missing:
+            arrays = sales_frame.column_arrays()
+            for key in missing:
+                self.accumulators[key] = sku_accumulator(arrays, *sku_ranges[key], self.window)
+        return missing
+
+    def apply_changes(self, sales_frame, changes, change_id):
+        """변경 기록 반영 - 새 판매일은 값 추가, 그 외는 누적기 삭제. 바뀐 키 목록 반환"""
+        changed_days = {}
+        for _, date, product, color in changes:
+            changed_days.setdefault((product, color), set()).add(np.datetime64(str(date)[:10], 'D'))
+        sku_ranges = sales_frame.sku_ranges
+        arrays = sales_frame.column_arrays() if changed_days else None
+        for key, days in changed_days.items():
+            accumulator = self.accumulators.get(key)
+            if accumulator is None:
+                continue
+            if key not in sku_ranges or accumulator.last_date is None or min(days) <= accumulator.last_date:
+                # 기존 날짜 변경/삭제 또는 현재 프레임에 없는 SKU → 다음 조회 때 재생성
+                del self.accumulators[key]
+                continue
+            start, stop = sku_ranges[key]
+            sku_days = arrays['판매일자'][start:stop].astype('datetime64[D]')
+            for day in sorted(days):
+                # SKU 범위는 날짜순이므로 해당 날짜 행만 이분 탐색으로 추가
+                lo, hi = np.searchsorted(sku_days, day, side='left'), np.searchsorted(sku_days, day, side='right')
+                if hi > lo:
+                    accumulator.append(day, np.nan_to_num(np.asarray(arrays['실판매'][start + lo:start + hi], dtype='float64')))
+        self.change_id = change_id
+        return list(changed_days)
+
+    def bands(self, keys, calculator=None):
+        """SKU별 마지막 행 (하단, 중간, 상단) 추세 {키: (low, mid, high)} - 누적기가 있는 키만"""
+        calculator = calculator or TrendCalculator()
+        keys = [key for key in keys if key in self.accumulators and len(self.accumulators[key].values) > 0]
+        if not keys:
+            return {}
+        matrix = np.full((len(keys), self.window), np.nan)
+        for row, key in enumerate(keys):
+            values = self.accumulators[key].values
+            matrix[row, self.window - len(values):] = values
+        low, mid, high = calculator.trailing_bands(matrix)
+        return {key: (float(low[row]), float(mid[row]), float(high[row])) for row, key in enumerate(keys)}
+
+    def rows(self, keys=None):
+        """저장용 [(품명, 칼라, last_date, 최근 값 list 또는 None)]"""
+        keys = self.accumulators if keys is None else keys
+        rows = []
+        for product, color in keys:
+            accumulator = self.accumulators.get((product, color))
+            if accumulator is None:
+                rows.append((product, color, None, None))
+            else:
+                last_date = str(accumulator.last_date) if accumulator.last_date is not None else None
+                rows.append((product, color, last_date, accumulator.values.tolist()))
+        return rows
+
+
+_stream = None
+# 적재/변경 반영/저장과 누적기 읽기를 직렬화 (동시 요청이 같은 누적기를 고치거나 고치는 중에 읽지 않도록)
+_stream_lock = threading.Lock()
+
+
+def get_trend_stream(sales_frame, keys=()):
+    """sales_frame(get_sales_frame() 전체 카탈로그 프레임)까지 반영된 누적기 반환, keys 누적기는 보장
+
+    변경 기록에 있는 SKU만 갱신하고 바뀐 누적기만 저장한다.
+    """
+    with _stream_lock:
+        return _sync_stream(sales_frame, keys)
+
+
+def _sync_stream(sales_frame, keys):
+    """get_trend_stream 본체 (_stream_lock을 잡은 상태에서 호출)"""
+    global _stream
+    if _stream is None:
+        state, rows = load_trend_stream()
+        if state is not None and state['window_size'] == TREND_STREAM_WINDOW:
+            accumulators = {
+                (product, color): TrendAccumulator(TREND_STREAM_WINDOW, tail, np.datetime64(last_date, 'D') if last_date else None)
+                for product, color, last_date, tail in rows
+            }
+            _stream = TrendStream(TREND_STREAM_WINDOW, accumulators, state['change_id'])
+
+    if _stream is None:
+        _stream = TrendStream(TREND_STREAM_WINDOW, change_id=sales_frame.change_id)
+        _stream.ensure(sales_frame, sales_frame.sku_ranges)
+        save_trend_stream(_stream.window, _stream.change_id, _stream.rows(), replace=True)
+    else:
+        changed = []
+        applied = _stream.change_id < sales_frame.change_id
+        if applied:
+            changes = [change for change in get_sales_changes(_stream.change_id) if change[0] <= sales_frame.change_id]
+            changed = _stream.apply_changes(sales_frame, changes, sales_frame.change_id)
+        changed += _stream.ensure(sales_frame, keys)
+        if changed or applied:
+            save_trend_stream(_stream.window, _stream.change_id, _stream.rows(dict.fromkeys(changed)))
+    return _stream
+
+
+def trailing_trend_bands(sales_frame, keys, calculator=None):
+    """SKU별 마지막 행 추세 밴드 {키: (low, mid, high)}
+
+    전체 카탈로그 프레임은 저장된 누적기를 이어서 쓰고, 상품/기간으로 잘라낸 프레임은 그 프레임으로 새로 만든다.
+    """
+    if getattr(sales_frame, 'exclude_products', None) is not None:
+        with _stream_lock:
+            return _sync_stream(sales_frame, keys).bands(keys, calculator)
+    stream = TrendStream(TREND_STREAM_WINDOW)
+    stream.ensure(sales_frame, keys)
+    return stream.bands(keys, calculator)
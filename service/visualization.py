@@ -1,5 +1,4 @@
-from datetime import datetime
-import pandas as pd
+from datetime import datetime, date
 import numpy as np
 from .charts import (
     create_sales_trend_chart,
@@ -9,13 +8,40 @@ from .charts import (
     create_size_sales_chart,
     create_pareto_analysis_chart
 )
+from .sales_frame import SalesFrame
+from .compare_align import compare_overlay
+from .chart_cache import cached_chart
 
-def create_visualizations(df, only_product=False, all_dates=None, trend_window=7, trend_frac=0.08, compare_df=None, weekly_client_data=None):
-    """ECharts용 대시보드 그래프 데이터 생성"""
+def create_visualizations(df, only_product=False, all_dates=None, trend_window=7, trend_frac=0.08, compare_df=None, weekly_client_data=None, cache_scope=None, kinds=None):
+    """ECharts용 대시보드 그래프 데이터 생성
+
+    cache_scope: 차트 캐시 범위 (예: ('dashboard', 품명, 칼라)) - 주면 차트별로 데이터 버전/오늘 날짜와 묶어 캐시
+    (같은 범위에는 항상 같은 방식으로 잘라낸 df를 넘겨야 함)
+    kinds: 만들 차트 종류 (예: ('sales_trend',)) - 없으면 화면에 해당하는 전체 차트 (패널별 개별 요청용)
+    """
     charts = {}
+    wanted = lambda kind: kinds is None or kind in kinds
+    # 날짜 파싱/달력 컬럼은 한 번만 준비해서 모든 차트 함수에 전달
+    df = SalesFrame.wrap(df)
+    # 비교 상품 데이터도 한 번만 파싱해서 일별/주별 차트가 같이 사용 (두 차트를 안 만들면 파싱하지 않음)
+    if wanted('sales_trend') or (only_product and wanted('weekly_sales_trend')):
+        compare_df = compare_overlay(compare_df, datetime.now().year)
+    else:
+        compare_df = None
+    compare_id = compare_df.fingerprint if compare_df is not None else None
+
+    # 차트 캐시 키 (차트 종류, 범위, 데이터 버전, 오늘 날짜, 상세 여부, 차트별 입력) - 버전이 없는 df는 캐시하지 않음
+    def chart_key(kind, *extra):
+        if cache_scope is None or df.version is None:
+            return None
+        return (kind, *cache_scope, df.version, date.today().isoformat(), only_product, *extra)
     
     # 1. 판매 추세 그래프
-    sales_trend = create_sales_trend_chart(df, only_product, all_dates, trend_window, trend_frac, compare_df)
+    sales_trend = None
+    if wanted('sales_trend'):
+        sales_trend = cached_chart(
+            chart_key('sales_trend', trend_window, trend_frac, compare_id),
+            lambda: create_sales_trend_chart(df, only_product, all_dates, trend_window, trend_frac, compare_df))
     if sales_trend:
         charts['sales_trend'] = sales_trend
         # 오늘의 중위 추세선 값 추가
@@ -23,46 +49,50 @@ def create_visualizations(df, only_product=False, all_dates=None, trend_window=7
             charts['today_mid_trend'] = sales_trend['data']['today_mid_trend']
     
     # 오늘의 발주제안 계산 (상품-컬러 상세 페이지에서만)
-    if only_product and not df.empty:
+    if only_product and not df.empty and wanted('today_order_suggestion'):
         from service.analysis import generate_inventory_alerts
-        # 가장 최근 날짜의 데이터만 사용
-        df_copy = df.copy()
-        df_copy['판매일자'] = pd.to_datetime(df_copy['판매일자'])
-        last_date = df_copy['판매일자'].max()
-        today_df = df_copy[df_copy['판매일자'] == last_date]
-        # 상품-컬러별로 발주제안 계산
-        alert_rows = generate_inventory_alerts(today_df)
-        # 상품-컬러별로 today_order_suggestion을 charts에 추가 (여러개면 첫번째만)
-        if alert_rows:
-            charts['today_order_suggestion'] = alert_rows[0].get('발주제안', None)
-        else:
-            charts['today_order_suggestion'] = None
+
+        def today_order_suggestion():
+            # 가장 최근 날짜의 데이터만 사용
+            last_date = df.latest_date
+            today_df = df.filter(df.df['판매일자'] == last_date)
+            # 상품-컬러별로 발주제안 계산
+            alert_rows = generate_inventory_alerts(today_df)
+            # 상품-컬러별로 today_order_suggestion을 charts에 추가 (여러개면 첫번째만)
+            return alert_rows[0].get('발주제안', None) if alert_rows else None
+
+        charts['today_order_suggestion'] = cached_chart(chart_key('today_order_suggestion'), today_order_suggestion)
     
     # 2. 주별 판매량 그래프 (상품별 상세 페이지에서만)
-    if only_product:
-        weekly_sales = create_weekly_sales_chart(df, weekly_client_data, compare_df)
+    if only_product and wanted('weekly_sales_trend'):
+        client_counts = tuple(sorted(weekly_client_data.items())) if weekly_client_data else None
+        weekly_sales = cached_chart(
+            chart_key('weekly_sales_trend', compare_id, client_counts),
+            lambda: create_weekly_sales_chart(df, weekly_client_data, compare_df))
         if weekly_sales:
             charts['weekly_sales_trend'] = weekly_sales
     
     # 3. 상품별 판매량 그래프 (메인 대시보드에서만)
-    if not only_product:
-        product_sales = create_product_sales_chart(df)
+    if not only_product and wanted('product_sales'):
+        product_sales = cached_chart(chart_key('product_sales'), lambda: create_product_sales_chart(df))
         if product_sales:
             charts['product_sales'] = product_sales
     
     # 4. 컬러별 판매량 그래프
-    color_sales = create_color_sales_chart(df)
-    if color_sales:
-        charts['color_sales'] = color_sales
+    if wanted('color_sales'):
+        color_sales = cached_chart(chart_key('color_sales'), lambda: create_color_sales_chart(df))
+        if color_sales:
+            charts['color_sales'] = color_sales
     
     # 5. 사이즈별 판매량 그래프
-    size_sales = create_size_sales_chart(df)
-    if size_sales:
-        charts['size_sales'] = size_sales
+    if wanted('size_sales'):
+        size_sales = cached_chart(chart_key('size_sales'), lambda: create_size_sales_chart(df))
+        if size_sales:
+            charts['size_sales'] = size_sales
     
     # 6. 파레토 분석 그래프 (메인 대시보드에서만)
-    if not only_product:
-        pareto_analysis = create_pareto_analysis_chart(df)
+    if not only_product and wanted('pareto_analysis'):
+        pareto_analysis = cached_chart(chart_key('pareto_analysis'), lambda: create_pareto_analysis_chart(df))
         if pareto_analysis:
             charts['pareto_analysis'] = pareto_analysis
 
@@ -88,4 +118,4 @@ def chart_to_echarts_option(chart_data):
     if 'dataZoom' in chart_data['config']:
         option['dataZoom'] = chart_data['config']['dataZoom']
     
-    return option
\ No newline at end of file
+    return option
\ No newline at end of file
@@ -0,0 +1,76 @@
+// 차트 전송 형식 복원 (service/chart_payload.py 형식 → ECharts config)
+// {"$a": 번호} 공유 x축, {"$d": [시작일, 길이 또는 일수 차이 목록]} 날짜 축, {"$i": [시작, 길이]} 숫자 라벨 축,
+// {"$r": [...]} 시리즈 (숫자 그대로, [개수] = null 반복, [개수, 값] = 값 반복)
+(function (global) {
+  function expandDates(start, steps) {
+    var day = Date.parse(start + "T00:00:00Z");
+    if (!Array.isArray(steps)) {
+      // 길이만 있으면 하루씩 이어지는 날짜
+      steps = new Array(Math.max(steps - 1, 0)).fill(1);
+    }
+    var dates = [new Date(day).toISOString().slice(0, 10)];
+    steps.forEach(function (step) {
+      day += step * 86400000;
+      dates.push(new Date(day).toISOString().slice(0, 10));
+    });
+    return dates;
+  }
+
+  function expandLabels(start, length) {
+    var labels = new Array(length);
+    for (var i = 0; i < length; i++) {
+      labels[i] = String(start + i);
+    }
+    return labels;
+  }
+
+  function expandRuns(items) {
+    var values = [];
+    items.forEach(function (item) {
+      if (!Array.isArray(item)) {
+        values.push(item);
+        return;
+      }
+      var fill = item.length > 1 ? item[1] : null;
+      for (var i = 0; i < item[0]; i++) {
+        values.push(fill);
+      }
+    });
+    return values;
+  }
+
+  function decodeAxis(axis) {
+    if (axis && axis.$d) return expandDates(axis.$d[0], axis.$d[1]);
+    if (axis && axis.$i) return expandLabels(axis.$i[0], axis.$i[1]);
+    return axis;
+  }
+
+  function decodeValue(value, axes) {
+    if (Array.isArray(value)) {
+      return value.map(function (item) {
+        return decodeValue(item, axes);
+      });
+    }
+    if (value === null || typeof value !== "object") return value;
+    if (value.$a !== undefined) return axes[value.$a].slice();
+    if (value.$r !== undefined) return expandRuns(value.$r);
+    var decoded = {};
+    Object.keys(value).forEach(function (key) {
+      decoded[key] = decodeValue(value[key], axes);
+    });
+    return decoded;
+  }
+
+  // payload 전체 복원: {axes, 묶음: {차트: {title, config, week_date_ranges}}} → 같은 구조에 config만 원래 형태로
+  function decodeChartPayload(payload) {
+    var axes = (payload.axes || []).map(decodeAxis);
+    var decoded = {};
+    Object.keys(payload).forEach(function (group) {
+      if (group === "axes") return;
+      decoded[group] = decodeValue(payload[group], axes);
+    });
+    return decoded;
+  }
+
+  global.decodeChartPayload = decodeChartPayload;
+})(window);
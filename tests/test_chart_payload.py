@@ -0,0 +1,206 @@
+"""차트 전송 형식($a/$d/$i/$r)을 복원하면 원래 차트 config와 같은지, ETag가 안정적인지 확인"""
+import json
+import math
+import shutil
+import subprocess
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from service.chart_payload import CHART_PRECISION, encode_charts, compress, payload_etag
+
+DECODER_JS = Path(__file__).resolve().parents[1] / 'static' / 'chart_payload.js'
+
+
+def _expand_dates(start, steps):
+    day = date.fromisoformat(start)
+    if not isinstance(steps, list):
+        steps = [1] * max(steps - 1, 0)
+    dates = [day]
+    for step in steps:
+        dates.append(dates[-1] + timedelta(days=step))
+    return [day.isoformat() for day in dates]
+
+
+def _expand_runs(items):
+    values = []
+    for item in items:
+        if isinstance(item, list):
+            values += [item[1] if len(item) > 1 else None] * item[0]
+        else:
+            values.append(item)
+    return values
+
+
+def _decode_value(value, axes):
+    if isinstance(value, list):
+        return [_decode_value(item, axes) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if '$a' in value:
+        return list(axes[value['$a']])
+    if '$r' in value:
+        return _expand_runs(value['$r'])
+    return {key: _decode_value(item, axes) for key, item in value.items()}
+
+
+def _decode(payload):
+    """static/chart_payload.js decodeChartPayload와 같은 복원"""
+    axes = []
+    for axis in payload['axes']:
+        if isinstance(axis, dict) and '$d' in axis:
+            axis = _expand_dates(*axis['$d'])
+        elif isinstance(axis, dict) and '$i' in axis:
+            axis = [str(axis['$i'][0] + i) for i in range(axis['$i'][1])]
+        axes.append(axis)
+    return {group: _decode_value(charts, axes) for group, charts in payload.items() if group != 'axes'}
+
+
+def _expected(value):
+    """부호화 시 바뀌는 부분만 반영한 원래 값 (숫자 반올림, NaN/inf → None, tuple → list)"""
+    if isinstance(value, dict):
+        return {key: _expected(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_expected(item) for item in value]
+    if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_)):
+        value = float(value)
+        if not math.isfinite(value):
+            return None
+        value = float(np.round(value, CHART_PRECISION))
+        return int(value) if value.is_integer() else value
+    return value
+
+
+def _line_chart(dates, values, title='판매 추이'):
+    return {
+        'title': title,
+        'config': {
+            'title': {'text': title, 'left': 'center'},
+            'tooltip': {'trigger': 'axis'},
+            'xAxis': {'type': 'category', 'data': dates, 'axisLabel': {'rotate': 45}},
+            'yAxis': {'type': 'value', 'min': 0},
+            'series': [
+                {'name': '실판매', 'type': 'bar', 'data': values},
+                {'name': '추세', 'type': 'line', 'smooth': True, 'data': [None if v is None else v * 0.5 for v in values],
+                 'lineStyle': {'width': 2.345678, 'type': 'dashed'}},
+            ],
+        },
+        # 서버 전용 원본 (전송하지 않음)
+        'data': {'dates': dates, 'sales': values},
+    }
+
+
+def _charts():
+    days = [(date(2025, 2, 25) + timedelta(days=i)).isoformat() for i in range(12)]
+    sold_days = ['2025-01-03', '2025-01-04', '2025-01-09', '2025-02-01', '2025-02-28', '2025-03-01']
+    sales = [np.float64(3.14159), None, None, None, np.nan, 2, 2, 2, 2, np.int64(7), 0.005, float('inf')]
+    weeks = [str(week) for week in range(1, 14)]
+    weekly = {
+        'title': '주차별 판매',
+        'config': {
+            'xAxis': [{'type': 'category', 'data': weeks}],
+            'series': [{'name': str(year), 'type': 'line', 'data': list(np.linspace(0, 12.3456, 13) + year)}
+                       for year in (2024, 2025)],
+            'legend': {'data': ['2024', '2025'], 'selected': {'2024': False, '2025': True}},
+            'grid': {'left': '3%', 'containLabel': True},
+        },
+        'data': {'week_date_ranges': {1: '01/01~01/07', 2: '01/08~01/14'}},
+    }
+    return {
+        'charts': {
+            'daily': _line_chart(days, sales),
+            # 같은 축을 쓰는 차트는 axes 항목 공유
+            'daily_copy': _line_chart(days, [1] * 12, title='복사'),
+            'sold_days': _line_chart(sold_days, [1.5, 2.5, None, 4, 5, 6]),
+            'weekly': weekly,
+            # 날짜처럼 보이지만 규칙에 맞지 않는 축은 그대로
+            'labels': _line_chart(['2025-03-02', '2025-03-01', '기타'], [1, 2, 3]),
+            'empty': None,
+        },
+        'plots': None,
+    }
+
+
+def _expected_charts(groups):
+    expected = {}
+    for group, charts in groups.items():
+        if charts is None:
+            expected[group] = None
+            continue
+        expected[group] = {}
+        for name, chart in charts.items():
+            if chart is None:
+                expected[group][name] = None
+                continue
+            decoded = {'title': chart['title'], 'config': _expected(chart['config'])}
+            week_date_ranges = chart['data'].get('week_date_ranges')
+            if week_date_ranges:
+                decoded['week_date_ranges'] = {str(week): label for week, label in week_date_ranges.items()}
+            expected[group][name] = decoded
+    return expected
+
+
+def _wire(payload):
+    """실제 응답처럼 JSON 문자열을 거친 payload"""
+    return json.loads(json.dumps(payload, ensure_ascii=False, separators=(',', ':')))
+
+
+def test_round_trip_restores_charts():
+    groups = _charts()
+    payload = _wire(encode_charts(groups))
+    assert _decode(payload) == _expected_charts(groups)
+
+
+def test_compact_forms_are_used():
+    payload = _wire(encode_charts(_charts()))
+    charts = payload['charts']
+    daily_axis = charts['daily']['config']['xAxis']['data']
+    # 같은 날짜 축은 한 번만
+    assert charts['daily_copy']['config']['xAxis']['data'] == daily_axis
+    assert payload['axes'][daily_axis['$a']] == {'$d': ['2025-02-25', 12]}
+    sold_axis = payload['axes'][charts['sold_days']['config']['xAxis']['data']['$a']]
+    assert sold_axis == {'$d': ['2025-01-03', [1, 5, 23, 27, 1]]}
+    weekly_axis = payload['axes'][charts['weekly']['config']['xAxis'][0]['data']['$a']]
+    assert weekly_axis == {'$i': [1, 13]}
+    assert payload['axes'][charts['labels']['config']['xAxis']['data']['$a']] == ['2025-03-02', '2025-03-01', '기타']
+    # None/NaN/inf 구간은 [개수], 반복값은 [개수, 값] (0.005는 config 숫자와 같이 np.round 기준 0)
+    assert charts['daily']['config']['series'][0]['data'] == {'$r': [3.14, [4], [4, 2], 7, 0, [1]]}
+    assert charts['daily_copy']['config']['series'][0]['data'] == {'$r': [[12, 1]]}
+    # 서버 전용 data는 보내지 않음
+    assert 'data' not in charts['daily']
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node 없음')
+def test_javascript_decoder_matches(tmp_path):
+    groups = _charts()
+    payload = _wire(encode_charts(groups))
+    script = tmp_path / 'decode.js'
+    script.write_text(
+        'global.window = global;\n'
+        f'require({json.dumps(str(DECODER_JS))});\n'
+        'let input = "";\n'
+        'process.stdin.on("data", (chunk) => { input += chunk; });\n'
+        'process.stdin.on("end", () => { process.stdout.write(JSON.stringify(decodeChartPayload(JSON.parse(input)))); });\n',
+        encoding='utf-8')
+    result = subprocess.run(['node', str(script)], input=json.dumps(payload), capture_output=True, text=True,
+                            check=True, timeout=30)
+    assert json.loads(result.stdout) == _expected_charts(groups)
+
+
+def test_payload_etag_is_stable():
+    first = json.dumps(encode_charts(_charts()), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    second = json.dumps(encode_charts(_charts()), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    assert first == second
+    assert payload_etag(first, 'gzip') == payload_etag(second, 'gzip')
+    # 압축 방식별로 다른 ETag, 본문이 바뀌면 다른 ETag
+    assert payload_etag(first, 'gzip') != payload_etag(first, None)
+    assert payload_etag(first, None).endswith('-identity')
+    changed = _charts()
+    changed['charts']['daily']['config']['series'][0]['data'][0] = 3.2
+    changed_body = json.dumps(encode_charts(changed), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    assert payload_etag(changed_body, 'gzip') != payload_etag(first, 'gzip')
+    # 압축 바이트가 달라도 ETag는 압축 전 본문 기준
+    data, encoding = compress(first, 'gzip')
+    assert encoding == 'gzip' and payload_etag(first, encoding) == payload_etag(second, 'gzip')
@@ -0,0 +1,93 @@
+"""FuzzyMatcher.extract가 process.extractBests(scorer=WRatio)와 같은 결과를 내는지 확인"""
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fuzzywuzzy import fuzz, process, utils
+
+from service import fuzzy_match
+from service.fuzzy_match import FuzzyMatcher
+
+
+def _names(rng, count):
+    words = ['후드', '티셔츠', 'hood', 'tee', 'basic', 'over', 'fit', 'P', 'SET', '데님', 'pants']
+    names = ['P%02d' % i for i in range(1, 31)]
+    for _ in range(count):
+        parts = rng.sample(words, rng.randint(1, 3))
+        if rng.random() < 0.7:
+            parts.append(str(rng.randint(0, 999)))
+        names.append(rng.choice([' ', '-', '_', '']).join(parts))
+    return names
+
+
+def _reference(query, names, limit, score_cutoff):
+    return process.extractBests(query, names, scorer=fuzz.WRatio, score_cutoff=score_cutoff, limit=limit)
+
+
+@pytest.mark.parametrize('query', ['03', 'P1', '0', 'hood', 'tee 12', '후드 basic', 'over-fit 7'])
+def test_extract_matches_process_extract(query):
+    names = _names(random.Random(0), 300)
+    assert FuzzyMatcher(names).extract(query) == _reference(query, names, 10, 60)
+
+
+def test_extract_matches_process_extract_random_queries():
+    rng = random.Random(1)
+    names = _names(rng, 300)
+    matcher = FuzzyMatcher(names)
+    for _ in range(300):
+        name = rng.choice(names)
+        start = rng.randrange(len(name))
+        query = name[start:start + rng.randint(1, 6)]
+        if not query.strip(' -_'):
+            continue
+        for limit, score_cutoff in [(10, 60), (None, 40), (5, 0), (1, 90), (3, -5)]:
+            assert matcher.extract(query, limit=limit, score_cutoff=score_cutoff) == \
+                _reference(query, names, limit, score_cutoff), (query, limit, score_cutoff)
+
+
+def test_extract_matches_process_extract_adversarial_names():
+    # 짧은 숫자 이름, 반복 단어, 공백이 많은 이름 (partial 창이 잘리고 token_set이 중복을 줄이는 경우)
+    rng = random.Random(2)
+    alphabet = 'ab01 cdxyz239'
+    text = lambda n: ''.join(rng.choice(alphabet) for _ in range(n))
+    for _ in range(20):
+        names = [text(rng.randint(1, 14)) for _ in range(150)] + [' '.join([text(2)] * 3) for _ in range(10)]
+        matcher = FuzzyMatcher(names)
+        for _ in range(5):
+            query = text(rng.randint(1, 12))
+            if not query.strip():
+                continue
+            for limit, score_cutoff in [(10, 60), (None, 30), (5, 0)]:
+                assert matcher.extract(query, limit=limit, score_cutoff=score_cutoff) == \
+                    _reference(query, names, limit, score_cutoff), (query, limit, score_cutoff)
+
+
+def test_candidates_shrink(monkeypatch):
+    names = _names(random.Random(0), 1000)
+    matcher = FuzzyMatcher(names)
+    for query in ['hood basic 12', 'tee 123', 'over fit']:
+        candidates, _, _ = matcher._candidates(utils.full_process(query, force_ascii=True), 60)
+        assert len(candidates) < len(matcher.corpus) / 2
+
+    queries = ['03', 'hood basic 12', 'tee 123']
+    expected = [_reference(query, names, 10, 60) for query in queries]
+    calls = []
+    scorer = fuzz.WRatio
+    monkeypatch.setattr(fuzzy_match.fuzz, 'WRatio', lambda *args, **kwargs: calls.append(1) or scorer(*args, **kwargs))
+    for query, reference in zip(queries, expected):
+        calls.clear()
+        assert matcher.extract(query) == reference
+        # limit번째 점수로 중단하므로 채점 수는 코퍼스의 일부
+        assert len(calls) < len(matcher.corpus) / 2
+
+
+def test_recent_cache_concurrent(monkeypatch):
+    monkeypatch.setattr(fuzzy_match, 'FUZZY_CACHE_SIZE', 4)
+    names = _names(random.Random(0), 200)
+    matcher = FuzzyMatcher(names)
+    queries = ['03', 'P1', 'hood', 'tee 12', 'basic', 'fit 7'] * 50
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(matcher.extract, queries))
+    for query, result in zip(queries, results):
+        assert result == _reference(query, names, 10, 60)
+    assert len(matcher._recent) <= 4
@@ -0,0 +1,81 @@
+"""fill_linear(searchsorted 보간)가 기존 반복문 보간(interpolate_trend)과 같은 시계열을 내는지 확인"""
+import numpy as np
+import pytest
+
+from service.gap_fill import fill_linear, keep_observed
+
+
+def _interpolate_trend(data_indices, trend_values, total_length):
+    """기존 charts.interpolate_trend (반복문 보간) - 비교 기준"""
+    if not data_indices or len(trend_values) == 0:
+        return [0] * total_length
+    result = [0] * total_length
+    for idx, value in zip(data_indices, trend_values):
+        if 0 <= idx < total_length:
+            result[idx] = value
+    for i in range(1, len(data_indices)):
+        start_idx = data_indices[i - 1]
+        end_idx = data_indices[i]
+        start_val = result[start_idx]
+        end_val = result[end_idx]
+        for j in range(start_idx + 1, end_idx):
+            if j < total_length:
+                ratio = (j - start_idx) / (end_idx - start_idx)
+                result[j] = start_val + (end_val - start_val) * ratio
+    if data_indices and data_indices[0] > 0:
+        first_val = result[data_indices[0]]
+        for i in range(data_indices[0]):
+            result[i] = first_val
+    if data_indices and data_indices[-1] < total_length - 1:
+        last_val = result[data_indices[-1]]
+        for i in range(data_indices[-1] + 1, total_length):
+            result[i] = last_val
+    return result
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_fill_linear_matches_loop(seed):
+    rng = np.random.default_rng(seed)
+    length = int(rng.integers(1, 120))
+    count = int(rng.integers(1, length + 1))
+    indices = np.sort(rng.choice(length, size=count, replace=False))
+    values = rng.normal(10, 5, count)
+    expected = _interpolate_trend(indices.tolist(), values.tolist(), length)
+    # 부동소수점 계산 순서까지 같아 완전히 일치
+    assert fill_linear(indices, values, length).tolist() == expected
+
+
+def test_fill_linear_rows_match_loop():
+    rng = np.random.default_rng(7)
+    indices = np.array([2, 3, 9, 20, 52])
+    rows = rng.normal(0, 3, (3, len(indices)))
+    filled = fill_linear(indices, rows, 53)
+    assert filled.shape == (3, 53)
+    for row, values in zip(filled, rows):
+        assert row.tolist() == _interpolate_trend(indices.tolist(), values.tolist(), 53)
+
+
+@pytest.mark.parametrize('indices, values, length', [
+    ([5], [3.5], 10),               # 관측 1개 → 전체가 그 값
+    ([0, 9], [1.0, 4.0], 10),       # 양 끝 관측
+    ([1, 4, 6], [2.0, 8.0], 9),     # 값이 관측보다 적으면 모자란 위치는 0
+    ([1, 4], [2.0, 8.0, 5.0], 6),   # 남는 값은 무시
+])
+def test_fill_linear_edge_cases_match_loop(indices, values, length):
+    assert fill_linear(indices, values, length).tolist() == _interpolate_trend(indices, values, length)
+
+
+def test_fill_linear_empty_returns_zeros():
+    # 기존 반복문처럼 관측 위치나 값이 없으면 0으로 채운 길이 length 배열
+    for indices, values in [([], [1.0, 2.0]), ([1, 2], []), ([], [])]:
+        filled = fill_linear(indices, values, 7)
+        assert filled.tolist() == _interpolate_trend(indices, values, 7)
+    assert fill_linear([], np.empty((3, 0)), 5).tolist() == [[0.0] * 5] * 3
+    assert fill_linear([], [], 0).tolist() == []
+
+
+def test_keep_observed_leaves_gaps():
+    data = [1, None, None, 4]
+    kept = keep_observed(data)
+    assert kept == data and kept is not data
+    assert keep_observed([]) == []
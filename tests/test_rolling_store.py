@@ -0,0 +1,124 @@
+"""RollingWindowStore.updated(변경일만 반영)가 from_frame(전체 재생성)과 같은 저장소를 만드는지 확인"""
+import numpy as np
+import pandas as pd
+
+from service.rolling_store import RollingWindowStore, TOTAL_KEY
+from service.sales_frame import SalesFrame
+
+
+def _rows(date, rows):
+    return [{'판매일자': date, '품명': product, '칼라': color, '실판매': sales, '현재고': stock}
+            for product, color, sales, stock in rows]
+
+
+def _base_rows():
+    rows = []
+    for day in range(1, 11):
+        date = f'2025-03-{day:02d}'
+        rows += _rows(date, [('상품A', '블랙', day % 4, 20 - day), ('상품A', '화이트', 2, 5)])
+        if day % 3:
+            rows += _rows(date, [('상품B', '블랙', 1 + day % 2, 9)])
+    # 상품C는 3/4 이후 판매 없음
+    rows += _rows('2025-03-04', [('상품C', '네이비', 3, 7)])
+    return rows
+
+
+def _frame(rows):
+    return SalesFrame(pd.DataFrame(rows))
+
+
+def _changes(dates, keys):
+    """get_sales_changes() 형식 [(id, 판매일자, 품명, 칼라)]"""
+    return [(i + 1, date, product, color) for i, (date, (product, color)) in enumerate(
+        (date, key) for date in dates for key in keys)]
+
+
+def _assert_same(updated, rebuilt):
+    assert updated is not None
+    assert updated.start_day == rebuilt.start_day
+    for key in set(updated.keys) | set(rebuilt.keys):
+        if key not in rebuilt.rows:
+            # 삭제로 사라진 키는 합계 0
+            assert updated.total_sum(key) == 0, key
+            continue
+        row, rebuilt_row = updated.rows[key], rebuilt.rows[key]
+        n = rebuilt.sums.shape[1]
+        np.testing.assert_allclose(updated.sums[row, :n], rebuilt.sums[rebuilt_row], err_msg=str(key))
+        np.testing.assert_array_equal(updated.counts[row, :n], rebuilt.counts[rebuilt_row], err_msg=str(key))
+        # 재생성보다 긴 날짜 열은 마지막 누적값 유지
+        assert np.all(updated.sums[row, n:] == rebuilt.sums[rebuilt_row, -1]), key
+        assert updated.last_date(key) == rebuilt.last_date(key), key
+        assert updated.current_stock(key) == rebuilt.current_stock(key), key
+        for days in (1, 7, 30):
+            assert updated.trailing_sum(key, days) == rebuilt.trailing_sum(key, days), (key, days)
+            assert updated.trailing_mean(key, days) == rebuilt.trailing_mean(key, days), (key, days)
+
+
+def test_updated_matches_from_frame_after_appended_day():
+    rows = _base_rows()
+    store = RollingWindowStore.from_frame(_frame(rows), change_id=1)
+    # 새 판매일 + 새 SKU(기존 상품의 새 컬러) + 새 상품
+    new_rows = _rows('2025-03-12', [('상품A', '블랙', 5, 3), ('상품A', '레드', 1, 4), ('상품D', '블랙', 2, 8)])
+    frame = _frame(rows + new_rows)
+    changes = _changes(['2025-03-12'], [('상품A', '블랙'), ('상품A', '레드'), ('상품D', '블랙')])
+    updated = store.updated(frame, changes, 2)
+    assert updated.change_id == 2
+    _assert_same(updated, RollingWindowStore.from_frame(frame))
+
+
+def test_updated_matches_from_frame_after_edited_rows():
+    rows = _base_rows()
+    store = RollingWindowStore.from_frame(_frame(rows), change_id=1)
+    # 3/5 상품A 블랙 판매량 수정, 상품B 행 삭제, 상품C 행 추가 (과거 날짜 덮어쓰기)
+    edited = [dict(row) for row in rows if not (row['판매일자'] == '2025-03-05' and row['품명'] == '상품B')]
+    for row in edited:
+        if row['판매일자'] == '2025-03-05' and row['칼라'] == '블랙':
+            row['실판매'] = 11
+    edited += _rows('2025-03-05', [('상품C', '네이비', 4, 2)])
+    frame = _frame(edited)
+    changes = _changes(['2025-03-05'], [('상품A', '블랙'), ('상품B', '블랙'), ('상품C', '네이비')])
+    _assert_same(store.updated(frame, changes, 2), RollingWindowStore.from_frame(frame))
+
+
+def test_updated_matches_from_frame_after_last_day_overwrite():
+    rows = _base_rows()
+    store = RollingWindowStore.from_frame(_frame(rows), change_id=1)
+    # 마지막 판매일 덮어쓰기 - 현재고는 변경일 행에서 다시 계산
+    edited = [row for row in rows if row['판매일자'] != '2025-03-10']
+    edited += _rows('2025-03-10', [('상품A', '블랙', 7, 1), ('상품A', '화이트', 0, 6), ('상품B', '블랙', 2, 4)])
+    frame = _frame(edited)
+    changes = _changes(['2025-03-10'], [('상품A', '블랙'), ('상품A', '화이트'), ('상품B', '블랙')])
+    _assert_same(store.updated(frame, changes, 2), RollingWindowStore.from_frame(frame))
+
+
+def test_updated_is_idempotent_and_keeps_store_without_changes():
+    rows = _base_rows()
+    frame = _frame(rows + _rows('2025-03-11', [('상품B', '블랙', 3, 6)]))
+    store = RollingWindowStore.from_frame(_frame(rows), change_id=1)
+    changes = _changes(['2025-03-11'], [('상품B', '블랙')])
+    once = store.updated(frame, changes, 2)
+    _assert_same(once.updated(frame, changes, 2), RollingWindowStore.from_frame(frame))
+    unchanged = once.updated(frame, [], 3)
+    assert unchanged.change_id == 3
+    _assert_same(unchanged, RollingWindowStore.from_frame(frame))
+
+
+def test_updated_returns_none_when_rebuild_needed():
+    rows = _base_rows()
+    store = RollingWindowStore.from_frame(_frame(rows), change_id=1)
+    # 마지막 판매일 삭제로 마지막 판매일이 변경되지 않은 과거 날짜로 이동 → 현재고를 알 수 없어 재생성
+    without_last = [row for row in rows if row['판매일자'] != '2025-03-10']
+    changes = _changes(['2025-03-10'], [('상품A', '블랙'), ('상품A', '화이트'), ('상품B', '블랙')])
+    assert store.updated(_frame(without_last), changes, 2) is None
+    # 저장소 시작일 이전 날짜 변경
+    earlier = rows + _rows('2025-02-27', [('상품A', '블랙', 1, 1)])
+    assert store.updated(_frame(earlier), _changes(['2025-02-27'], [('상품A', '블랙')]), 2) is None
+    # 빈 프레임
+    empty = SalesFrame(pd.DataFrame(columns=['판매일자', '품명', '칼라', '실판매', '현재고']))
+    assert store.updated(empty, _changes(['2025-03-10'], [('상품A', '블랙')]), 2) is None
+
+
+def test_total_key_tracks_all_rows():
+    rows = _base_rows()
+    store = RollingWindowStore.from_frame(_frame(rows))
+    assert store.total_sum(TOTAL_KEY) == sum(row['실판매'] for row in rows)
@@ -0,0 +1,56 @@
+"""TrendCalculator(슬라이딩 창 LOWESS)가 statsmodels lowess와 같은 추세선을 내는지 확인"""
+import numpy as np
+import pytest
+
+from service.trend_calculator import TrendCalculator
+
+lowess = pytest.importorskip('statsmodels.nonparametric.smoothers_lowess').lowess
+
+
+def _series(n, seed=3):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n)
+    # 완만한 계절성 + 잡음 + 드문 급등(robust 가중치 확인용)
+    return 10 + 3 * np.sin(x / 9) + rng.normal(0, 1, n) + (rng.random(n) < 0.05) * 15
+
+
+@pytest.mark.parametrize('n, frac', [(57, 0.3), (100, 0.2), (120, 0.25), (365, 0.08)])
+@pytest.mark.parametrize('robust_iterations', [0, 2])
+def test_mid_trend_matches_statsmodels_lowess(n, frac, robust_iterations):
+    y = _series(n)
+    calculator = TrendCalculator(window=7, frac=frac, robust_iterations=robust_iterations)
+    # 이웃 수 k를 같게 맞춤 (statsmodels는 int(frac·n), 여기서는 ceil(frac·n)과 최소 window개)
+    k = calculator._neighbors(n)
+    expected = lowess(y, np.arange(n), frac=k / n, it=robust_iterations, delta=0, return_sorted=False)
+    np.testing.assert_allclose(calculator.mid_trend(y), expected, rtol=0, atol=1e-9)
+    low, mid, high = calculator.bands(y)
+    np.testing.assert_allclose(mid, expected, rtol=0, atol=1e-9)
+    # 밴드는 중간선 ∓ 국소 평균 절대 잔차
+    np.testing.assert_allclose(mid - low, high - mid, atol=1e-9)
+    assert np.all(high >= mid)
+
+
+def test_trailing_bands_matches_statsmodels_endpoint():
+    y = _series(60, seed=5)
+    calculator = TrendCalculator(robust_iterations=0)
+    # 창 전체를 이웃으로 하는 끝점 적합 = frac 1의 마지막 점
+    expected = lowess(y, np.arange(60), frac=1.0, it=0, delta=0, return_sorted=False)[-1]
+    assert calculator.trailing_bands(y)[1] == pytest.approx(expected, abs=1e-9)
+    # 앞쪽 결측은 창에서 빠짐
+    padded = np.concatenate([np.full(5, np.nan), y[5:]])
+    expected = lowess(y[5:], np.arange(55), frac=1.0, it=0, delta=0, return_sorted=False)[-1]
+    assert calculator.trailing_bands(padded)[1] == pytest.approx(expected, abs=1e-9)
+
+
+def test_batched_rows_match_single_series():
+    calculator = TrendCalculator(window=7, frac=0.2)
+    series = [_series(n, seed) for n, seed in [(80, 1), (80, 2), (45, 3), (3, 4), (120, 5)]]
+    batched = calculator.series_bands(series)
+    matrix_low, matrix_mid, matrix_high = calculator.bands(np.stack(series[:2]))
+    for row, (y, bands) in enumerate(zip(series, batched)):
+        for got, expected in zip(bands, calculator.bands(y)):
+            np.testing.assert_allclose(got, expected, atol=1e-9)
+        if row < 2:
+            np.testing.assert_allclose(matrix_mid[row], calculator.mid_trend(y), atol=1e-9)
+            np.testing.assert_allclose(matrix_low[row], bands[0], atol=1e-9)
+            np.testing.assert_allclose(matrix_high[row], bands[2], atol=1e-9)